@@ -0,0 +1,321 @@
+"""
+DatabaseManager benchmarks over synthetic libraries (see src/api/ibroadcast/library_generator.py).
+
+The file is not named test_*.py, so the normal test run skips it. Run it
+explicitly and save the results so later runs can be compared against them:
+
+    python -m pytest benchmarks/bench_database.py --benchmark-autosave
+    python -m pytest benchmarks/bench_database.py --benchmark-compare --benchmark-compare-fail=mean:10%
+
+Library sizes come from PYBROADCAST_BENCH_SIZES (default "1000,10000").
+"""
+import itertools
+import tracemalloc
+
+import pytest
+
+from src.api.ibroadcast.library_snapshot import HAS_NUMPY, LibrarySnapshot
+from src.api.ibroadcast.models import Album, Artist, Playlist
+
+TS = "2026-01-01 12:00:00"
+
+
+def _rotating(ids):
+    """Endless iterator over ids, so destructive benchmarks hit a new row each round"""
+    return itertools.cycle(list(ids))
+
+
+# --- SYNC ---
+def test_sync_library(benchmark, empty_db, library):
+    benchmark.pedantic(empty_db.sync_library, args=(library,), rounds=3, iterations=1)
+
+
+def test_clear_database(benchmark, empty_db, library):
+    benchmark.pedantic(empty_db.clear_database, setup=lambda: empty_db.sync_library(library), rounds=3, iterations=1)
+
+
+# --- GET EVERY ---
+def test_get_all_artists(benchmark, synced_db):
+    benchmark(synced_db.get_all_artists)
+
+
+def test_get_all_albums(benchmark, synced_db):
+    benchmark(synced_db.get_all_albums)
+
+
+def test_get_all_tracks(benchmark, synced_db):
+    tracks = benchmark(synced_db.get_all_tracks)
+    # No stats under --benchmark-disable
+    if benchmark.stats:
+        benchmark.extra_info["tracks_per_second"] = round(len(tracks) / benchmark.stats.stats.mean)
+
+
+def test_get_all_tracks_memory(benchmark, synced_db):
+    """Memory held by the returned models (retained) and during the call (peak)"""
+    def measure():
+        tracemalloc.start()
+        try:
+            tracks = synced_db.get_all_tracks()
+            retained, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return len(tracks), retained, peak
+
+    count, retained, peak = benchmark.pedantic(measure, rounds=3, iterations=1)
+    benchmark.extra_info["retained_bytes"] = retained
+    benchmark.extra_info["peak_bytes"] = peak
+    benchmark.extra_info["bytes_per_track"] = round(retained / count)
+
+
+def test_get_all_playlists(benchmark, synced_db):
+    benchmark(synced_db.get_all_playlists)
+
+
+def test_get_artists_with_albums(benchmark, synced_db):
+    benchmark(synced_db.get_artists_with_albums)
+
+
+def test_get_all_artwork_ids(benchmark, synced_db):
+    benchmark(synced_db.get_all_artwork_ids)
+
+
+# --- STREAMING AND PAGES ---
+def test_iter_tracks(benchmark, synced_db):
+    benchmark(lambda: sum(1 for _ in synced_db.iter_tracks()))
+
+
+def test_iter_albums_first_screen(benchmark, synced_db):
+    """What a grid needs before its first paint: the first 100 albums"""
+    benchmark(lambda: list(itertools.islice(synced_db.iter_albums(), 100)))
+
+
+def test_get_tracks_page_deep(benchmark, synced_db):
+    """A page near the end of the library; keyset pages should not slow down with depth"""
+    count = synced_db.conn.execute("SELECT COUNT(*) FROM Tracks").fetchone()[0]
+    name, track_id = synced_db.conn.execute(
+        "SELECT title, track_id FROM Tracks ORDER BY title, track_id LIMIT 1 OFFSET ?", (max(0, count - 201),)
+    ).fetchone()
+    benchmark(synced_db.get_tracks_page, name, track_id, 200)
+
+
+# --- SNAPSHOT ---
+# Smart view queries against the columnar snapshot, with and without NumPy
+SNAPSHOT_BACKENDS = [pytest.param(False, id="array"), pytest.param(True, id="numpy", marks=pytest.mark.skipif(not HAS_NUMPY, reason="numpy not installed"))]
+
+
+@pytest.fixture(params=SNAPSHOT_BACKENDS)
+def snapshot(request, synced_db):
+    return LibrarySnapshot.from_db(synced_db, use_numpy=request.param)
+
+
+@pytest.mark.parametrize("use_numpy", SNAPSHOT_BACKENDS)
+def test_snapshot_build(benchmark, synced_db, use_numpy):
+    benchmark.pedantic(LibrarySnapshot.from_db, args=(synced_db, use_numpy), rounds=3, iterations=1)
+
+
+def test_snapshot_filter_and_sort(benchmark, snapshot):
+    """Top rated 90s tracks, longest first"""
+    benchmark(lambda: snapshot.track_ids(snapshot.order_by("length", snapshot.where(year=(1990, 1999), rating=(4, None)), descending=True)))
+
+
+def test_snapshot_most_played(benchmark, snapshot):
+    benchmark(lambda: snapshot.track_ids(snapshot.top("plays", 100)))
+
+
+def test_snapshot_play_time_by_artist(benchmark, snapshot):
+    benchmark(snapshot.sum_by, "artist_id", "play_time")
+
+
+# --- GET BY ID ---
+def test_get_artist_by_id(benchmark, synced_db, sample):
+    benchmark(synced_db.get_artist_by_id, sample["artist_id"])
+
+
+def test_get_album_by_id(benchmark, synced_db, sample):
+    benchmark(synced_db.get_album_by_id, sample["album_id"])
+
+
+def test_get_track_by_id(benchmark, synced_db, sample):
+    benchmark(synced_db.get_track_by_id, sample["track_id"])
+
+
+def test_get_playlist_by_id(benchmark, synced_db, sample):
+    benchmark(synced_db.get_playlist_by_id, sample["playlist_id"])
+
+
+# --- FILTERED ---
+def test_get_tracks_by_artist(benchmark, synced_db, sample):
+    benchmark(synced_db.get_tracks_by_artist, sample["artist_id"])
+
+
+def test_get_tracks_by_album(benchmark, synced_db, sample):
+    benchmark(synced_db.get_tracks_by_album, sample["album_id"])
+
+
+def test_get_tracks_by_playlist(benchmark, synced_db, sample):
+    benchmark(synced_db.get_tracks_by_playlist, sample["playlist_id"])
+
+
+def test_get_artists_by_album(benchmark, synced_db, sample):
+    benchmark(synced_db.get_artists_by_album, sample["album_id"])
+
+
+def test_get_artists_by_track(benchmark, synced_db, sample):
+    benchmark(synced_db.get_artists_by_track, sample["track_id"])
+
+
+def test_get_album_by_track(benchmark, synced_db, sample):
+    benchmark(synced_db.get_album_by_track, sample["track_id"])
+
+
+def test_get_albums_by_artist(benchmark, synced_db, sample):
+    benchmark(synced_db.get_albums_by_artist, sample["artist_id"])
+
+
+def test_get_most_played_track_ids(benchmark, synced_db):
+    benchmark(synced_db.get_most_played_track_ids, 100)
+
+
+# --- BULK LOOKUPS ---
+def test_get_album_names_by_tracks(benchmark, synced_db, sample):
+    benchmark(synced_db.get_album_names_by_tracks, sample["track_ids"])
+
+
+def test_get_artist_names_by_tracks(benchmark, synced_db, sample):
+    benchmark(synced_db.get_artist_names_by_tracks, sample["track_ids"])
+
+
+def test_get_artist_names_by_albums(benchmark, synced_db, sample):
+    benchmark(synced_db.get_artist_names_by_albums, sample["album_ids"])
+
+
+def test_get_album_artwork_ids(benchmark, synced_db, sample):
+    benchmark(synced_db.get_album_artwork_ids, sample["album_ids"])
+
+
+# --- SEARCH ---
+def test_search_library_common(benchmark, synced_db):
+    benchmark(synced_db.search_library, "ka")
+
+
+def test_search_library_rare(benchmark, synced_db):
+    benchmark(synced_db.search_library, "quozan")
+
+
+# --- INSERT / DELETE ---
+def test_insert_artist(benchmark, fresh_db):
+    ids = itertools.count(10_000_000)
+    benchmark(lambda: fresh_db.insert_artist(Artist(next(ids), "Bench Artist", 0, 1)))
+
+
+def test_insert_album(benchmark, fresh_db):
+    ids = itertools.count(10_000_000)
+    benchmark(lambda: fresh_db.insert_album(Album(next(ids), "Bench Album", 0, 1, 2026)))
+
+
+def test_insert_playlist(benchmark, fresh_db):
+    ids = itertools.count(10_000_000)
+    benchmark(lambda: fresh_db.insert_playlist(Playlist(next(ids), "Bench Playlist", "", 0)))
+
+
+def test_delete_artist(benchmark, fresh_db):
+    ids = _rotating(r[0] for r in fresh_db.conn.execute("SELECT artist_id FROM Artists ORDER BY artist_id DESC LIMIT 50"))
+    benchmark.pedantic(lambda: fresh_db.delete_artist(next(ids)), rounds=50, iterations=1)
+
+
+def test_delete_album(benchmark, fresh_db):
+    ids = _rotating(r[0] for r in fresh_db.conn.execute("SELECT album_id FROM Albums ORDER BY album_id DESC LIMIT 50"))
+    benchmark.pedantic(lambda: fresh_db.delete_album(next(ids)), rounds=50, iterations=1)
+
+
+def test_delete_track(benchmark, fresh_db):
+    ids = _rotating(r[0] for r in fresh_db.conn.execute("SELECT track_id FROM Tracks ORDER BY track_id DESC LIMIT 50"))
+    benchmark.pedantic(lambda: fresh_db.delete_track(next(ids)), rounds=50, iterations=1)
+
+
+def test_delete_playlist(benchmark, fresh_db, sample):
+    benchmark.pedantic(fresh_db.delete_playlist, args=(sample["playlist_id"],), rounds=1, iterations=1)
+
+
+# --- PLAYLIST MANIPULATION ---
+def test_add_track_to_playlist(benchmark, fresh_db, sample):
+    benchmark(fresh_db.add_track_to_playlist, sample["playlist_id"], sample["track_id"])
+
+
+def test_append_tracks_to_playlist(benchmark, fresh_db, sample):
+    benchmark(fresh_db.append_tracks_to_playlist, sample["playlist_id"], sample["track_ids"][:100])
+
+
+def test_insert_track_into_playlist(benchmark, fresh_db, sample):
+    middle = sample["playlist_len"] // 2
+    benchmark(fresh_db.insert_track_into_playlist, sample["playlist_id"], middle, sample["track_id"])
+
+
+def test_rearrange_playlist_track(benchmark, fresh_db, sample):
+    last = sample["playlist_len"] - 1
+    benchmark(fresh_db.rearrange_playlist_track, sample["playlist_id"], last, last // 2)
+
+
+def test_move_playlist_row(benchmark, fresh_db, sample):
+    """Same move as test_rearrange_playlist_track, addressed by row id"""
+    rows = fresh_db.get_playlist_rows(sample["playlist_id"])
+    last = len(rows) - 1
+    benchmark(fresh_db.move_playlist_row, sample["playlist_id"], rows[last][0], rows[last // 2 - 1][0])
+
+
+def test_remove_track_from_playlist(benchmark, fresh_db, sample):
+    middle = sample["playlist_len"] // 2
+    rounds = min(100, middle)
+    benchmark.pedantic(fresh_db.remove_track_from_playlist, args=(sample["playlist_id"], middle), rounds=rounds, iterations=1)
+
+
+def test_delete_playlist_rows(benchmark, fresh_db, sample):
+    playlist_id = sample["playlist_id"]
+
+    def setup():
+        return (playlist_id, fresh_db.append_tracks_to_playlist(playlist_id, sample["track_ids"][:100])), {}
+
+    benchmark.pedantic(fresh_db.delete_playlist_rows, setup=setup, rounds=20, iterations=1)
+
+
+def test_replace_playlist_id(benchmark, fresh_db, sample):
+    ids = itertools.cycle([(sample["playlist_id"], -1), (-1, sample["playlist_id"])])
+    benchmark.pedantic(lambda: fresh_db.replace_playlist_id(*next(ids)), rounds=20, iterations=1)
+
+
+def test_renumber_playlist(benchmark, fresh_db, sample):
+    benchmark.pedantic(fresh_db.renumber_playlist, args=(sample["playlist_id"],), rounds=5, iterations=1)
+
+
+# --- PLAY HISTORY JOURNAL ---
+def test_add_play_history(benchmark, empty_db, sample):
+    benchmark(empty_db.add_play_history, sample["track_id"], TS)
+
+
+def _fill_history(db, sample, count=1000):
+    for track_id in itertools.islice(itertools.cycle(sample["track_ids"]), count):
+        db.add_play_history(track_id, TS)
+
+
+def test_get_pending_play_history(benchmark, empty_db, sample):
+    _fill_history(empty_db, sample)
+    benchmark(empty_db.get_pending_play_history, 100)
+
+
+def test_count_pending_play_history(benchmark, empty_db, sample):
+    _fill_history(empty_db, sample)
+    benchmark(empty_db.count_pending_play_history)
+
+
+def test_delete_play_history(benchmark, empty_db, sample):
+    def setup():
+        _fill_history(empty_db, sample, 100)
+        return ([r[0] for r in empty_db.get_pending_play_history(100)],), {}
+
+    benchmark.pedantic(empty_db.delete_play_history, setup=setup, rounds=20, iterations=1)
+
+
+def test_mark_play_history_attempt(benchmark, empty_db, sample):
+    _fill_history(empty_db, sample)
+    ids = [r[0] for r in empty_db.get_pending_play_history(100)]
+    benchmark(empty_db.mark_play_history_attempt, ids, 1_000_000_000)
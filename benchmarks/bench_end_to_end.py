@@ -0,0 +1,98 @@
+"""
+End-to-end benchmarks against the local stand-in server (see mock_server).
+
+Network conditions come from PYBROADCAST_BENCH_LATENCY (seconds, default 0.02)
+and PYBROADCAST_BENCH_BANDWIDTH (bytes/second, default unlimited):
+
+    QT_QPA_PLATFORM=offscreen python -m pytest benchmarks/bench_end_to_end.py --benchmark-autosave
+"""
+import time
+
+import pytest
+from PyQt6.QtCore import QEventLoop
+
+import src.api.ibroadcast.database as database
+from src.api.artwork_cache import ArtworkCache
+from src.api.audio_cache import AudioCache
+from src.api.ibroadcast.ibroadcast_api import iBroadcastAPI
+from src.api.ibroadcast.play_queue_socket import PlayQueueSocket
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Keep library.db, token.json and the caches out of the checkout"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "library.db"))
+    return tmp_path
+
+
+def _logged_in_api(server, workdir) -> iBroadcastAPI:
+    api = iBroadcastAPI(server_url=server.url)
+    # Absolute cache paths: background prefetch may outlive the test's working directory
+    api.artwork_cache = ArtworkCache(workdir / "cache" / "artworks")
+    api.audio_cache = AudioCache(workdir / "cache" / "audio")
+    api.tokens.set_tokens("local-access", "local-refresh", expires_in=3600)
+    return api
+
+
+def _wait(app, condition, timeout=10.0):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("Condition not met in time")
+        app.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 10)
+
+
+def test_cold_start(benchmark, workdir, mock_server):
+    """Fresh client, empty database: construct, load and sync the library"""
+
+    def setup():
+        (workdir / "library.db").unlink(missing_ok=True)
+        return (), {}
+
+    def cold_start():
+        api = _logged_in_api(mock_server, workdir)
+        assert api.load_library()["success"]
+        api.db.close()
+
+    benchmark.pedantic(cold_start, setup=setup, rounds=3, iterations=1)
+
+
+def test_library_sync(benchmark, workdir, mock_server):
+    """Re-sync into an already populated database, as on update_library"""
+    api = _logged_in_api(mock_server, workdir)
+    api.load_library()
+    result = benchmark.pedantic(api.load_library, rounds=3, iterations=1)
+    assert result["success"]
+
+
+def test_artwork_prefetch(benchmark, workdir, mock_server, library):
+    api = _logged_in_api(mock_server, workdir)
+    api.db.sync_library(library)
+    benchmark.pedantic(api._precache_artworks, setup=lambda: api.artwork_cache.clear_cache(), rounds=3, iterations=1)
+    assert api.artwork_cache.get_cache_count() > 0
+
+
+def test_queue_sync(benchmark, qapp, workdir, mock_server, library):
+    """set_state from one client until the other client has applied it"""
+    url = _logged_in_api(mock_server, workdir).queue_url
+    sender = PlayQueueSocket(server_url=url)
+    receiver = PlayQueueSocket(server_url=url)
+    received = []
+    receiver.stateUpdated.connect(received.append)
+    sender.connect_to_server("local-token", mock_server.session_uuid)
+    receiver.connect_to_server("local-token", mock_server.session_uuid)
+    _wait(qapp, lambda: sender.is_connected and receiver.is_connected)
+    track_ids = list(library["tracks"])[:500]
+    song = iter(range(1, 1_000_000))
+
+    def round_trip():
+        current = next(song)
+        sender.send_set_state({"current_song": current, "tracks": track_ids, "pause": False})
+        _wait(qapp, lambda: received and received[-1].get("current_song") == current)
+
+    try:
+        benchmark.pedantic(round_trip, rounds=20, iterations=1)
+    finally:
+        sender.disconnect_from_server()
+        receiver.disconnect_from_server()
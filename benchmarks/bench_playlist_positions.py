@@ -0,0 +1,129 @@
+"""
+Compare playlist reorder/remove cost of contiguous positions (the previous
+scheme, every following row is shifted) against the sparse positions used by
+DatabaseManager now, addressed by index (OFFSET lookups) and by row id.
+Rows written count the writes; VM steps count sqlite's work, reads included.
+
+    python -m benchmarks.bench_playlist_positions [playlist_size] [operations]
+"""
+import random
+import sys
+import time
+
+import src.api.ibroadcast.database as database
+from src.api.ibroadcast.database import DatabaseManager
+
+PLAYLIST_ID = 1
+# sqlite progress handler granularity, in VM instructions
+STEP_INTERVAL = 100
+
+
+def build_db(size: int) -> DatabaseManager:
+    database.DB_PATH = ":memory:"
+    db = DatabaseManager()
+    with db.conn:
+        db.conn.execute("INSERT INTO Albums (album_id, name) VALUES (1, 'Album')")
+        db.conn.executemany("INSERT INTO Tracks (track_id, album_id, title) VALUES (?, 1, 'Track')", [(i,) for i in range(size)])
+        db.conn.execute("INSERT INTO Playlists (playlist_id, name) VALUES (?, 'Big')", (PLAYLIST_ID,))
+    return db
+
+
+class ContiguousPositions:
+    """The range-UPDATE implementation positions used to have"""
+
+    def __init__(self, db: DatabaseManager, size: int):
+        self.conn = db.conn
+        with self.conn:
+            self.conn.executemany("INSERT INTO Playlist_Tracks (playlist_id, track_id, position) VALUES (?, ?, ?)",
+                                  [(PLAYLIST_ID, i, i) for i in range(size)])
+
+    def move(self, old_pos, new_pos):
+        with self.conn:
+            target_id = self.conn.execute("SELECT pt_id FROM Playlist_Tracks WHERE playlist_id = ? AND position = ?", (PLAYLIST_ID, old_pos)).fetchone()[0]
+            self.conn.execute("UPDATE Playlist_Tracks SET position = -1 WHERE pt_id = ?", (target_id,))
+            if old_pos > new_pos:
+                self.conn.execute("UPDATE Playlist_Tracks SET position = position + 1 WHERE playlist_id = ? AND position >= ? AND position < ?", (PLAYLIST_ID, new_pos, old_pos))
+            else:
+                self.conn.execute("UPDATE Playlist_Tracks SET position = position - 1 WHERE playlist_id = ? AND position > ? AND position <= ?", (PLAYLIST_ID, old_pos, new_pos))
+            self.conn.execute("UPDATE Playlist_Tracks SET position = ? WHERE pt_id = ?", (new_pos, target_id))
+
+    def remove(self, position):
+        with self.conn:
+            self.conn.execute("DELETE FROM Playlist_Tracks WHERE playlist_id = ? AND position = ?", (PLAYLIST_ID, position))
+            self.conn.execute("UPDATE Playlist_Tracks SET position = position - 1 WHERE playlist_id = ? AND position > ?", (PLAYLIST_ID, position))
+
+
+class SparsePositions:
+    def __init__(self, db: DatabaseManager, size: int):
+        self.db = db
+        self.conn = db.conn
+        db.append_tracks_to_playlist(PLAYLIST_ID, list(range(size)))
+
+    def move(self, old_pos, new_pos):
+        self.db.rearrange_playlist_track(PLAYLIST_ID, old_pos, new_pos)
+
+    def remove(self, position):
+        self.db.remove_track_from_playlist(PLAYLIST_ID, position)
+
+
+class SparseRowIds(SparsePositions):
+    """Sparse positions addressed the way a view holding the rows would, by pt_id"""
+
+    def __init__(self, db: DatabaseManager, size: int):
+        super().__init__(db, size)
+        self.rows = [pt_id for pt_id, _ in db.get_playlist_rows(PLAYLIST_ID)]
+
+    def move(self, old_pos, new_pos):
+        if old_pos == new_pos:
+            return
+        pt_id = self.rows.pop(old_pos)
+        self.rows.insert(new_pos, pt_id)
+        self.db.move_playlist_row(PLAYLIST_ID, pt_id, self.rows[new_pos - 1] if new_pos else None)
+
+    def remove(self, position):
+        self.db.delete_playlist_rows(PLAYLIST_ID, [self.rows.pop(position)])
+
+
+def run(scheme_cls, size: int, operations: int, seed: int = 42):
+    db = build_db(size)
+    scheme = scheme_cls(db, size)
+    rng = random.Random(seed)
+    length = size
+    changes_before = db.conn.total_changes
+    steps = [0]
+
+    def count_steps():
+        steps[0] += STEP_INTERVAL
+
+    db.conn.set_progress_handler(count_steps, STEP_INTERVAL)
+    start = time.perf_counter()
+    for _ in range(operations):
+        if rng.random() < 0.8:
+            scheme.move(rng.randrange(length), rng.randrange(length))
+        else:
+            scheme.remove(rng.randrange(length))
+            length -= 1
+    elapsed = time.perf_counter() - start
+    db.conn.set_progress_handler(None, STEP_INTERVAL)
+    rows = db.conn.total_changes - changes_before
+    order = [r[0] for r in db.conn.execute("SELECT track_id FROM Playlist_Tracks WHERE playlist_id = ? ORDER BY position", (PLAYLIST_ID,))]
+    db.close()
+    return elapsed, rows, steps[0], order
+
+
+def main(argv):
+    size = int(argv[1]) if len(argv) > 1 else 10000
+    operations = int(argv[2]) if len(argv) > 2 else 500
+    print(f"Playlist of {size} tracks, {operations} operations (80% moves, 20% removes)")
+    results = {}
+    schemes = (("contiguous", ContiguousPositions), ("sparse", SparsePositions), ("sparse ids", SparseRowIds))
+    for name, scheme_cls in schemes:
+        elapsed, rows, steps, order = run(scheme_cls, size, operations)
+        results[name] = order
+        print(f"  {name:<11} {elapsed * 1000:9.1f} ms  {elapsed / operations * 1e6:8.1f} us/op  "
+              f"{rows / operations:9.1f} rows written/op  {steps / operations:10.0f} VM steps/op")
+    print("  orders match:", len({tuple(order) for order in results.values()}) == 1)
+
+
+if __name__ == "__main__":
+    main(sys.argv)
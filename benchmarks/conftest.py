@@ -0,0 +1,108 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import src.api.ibroadcast.database as database
+from src.api.ibroadcast.database import DatabaseManager
+from src.api.ibroadcast.ibroadcast_api import process_library
+from src.api.ibroadcast.library_generator import generate_library
+from benchmarks.mock_server import MockIBroadcastServer
+
+# Network conditions of the stand-in server for end-to-end benchmarks
+BENCH_LATENCY = float(os.environ.get("PYBROADCAST_BENCH_LATENCY", "0.02"))
+BENCH_BANDWIDTH = float(os.environ.get("PYBROADCAST_BENCH_BANDWIDTH", "0")) or None
+# Library sizes (tracks) every benchmark runs against, e.g. PYBROADCAST_BENCH_SIZES=1000,100000,1000000
+BENCH_SIZES = [int(s) for s in os.environ.get("PYBROADCAST_BENCH_SIZES", "1000,10000").split(",") if s.strip()]
+
+
+def pytest_generate_tests(metafunc):
+    if "library_size" in metafunc.fixturenames:
+        metafunc.parametrize("library_size", BENCH_SIZES, ids=[f"{n}tracks" for n in BENCH_SIZES], scope="session")
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(sys.argv)
+    yield app
+
+
+@pytest.fixture(scope="session")
+def mock_server(raw_library):
+    """Stand-in iBroadcast server serving the synthetic library"""
+    server = MockIBroadcastServer(library=raw_library, latency=BENCH_LATENCY, bandwidth=BENCH_BANDWIDTH)
+    server.start()
+    yield server
+    server.stop()
+
+
+def _new_db() -> DatabaseManager:
+    original_path = database.DB_PATH
+    database.DB_PATH = ":memory:"
+    try:
+        return DatabaseManager()
+    finally:
+        database.DB_PATH = original_path
+
+
+@pytest.fixture(scope="session")
+def raw_library(library_size):
+    """Synthetic library as the server sends it"""
+    return generate_library(library_size)
+
+
+@pytest.fixture(scope="session")
+def library(raw_library):
+    """Decoded synthetic library, as sync_library receives it"""
+    return process_library(raw_library)
+
+
+@pytest.fixture(scope="session")
+def synced_db(library):
+    """Shared populated database for read-only benchmarks"""
+    db = _new_db()
+    db.sync_library(library)
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def fresh_db(synced_db):
+    """Private copy of the populated database for benchmarks that write"""
+    db = _new_db()
+    synced_db.conn.backup(db.conn)
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def empty_db():
+    db = _new_db()
+    yield db
+    db.close()
+
+
+@pytest.fixture(scope="session")
+def sample(synced_db):
+    """Representative ids: the busiest artist, a large album, the biggest playlist and a track on it"""
+    conn = synced_db.conn
+    artist_id = conn.execute("SELECT artist_id FROM Album_Artists GROUP BY artist_id ORDER BY COUNT(*) DESC LIMIT 1").fetchone()[0]
+    album_id = conn.execute("SELECT album_id FROM Tracks GROUP BY album_id ORDER BY COUNT(*) DESC LIMIT 1").fetchone()[0]
+    playlist_id, playlist_len = conn.execute("SELECT playlist_id, COUNT(*) FROM Playlist_Tracks GROUP BY playlist_id ORDER BY COUNT(*) DESC LIMIT 1").fetchone()
+    track_id = conn.execute("SELECT track_id FROM Tracks WHERE album_id = ? LIMIT 1", (album_id,)).fetchone()[0]
+    track_ids = [r[0] for r in conn.execute("SELECT track_id FROM Tracks ORDER BY plays DESC LIMIT 500")]
+    album_ids = [r[0] for r in conn.execute("SELECT album_id FROM Albums LIMIT 500")]
+    return {
+        "artist_id": artist_id,
+        "album_id": album_id,
+        "track_id": track_id,
+        "playlist_id": playlist_id,
+        "playlist_len": playlist_len,
+        "track_ids": track_ids,
+        "album_ids": album_ids,
+    }
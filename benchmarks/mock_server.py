@@ -0,0 +1,399 @@
+"""
+Offline stand-in for the iBroadcast services, for end-to-end benchmarks.
+
+One local HTTP server answers everything the client talks to: the library,
+status (play queue token, history) and playlist endpoints, OAuth authorize and
+token, artwork, streaming (with Range support) and the play queue WebSocket.
+Every response can be delayed by a fixed latency and throttled to a bandwidth,
+so cold start, library sync, artwork prefetch and queue sync can be measured
+under network conditions that are repeatable in CI.
+
+Point the app at it with the base-URL override:
+
+    python -m benchmarks.mock_server --tracks 100000 --latency 0.08 --bandwidth 2000000
+    PYBROADCAST_SERVER_URL=http://127.0.0.1:8765 python main.py
+
+or in-process:
+
+    server = MockIBroadcastServer(tracks=10000, latency=0.05)
+    server.start()
+    api = iBroadcastAPI(server_url=server.url)
+"""
+import argparse
+import base64
+import hashlib
+import json
+import random
+import struct
+import threading
+import time
+import uuid
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from src.api.ibroadcast.library_generator import generate_library
+
+CHUNK_SIZE = 16 * 1024
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def make_png(size: int, seed: int = 0) -> bytes:
+    """A size x size RGB PNG of noise, so it compresses about as badly as real artwork"""
+    rng = random.Random(seed)
+    rows = b"".join(b"\x00" + rng.randbytes(size * 3) for _ in range(size))
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows, 1)) + chunk(b"IEND", b"")
+
+
+class MockIBroadcastServer(ThreadingHTTPServer):
+    """
+    Threaded stand-in server. latency (seconds) is added before every response
+    and before every WebSocket message; bandwidth (bytes/second) throttles
+    response bodies. Request counts per endpoint are kept in stats.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, library: Optional[Dict] = None, tracks: int = 1000, seed: int = 0,
+                 host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 bandwidth: Optional[float] = None, artwork_size: int = 150, bitrate: int = 128000):
+        super().__init__((host, port), MockRequestHandler)
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.bitrate = bitrate
+        self.library = library if library is not None else generate_library(tracks, seed)
+        self.lock = threading.Lock()
+        self.stats = Counter()
+        self.history = []
+        self.playlist_requests = []
+        self.next_playlist_id = 10_000_000
+        self.session_uuid = str(uuid.uuid4())
+        self.queue_state: Dict = {}
+        self.sockets = set()
+        self.thread = None
+
+        self.artwork = make_png(artwork_size, seed)
+        self.audio_block = random.Random(seed).randbytes(64 * 1024)
+        self.files = self._index_files()
+        self._library_body = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        for handler in list(self.sockets):
+            handler.close_websocket()
+        if self.thread is not None:
+            self.shutdown()
+            self.thread.join(timeout=5)
+            self.thread = None
+        self.server_close()
+
+    def count(self, endpoint: str):
+        with self.lock:
+            self.stats[endpoint] += 1
+
+    def library_body(self) -> bytes:
+        """The library response, encoded once; it points streaming back at this server"""
+        if self._library_body is None:
+            body = {"authenticated": True, "settings": {"streaming_server": self.url}, "library": self.library}
+            self._library_body = json.dumps(body).encode("utf-8")
+        return self._library_body
+
+    def audio_bytes(self, start: int, length: int) -> bytes:
+        """Deterministic filler for a slice of a stream (not decodable audio)"""
+        block = self.audio_block
+        offset = start % len(block)
+        repeats = (offset + length) // len(block) + 1
+        return (block * repeats)[offset:offset + length]
+
+    def broadcast(self, message: Dict, exclude=None):
+        """Send a play queue message to every connected client but exclude"""
+        for handler in list(self.sockets):
+            if handler is not exclude:
+                handler.send_json(message)
+
+    def _index_files(self) -> Dict[str, int]:
+        """file path -> size in bytes, from each track's length and the bitrate"""
+        section = self.library.get("tracks", {})
+        index = section.get("map", {})
+        files = {}
+        for track_id, row in section.items():
+            if track_id == "map":
+                continue
+            length = row[index["length"]] or 1
+            files[row[index["file"]]] = int(length * self.bitrate / 8)
+        return files
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    server: MockIBroadcastServer
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if path == "/token":
+            self._handle_token(parse_qs(body.decode("utf-8")))
+            return
+        try:
+            data = json.loads(body or b"{}")
+        except ValueError:
+            data = {}
+        if path == "/s/JSON/library":
+            self.server.count("library")
+            self._send(self.server.library_body())
+        elif path == "/s/JSON/status":
+            self._handle_status(data)
+        elif path == "/s/JSON/playlists":
+            self._handle_playlists(data)
+        else:
+            self._send_json({"result": False}, 404)
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path == "/ws" and self.headers.get("Upgrade", "").lower() == "websocket":
+            self._handle_websocket()
+        elif parts.path == "/authorize":
+            self._handle_authorize(parse_qs(parts.query))
+        elif parts.path.startswith("/artwork/"):
+            self.server.count("artwork")
+            self._send(self.server.artwork, content_type="image/png")
+        elif parts.path in self.server.files:
+            self._handle_stream(parts.path)
+        else:
+            self._send_json({"result": False}, 404)
+
+    # --- ENDPOINTS ---
+    def _handle_token(self, form):
+        self.server.count("token")
+        self._send_json({
+            "access_token": f"local-access-{uuid.uuid4().hex}",
+            "refresh_token": form.get("refresh_token", ["local-refresh"])[0],
+            "token_type": "Bearer",
+            "expires_in": 3600,
+        })
+
+    def _handle_authorize(self, query):
+        """Approve immediately and redirect back to the app's callback"""
+        self.server.count("authorize")
+        redirect = query.get("redirect_uri", [""])[0]
+        params = {"code": "local-code", "state": query.get("state", [""])[0]}
+        self._delay()
+        self.send_response(302)
+        self.send_header("Location", f"{redirect}?{urlencode(params)}")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _handle_status(self, data):
+        mode = data.get("mode")
+        self.server.count(f"status:{mode}")
+        if mode == "playqueue_token":
+            self._send_json({
+                "result": True,
+                "token": uuid.uuid4().hex,
+                "user": {"session_uuid": self.server.session_uuid},
+            })
+            return
+        if data.get("history"):
+            with self.server.lock:
+                self.server.history.extend(data["history"])
+        self._send_json({"result": True})
+
+    def _handle_playlists(self, data):
+        mode = data.get("mode")
+        self.server.count(f"playlists:{mode}")
+        with self.server.lock:
+            self.server.playlist_requests.append(data)
+            response = {"result": True}
+            if mode == "createplaylist":
+                self.server.next_playlist_id += 1
+                response["playlist_id"] = self.server.next_playlist_id
+        self._send_json(response)
+
+    def _handle_stream(self, path):
+        self.server.count("stream")
+        total = self.server.files[path]
+        start, end = 0, total - 1
+        range_header = self.headers.get("Range", "")
+        if range_header.startswith("bytes="):
+            first, _, last = range_header[len("bytes="):].partition("-")
+            if first:
+                start = int(first)
+                end = min(int(last), total - 1) if last else total - 1
+            elif last:
+                start = max(0, total - int(last))
+        if start > end:
+            self._delay()
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{total}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        headers = {"Accept-Ranges": "bytes"}
+        if range_header:
+            headers["Content-Range"] = f"bytes {start}-{end}/{total}"
+        self._send(self.server.audio_bytes(start, end - start + 1), 206 if range_header else 200, "audio/mpeg", headers)
+
+    # --- PLAY QUEUE WEBSOCKET ---
+    def _handle_websocket(self):
+        self.server.count("websocket")
+        key = self.headers.get("Sec-WebSocket-Key", "")
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode("ascii")).digest()).decode("ascii")
+        self.send_response(101)
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept)
+        self.end_headers()
+        self.close_connection = True
+        self.write_lock = threading.Lock()
+        self.server.sockets.add(self)
+        try:
+            while True:
+                frame = self._read_frame()
+                if frame is None:
+                    break
+                opcode, payload = frame
+                if opcode == 0x8:
+                    self._write_frame(0x8, payload[:2])
+                    break
+                if opcode == 0x9:
+                    self._write_frame(0xA, payload)
+                elif opcode == 0x1:
+                    self._on_queue_message(payload.decode("utf-8"))
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.server.sockets.discard(self)
+
+    def _on_queue_message(self, text):
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return
+        command = data.get("command")
+        self.server.count(f"queue:{command}")
+        if command == "get_state":
+            with self.server.lock:
+                state = dict(self.server.queue_state)
+            self.send_json({"command": "set_state", "session_uuid": self.server.session_uuid, **state})
+        elif command == "set_state" and isinstance(data.get("value"), dict):
+            with self.server.lock:
+                # Clients may send only the fields that changed
+                self.server.queue_state.update(data["value"])
+                state = dict(self.server.queue_state)
+            self.server.broadcast({"command": "set_state", "session_uuid": self.server.session_uuid, **state}, exclude=self)
+
+    def send_json(self, message: Dict):
+        self._delay()
+        try:
+            self._write_frame(0x1, json.dumps(message).encode("utf-8"))
+        except (ConnectionError, OSError):
+            self.server.sockets.discard(self)
+
+    def close_websocket(self):
+        try:
+            self._write_frame(0x8, struct.pack(">H", 1001))
+        except (ConnectionError, OSError):
+            pass
+
+    def _read_frame(self):
+        header = self.rfile.read(2)
+        if len(header) < 2:
+            return None
+        opcode = header[0] & 0x0F
+        length = header[1] & 0x7F
+        if length == 126:
+            length = struct.unpack(">H", self.rfile.read(2))[0]
+        elif length == 127:
+            length = struct.unpack(">Q", self.rfile.read(8))[0]
+        mask = self.rfile.read(4) if header[1] & 0x80 else None
+        payload = self.rfile.read(length)
+        if mask:
+            payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        return opcode, payload
+
+    def _write_frame(self, opcode: int, payload: bytes):
+        length = len(payload)
+        if length < 126:
+            header = struct.pack(">BB", 0x80 | opcode, length)
+        elif length < 1 << 16:
+            header = struct.pack(">BBH", 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack(">BBQ", 0x80 | opcode, 127, length)
+        with self.write_lock:
+            self.wfile.write(header + payload)
+            self.wfile.flush()
+
+    # --- RESPONSES ---
+    def _delay(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+    def _send_json(self, body: Dict, status: int = 200):
+        self._send(json.dumps(body).encode("utf-8"), status)
+
+    def _send(self, body: bytes, status: int = 200, content_type: str = "application/json", headers=None):
+        self._delay()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self._write_throttled(body)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # Client stopped reading, e.g. a seek
+
+    def _write_throttled(self, body: bytes):
+        bandwidth = self.server.bandwidth
+        if not bandwidth:
+            self.wfile.write(body)
+            return
+        started = time.perf_counter()
+        for sent in range(0, len(body), CHUNK_SIZE):
+            self.wfile.write(body[sent:sent + CHUNK_SIZE])
+            ahead = (sent + CHUNK_SIZE) / bandwidth - (time.perf_counter() - started)
+            if ahead > 0:
+                time.sleep(ahead)
+
+    def log_message(self, format, *args):
+        # Suppress logging
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local stand-in iBroadcast server")
+    parser.add_argument("--tracks", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--bandwidth", type=float, default=None, help="bytes per second per response")
+    args = parser.parse_args()
+    server = MockIBroadcastServer(tracks=args.tracks, seed=args.seed, port=args.port,
+                                  latency=args.latency, bandwidth=args.bandwidth)
+    print(f"Serving {args.tracks} tracks at {server.url} (PYBROADCAST_SERVER_URL={server.url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
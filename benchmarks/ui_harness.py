@@ -0,0 +1,313 @@
+"""
+Headless performance harness for the heavy views.
+
+Runs LibraryGrid, AlbumTrackList (inside PlaylistDetailView), QueueSidebar
+and ArtistDiscographyView against a generated library under the offscreen
+platform, with artwork served by the local stand-in server. For every view it
+records the time to populate, the peak number of live widgets, the RSS growth
+and how late the event loop runs while scrolling and, for the grid, while
+resizing (LibraryGrid._relayout_items).
+
+    python -m benchmarks.ui_harness --tracks 10000 --save-baseline ui_baseline.json
+    python -m benchmarks.ui_harness --tracks 10000 --baseline ui_baseline.json --tolerance 0.25
+
+With --baseline the exit status is 1 when a metric got worse than the baseline
+by more than the tolerance. Baselines are machine specific and not checked in.
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QCoreApplication, QElapsedTimer, QEvent, QEventLoop, Qt, QTimer
+from PyQt6.QtWidgets import QApplication
+
+import src.api.ibroadcast.database as database
+from src.api.artwork_cache import ArtworkCache
+from src.api.audio_cache import AudioCache
+from src.api.ibroadcast.ibroadcast_api import iBroadcastAPI, process_library
+from src.api.ibroadcast.models import ExtraData
+from src.ui.artist.artist_discography_view import ArtistDiscographyView
+from src.ui.grid.library_grid import LibraryGrid
+from src.ui.playlist.playlist_detail_view import PlaylistDetailView
+from src.ui.queue.queue_sidebar import QueueSidebar
+from src.api.ibroadcast.library_generator import generate_library
+from benchmarks.mock_server import MockIBroadcastServer
+
+# Metrics where higher is worse, and the smallest change worth reporting for each unit
+MIN_DELTA = {"_ms": 5.0, "_kb": 4096.0, "widgets": 50.0}
+
+
+def _rss_kb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class LoopLatencyProbe:
+    """A fast repeating timer; how late it fires is how long the UI thread was blocked"""
+
+    def __init__(self, interval_ms: int = 4):
+        self.interval_ms = interval_ms
+        self.lags: List[float] = []
+        self.clock = QElapsedTimer()
+        self.last = None
+        self.timer = QTimer()
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self._tick)
+
+    def start(self):
+        self.lags = []
+        self.clock.start()
+        self.last = self.clock.nsecsElapsed()
+        self.timer.start()
+
+    def stop(self) -> Dict[str, float]:
+        self.timer.stop()
+        return {"max_ms": max(self.lags, default=0.0), "p95_ms": _percentile(self.lags, 0.95)}
+
+    def _tick(self):
+        now = self.clock.nsecsElapsed()
+        self.lags.append(max(0.0, (now - self.last) / 1e6 - self.interval_ms))
+        self.last = now
+
+
+class UIHarness:
+    def __init__(self, tracks: int = 10000, seed: int = 0, max_rows: int = 500):
+        self.app = QApplication.instance() or QApplication(sys.argv)
+        self.max_rows = max_rows
+        self.tempdir = tempfile.TemporaryDirectory()
+        raw = generate_library(tracks, seed)
+        self.server = MockIBroadcastServer(library=raw)
+        self.server.start()
+
+        original_path = database.DB_PATH
+        database.DB_PATH = ":memory:"
+        try:
+            self.api = iBroadcastAPI(server_url=self.server.url)
+        finally:
+            database.DB_PATH = original_path
+        cache_root = Path(self.tempdir.name)
+        self.api.artwork_cache = ArtworkCache(cache_root / "artworks")
+        self.api.audio_cache = AudioCache(cache_root / "audio")
+        self.api.db.sync_library(process_library(raw))
+        self.peak_widgets = 0
+
+    def close(self):
+        self.api.db.close()
+        self.server.stop()
+        self.tempdir.cleanup()
+
+    # --- EVENT LOOP ---
+    def pump(self, ms: float = 0, until=None, timeout_ms: float = 60000):
+        """Process events for ms, or until until() is true, sampling the widget count"""
+        start = time.perf_counter()
+        last_sample = 0.0
+        while True:
+            self.app.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 5)
+            elapsed = (time.perf_counter() - start) * 1000
+            if elapsed - last_sample >= 20:
+                self.peak_widgets = max(self.peak_widgets, len(QApplication.allWidgets()))
+                last_sample = elapsed
+            if until is not None and until():
+                return
+            if until is None and elapsed >= ms:
+                return
+            if elapsed >= timeout_ms:
+                raise TimeoutError("View did not finish populating")
+
+    def dispose(self, view):
+        view.close()
+        view.deleteLater()
+        QCoreApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete.value)
+        self.app.processEvents()
+
+    def measure(self, build, populate, scroll_view=None, resize=None) -> Dict[str, float]:
+        """Build a view, populate it, then scroll and resize it while recording metrics"""
+        self.peak_widgets = len(QApplication.allWidgets())
+        rss_before = _rss_kb()
+        view = build()
+        view.resize(1200, 800)
+        view.show()
+        self.pump(50)
+
+        start = time.perf_counter()
+        populate(view)
+        result = {"populate_ms": (time.perf_counter() - start) * 1000}
+        self.pump(100)
+        result["rss_kb"] = max(0.0, _rss_kb() - rss_before)
+
+        if scroll_view is not None:
+            result.update(self._scroll(scroll_view(view)))
+        if resize is not None:
+            result.update(resize(view))
+        result["peak_widgets"] = float(self.peak_widgets)
+        self.dispose(view)
+        return result
+
+    def _scroll(self, area, steps: int = 40) -> Dict[str, float]:
+        bar = area.verticalScrollBar()
+        probe = LoopLatencyProbe()
+        probe.start()
+        start = time.perf_counter()
+        maximum = bar.maximum()
+        for i in range(steps + 1):
+            bar.setValue(maximum * i // steps)
+            self.pump(16)  # One frame per step
+        scroll_ms = (time.perf_counter() - start) * 1000 - 16 * (steps + 1)
+        lag = probe.stop()
+        return {"scroll_ms": max(0.0, scroll_ms), "scroll_lag_max_ms": lag["max_ms"], "scroll_lag_p95_ms": lag["p95_ms"]}
+
+    # --- SCENARIOS ---
+    def library_grid(self) -> Dict[str, float]:
+        albums = self.api.get_albums()
+        artwork_ids = self.api.get_album_artwork_ids([a.id for a in albums])
+
+        def populate(grid):
+            for album in albums:
+                grid.add_item(album, self.api.get_artwork_url(artwork_ids.get(album.id)))
+            self.pump(until=lambda: not grid.items_queue)
+
+        def resize(grid):
+            relayouts = []
+            original = grid._relayout_items
+
+            def timed_relayout():
+                started = time.perf_counter()
+                original()
+                relayouts.append((time.perf_counter() - started) * 1000)
+
+            grid._relayout_items = timed_relayout
+            probe = LoopLatencyProbe()
+            probe.start()
+            for width in (900, 1300, 1700, 1100, 700, 1500, 1200):
+                grid.resize(width, 800)
+                self.pump(16)
+            lag = probe.stop()
+            return {
+                "relayout_ms": max(relayouts, default=0.0),
+                "resize_lag_max_ms": lag["max_ms"],
+                "resize_lag_p95_ms": lag["p95_ms"],
+            }
+
+        return self.measure(lambda: LibraryGrid(lambda model: None, self.api),
+                            populate, scroll_view=lambda grid: grid, resize=resize)
+
+    def album_track_list(self) -> Dict[str, float]:
+        """AlbumTrackList as the playlist view uses it, with the largest playlist"""
+        playlist_id = self.api.db.conn.execute(
+            "SELECT playlist_id FROM Playlist_Tracks GROUP BY playlist_id ORDER BY COUNT(*) DESC LIMIT 1"
+        ).fetchone()[0]
+        tracks = self.api.get_playlist_tracks(playlist_id)[:self.max_rows]
+        names = self.api.get_artist_names_by_tracks([t.id for t in tracks])
+        for track in tracks:
+            track.extra_data = ExtraData(artist_name=", ".join(names.get(track.id, [])) or "Unknown Artist")
+
+        def populate(view):
+            view.set_tracks(tracks)
+            self.pump(until=lambda: True)
+
+        return self.measure(PlaylistDetailView, populate, scroll_view=lambda view: view)
+
+    def queue_sidebar(self) -> Dict[str, float]:
+        track_ids = [r[0] for r in self.api.db.conn.execute("SELECT track_id FROM Tracks LIMIT ?", (self.max_rows,))]
+        names = self.api.get_artist_names_by_tracks(track_ids)
+        queue = [
+            {"title": track.name, "artist": ", ".join(names.get(track.id, [])), "track_id": track.id, "is_current": i == 0}
+            for i, track in enumerate(self.api.get_track_by_id(t) for t in track_ids)
+        ]
+
+        def populate(sidebar):
+            sidebar.set_queue(queue, [], 0, "tracks")
+            self.pump(until=lambda: True)
+
+        return self.measure(QueueSidebar, populate, scroll_view=lambda sidebar: sidebar.queue_list)
+
+    def artist_discography(self) -> Dict[str, float]:
+        artist_id = self.api.db.conn.execute(
+            "SELECT artist_id FROM Album_Artists GROUP BY artist_id ORDER BY COUNT(*) DESC LIMIT 1"
+        ).fetchone()[0]
+        artist = self.api.get_artist_by_id(artist_id)
+        albums = self.api.get_artist_albums(artist_id)
+
+        def populate(view):
+            view.set_artist_discography(artist, albums)
+            self.pump(until=lambda: True)
+
+        return self.measure(lambda: ArtistDiscographyView(self.api), populate,
+                            scroll_view=lambda view: view)
+
+    def run(self) -> Dict[str, Dict[str, float]]:
+        return {
+            "library_grid": self.library_grid(),
+            "album_track_list": self.album_track_list(),
+            "queue_sidebar": self.queue_sidebar(),
+            "artist_discography": self.artist_discography(),
+        }
+
+
+def check_regressions(results: Dict, baseline: Dict, tolerance: float = 0.25) -> List[str]:
+    """Metrics that got worse than baseline * (1 + tolerance), ignoring changes below MIN_DELTA"""
+    failures = []
+    for scenario, metrics in baseline.items():
+        for metric, expected in metrics.items():
+            actual = results.get(scenario, {}).get(metric)
+            if actual is None:
+                continue
+            min_delta = next((d for suffix, d in MIN_DELTA.items() if metric.endswith(suffix)), 0.0)
+            if actual > expected * (1 + tolerance) and actual - expected > min_delta:
+                failures.append(f"{scenario}.{metric}: {actual:.1f} (baseline {expected:.1f})")
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Headless UI performance harness")
+    parser.add_argument("--tracks", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-rows", type=int, default=500, help="rows for the track list and queue")
+    parser.add_argument("--baseline", help="fail if results regress against this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--save-baseline", help="write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    harness = UIHarness(args.tracks, args.seed, args.max_rows)
+    try:
+        results = harness.run()
+    finally:
+        harness.close()
+
+    for scenario, metrics in results.items():
+        print(scenario)
+        for metric, value in metrics.items():
+            print(f"  {metric:<20} {value:12.1f}")
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures = check_regressions(results, json.load(f), args.tolerance)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
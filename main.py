@@ -1,8 +1,10 @@
 import sys
-import webbrowser
 import os
 import time
 
+# Imported first: the startup clock starts here
+from src.core.startup_profile import PROFILE_FLAG, startup
+
 from PyQt6.QtWidgets import (
     QApplication,
     QMainWindow,
@@ -12,43 +14,65 @@ from PyQt6.QtWidgets import (
     QStackedWidget,
     QPushButton,
 )
-from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
-from PyQt6.QtCore import QUrl, QTimer, Qt
+from PyQt6.QtCore import QUrl, QTimer, Qt, pyqtSignal
 from PyQt6.QtGui import QAction, QIcon, QFontDatabase, QFont
 
 from src.api.ibroadcast.models import Artist, Album, ExtraData, Track, Playlist
 from src.api.ibroadcast.ibroadcast_api import iBroadcastAPI
-from src.api.ibroadcast.play_queue_socket import PlayQueueSocket
 
 from src.ui.search.search_header import SearchHeader
 from src.ui.navigation.sidebar_navigation import SidebarNavigation
-from src.ui.grid.library_grid import LibraryGrid
-from src.ui.player.player_controls import PlayerControls
 from src.ui.artist.artist_header import ArtistHeader
-from src.ui.artist.artist_discography_view import ArtistDiscographyView
-from src.ui.album.album_detail_view import AlbumDetailView
-from src.ui.playlist.playlist_detail_view import PlaylistDetailView
 from src.ui.queue.queue_sidebar import QueueSidebar
-from src.ui.utils.context_menus import TrackContextMenu
-from src.ui.utils.options_dialog import OptionsDialog
+from src.ui.utils.lazy_view import is_built, lazy_view
 from src.ui.login.login_screen import LoginScreen
-from src.core.mpris_manager import MPRISManager
+from src.core.search_controller import SearchController
+from src.core.state_publisher import StatePublisher
+from src.core.state_dispatcher import StateDispatcher
+from src.core.track_queue import TrackQueue, track_ids
+from src.core.login_controller import LoginController
+from src.core.instrumentation import DUMP_ENV, instrumentation, timed
+from src.core.query_tracer import TRACE_ENV, QueryTracer
+from src.core.stall_detector import DEFAULT_REPORT, REPORT_ENV, StallDetector
 
 from src.core.credentials_manager import CredentialsManager
 
+# Views, player controls (QtWebEngine), QtMultimedia, QtWebSockets and MPRIS
+# (pydbus/GLib) are imported where first needed, after the login screen is up
+startup.mark("imports")
+
 
 class iBroadcastNative(QMainWindow):
+    # Emitted from the token refresh thread; queued onto the UI thread
+    loginRequired = pyqtSignal()
+
     def __init__(self):
         super().__init__()
+        self.print_startup_profile = False
+        self.query_tracer = None
+        self.stall_detector = StallDetector.from_env(self)
+        if self.stall_detector:
+            self.stall_detector.start()
         self.api = iBroadcastAPI()
-        self.media_player = QMediaPlayer()
-        self.audio_output = QAudioOutput()
-        self.media_player.setAudioOutput(self.audio_output)
-
-        self.tracks = []
-        self.play_next_queue = []
+        self.api.on_login_required = self.loginRequired.emit
+        self.loginRequired.connect(self.on_login_required)
+        self.trace_queries()
+        startup.mark("api and database")
+
+        # Created by init_deferred once the login screen has been shown
+        self.media_player = None
+        self.audio_output = None
+        self.preloader = None
+        self.socket = None
+        self.state_publisher = None
+        self.mpris = None
+        self._deferred_started = False
+
+        self.tracks = TrackQueue()
+        self.play_next_queue = TrackQueue()
         self.play_index = 0
         self.play_from = "tracks"
+        self._queue_display_key = None
 
         self.current_track_id = None
         self.shuffle_enabled = False
@@ -63,33 +87,105 @@ class iBroadcastNative(QMainWindow):
 
         self.init_navigation_stack()
         self.init_ui()
+        startup.mark("window shell")
 
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_position)
-        self.timer.start(100)  # 100ms for smooth UI updates
         self.is_seeking = False
 
-        self.media_player.mediaStatusChanged.connect(self.on_media_status_changed)
-        self.media_player.playbackStateChanged.connect(
-            self.on_playback_state_changed
-        )  # NEW
+        # Inbound set_state handling, dispatched per changed field
+        self.state_dispatcher = StateDispatcher()
+        self.state_dispatcher.register(
+            ["tracks", "play_next", "data.play_from", "data.play_index"],
+            self._apply_queue_state,
+        )
+        self.state_dispatcher.register(
+            ["shuffle", "data.repeat_mode"], self._apply_mode_state
+        )
+        self.state_dispatcher.register(
+            ["role", "current_song", "pause"], self._apply_playback_state
+        )
+        self.state_dispatcher.register(
+            ["start_position", "start_time"], self._apply_position_state
+        )
+        self.state_dispatcher.register(["volume"], self._apply_volume_state)
+
+        self.last_server_state = {}
+        self.last_sync_time = 0
+        self.pending_seek_ms = 0
+        self.role = "player"  # Default to player until told otherwise
+
+        # Login pipeline: signals completion instead of being polled
+        self.login_controller = LoginController(self.api, parent=self)
+        self.login_controller.loginSucceeded.connect(self.on_login_succeeded)
+        self.login_controller.loginFailed.connect(self.login_screen.set_error)
+
+        self.check_auth()
+
+    def showEvent(self, a0):
+        super().showEvent(a0)
+        if not self._deferred_started:
+            self._deferred_started = True
+            startup.mark("shown")
+            # Runs once the event loop has painted the shell
+            QTimer.singleShot(0, self.init_deferred)
+
+    def init_deferred(self):
+        """Bring up the subsystems the first paint does not need"""
+        startup.mark("first paint")
+        self.setup_main_app_ui(self.main_app_widget)
+        startup.mark("main app widgets")
+        self.init_media()
+        startup.mark("media backend")
+        self.init_socket()
+        startup.mark("play queue socket")
+        self.init_mpris()
+        startup.finish("mpris")
+        if self.print_startup_profile:
+            print(startup.report())
+
+    def init_media(self):
+        from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
+        from src.core.track_preloader import TrackPreloader
+
+        self.media_player = QMediaPlayer()
+        self.audio_output = QAudioOutput()
+        self.media_player.setAudioOutput(self.audio_output)
+        self.preloader = TrackPreloader(self.api)
+
+        for name, slot in self._player_slots().items():
+            getattr(self.media_player, name).connect(slot)
+        self.timer.start(100)  # 100ms for smooth UI updates
+
+    def _player_slots(self):
+        """Handlers for each of track_preloader.PLAYER_SIGNALS"""
+        return {
+            "mediaStatusChanged": self.on_media_status_changed,
+            "playbackStateChanged": self.on_playback_state_changed,
+            "errorOccurred": self.on_media_error,
+        }
+
+    def init_socket(self):
+        from src.api.ibroadcast.play_queue_socket import PlayQueueSocket
 
         # Play Queue Socket
-        self.socket = PlayQueueSocket()
+        self.socket = PlayQueueSocket(server_url=self.api.queue_url)
         self.socket.stateUpdated.connect(self.on_server_state_updated)
         self.socket.libraryUpdateRequested.connect(self.on_library_update_requested)
+        self.socket.connected.connect(self.state_dispatcher.reset)
         # self.socket.sessionEnded.connect(self.logout) # Implement logout if needed
+        self.state_publisher = StatePublisher(self.socket, self.build_state, parent=self)
+        self.state_publisher.sent.connect(self.on_state_published)
 
-        self.last_server_state = {}
-        self.last_sync_time = 0
-        self.pending_seek_ms = 0
-        self.role = "player"  # Default to player until told otherwise
+    def init_mpris(self):
+        from src.core.mpris_manager import MPRISManager
 
         # MPRIS Manager for Linux
         self.mpris = MPRISManager(self)
         self.mpris.start()
 
-        self.check_auth()
+    def is_playing(self):
+        return self.media_player is not None and self.media_player.isPlaying()
 
     def connect_to_queue(self):
         """Fetch token and connect to Play Queue Server"""
@@ -98,102 +194,112 @@ class iBroadcastNative(QMainWindow):
             token = result.get("token")
             session_uuid = result.get("session_uuid")
             if token and session_uuid:
+                self.socket.server_url = self.api.queue_url
                 self.socket.connect_to_server(token, session_uuid)
 
     def on_library_update_requested(self, last_modified):
         self.api.load_library()
+        self.search_controller.invalidate()
+        self.update_queue_display(force=True)
         self.load_artists()
 
     def on_server_state_updated(self, state):
-        self.last_server_state = state
-        self.role = state.get("role", "player")
-
-        # 1. Update Internal State
+        """Diff the incoming state and run only the handlers whose fields changed"""
+        self.state_dispatcher.dispatch(state)
+        # Store merged state for position prediction
+        self.last_server_state = self.state_dispatcher.last_state
+
+    def on_state_published(self, payload):
+        """Our own changes become the baseline the next inbound state is diffed against"""
+        self.state_dispatcher.record_sent(payload)
+        self.last_server_state = self.state_dispatcher.last_state
+
+    def _apply_queue_state(self, state, changed):
+        # Unchanged queues are left untouched; bad ids from the server are dropped
         if "tracks" in state:
-            self.tracks = state["tracks"]
+            self.tracks.assign(track_ids(state["tracks"]))
         if "play_next" in state:
-            self.play_next_queue = state["play_next"]
+            self.play_next_queue.assign(track_ids(state["play_next"]))
 
         data = state.get("data", {})
         if "play_from" in data:
             self.play_from = data["play_from"]
         if "play_index" in data:
             self.play_index = data["play_index"]
+
+        self.update_queue_display()
+
+    def _apply_mode_state(self, state, changed):
+        data = state.get("data", {})
         if "repeat_mode" in data:
             self.repeat_mode = data["repeat_mode"]
         if "shuffle" in state:
             self.shuffle_enabled = state["shuffle"]
+        self.controls.set_shuffle(self.shuffle_enabled)
+        self.controls.set_repeat(self.repeat_mode)
 
-        self.update_queue_display()
-
-        # 2. Playback State
+    def _apply_playback_state(self, state, changed):
+        self.role = state.get("role", "player")
         current_song_id = state.get("current_song")
         is_paused = state.get("pause", False)
 
         # Determine if we should be playing music
         if self.role == "player":
-            # Position Sync (only if not seeking locally)
-            if not self.is_seeking:
-                start_time = state.get("start_time", 0)
-                start_pos = state.get("start_position", 0)
-
-                if current_song_id:
-                    if is_paused:
-                        target_pos_ms = int(start_pos * 1000)
-                    else:
-                        now = time.time()
-                        target_pos_ms = int((now - (start_time - start_pos)) * 1000)
-
-                    if current_song_id != self.current_track_id:
-                        self.play_track_by_id(
-                            current_song_id,
-                            from_server=True,
-                            start_playing=not is_paused,
-                            position_ms=target_pos_ms,
-                        )
-                    else:
-                        diff = abs(self.media_player.position() - target_pos_ms)
-                        if diff > 2000:
-                            self.media_player.setPosition(max(0, target_pos_ms))
+            if (
+                current_song_id
+                and current_song_id != self.current_track_id
+                and not self.is_seeking
+            ):
+                self.play_track_by_id(
+                    current_song_id,
+                    from_server=True,
+                    start_playing=not is_paused,
+                    position_ms=self._server_position_ms(state),
+                )
 
             # Pause/Play transition
             if is_paused:
-                if (
-                    self.media_player.playbackState()
-                    == QMediaPlayer.PlaybackState.PlayingState
-                ):
+                if self.is_playing():
                     self.media_player.pause()
             else:
-                if (
-                    self.media_player.playbackState()
-                    != QMediaPlayer.PlaybackState.PlayingState
-                    and current_song_id
-                ):
+                if not self.is_playing() and current_song_id:
                     self.media_player.play()
         else:
             # We are a controller: Stop local playback if it was running
-            if (
-                self.media_player.playbackState()
-                == QMediaPlayer.PlaybackState.PlayingState
-            ):
+            if self.is_playing():
                 self.media_player.stop()
 
             # Still update the UI to show what's playing elsewhere
             if current_song_id and current_song_id != self.current_track_id:
                 self._update_ui_for_track(current_song_id)
 
-        # Update Controls UI
+        # Update Controls UI and MPRIS
         self.controls.set_playing(not is_paused)
-        self.controls.set_shuffle(self.shuffle_enabled)
-        self.controls.set_repeat(self.repeat_mode)
-        self.audio_output.setVolume(state.get("volume", self.audio_output.volume()))
-
-        # Update MPRIS
         self.mpris.update_status("Paused" if is_paused else "Playing")
-        self.mpris.update_volume(self.audio_output.volume())
 
-        # Store last state for position prediction
-        self.last_server_state = state
+    def _apply_position_state(self, state, changed):
+        """Position Sync (only if not seeking locally)"""
+        if self.role != "player" or self.is_seeking:
+            return
+        if changed & {"role", "current_song"}:
+            return  # Playback handler already started at the right position
+        current_song_id = state.get("current_song")
+        if current_song_id and current_song_id == self.current_track_id:
+            target_pos_ms = self._server_position_ms(state)
+            diff = abs(self.media_player.position() - target_pos_ms)
+            if diff > 2000:
+                self.media_player.setPosition(max(0, target_pos_ms))
+
+    def _server_position_ms(self, state):
+        start_pos = state.get("start_position", 0)
+        if state.get("pause", False):
+            return int(start_pos * 1000)
+        start_time = state.get("start_time", 0)
+        return int((time.time() - (start_time - start_pos)) * 1000)
+
+    def _apply_volume_state(self, state, changed):
+        self.audio_output.setVolume(state.get("volume", self.audio_output.volume()))
+        self.mpris.update_volume(self.audio_output.volume())
 
     def _update_ui_for_track(self, track_id):
         """Update Now Playing UI without starting playback (for controller role)."""
@@ -216,12 +322,7 @@ class iBroadcastNative(QMainWindow):
         self.controls.set_track_info(track, album, artists, album_artists, artwork_url)
 
         # Update selected track in current view
-        if self.content_stack.currentWidget() == self.album_detail_view:
-            self.album_detail_view.album_track_list.set_selected_track(track_id)
-        elif self.content_stack.currentWidget() == self.playlist_detail_view:
-            self.playlist_detail_view.album_track_list.set_selected_track(track_id)
-        elif self.content_stack.currentWidget() == self.artist_discography_view:
-            self.artist_discography_view.set_selected_track(track_id)
+        self._select_track_in_current_view(track_id)
 
         # Update MPRIS metadata
         self.mpris.update_metadata(
@@ -236,10 +337,12 @@ class iBroadcastNative(QMainWindow):
         )
 
     def push_state_to_server(self):
-        """Construct state from local player and send to server."""
-        if not self.socket.is_connected:
-            return
+        """Mark the local state dirty; the publisher coalesces and sends it."""
+        if self.state_publisher:
+            self.state_publisher.mark_dirty()
 
+    def build_state(self):
+        """Construct state from local player for the server."""
         # iBroadcast logic: role "player" is responsible for advancing state.
         if self.role != "player":
             # Controllers usually don't push state unless they are explicitly changing something
@@ -248,9 +351,7 @@ class iBroadcastNative(QMainWindow):
             # the server will send a set_state command to all OTHER clients."
             pass
 
-        is_paused = (
-            self.media_player.playbackState() != QMediaPlayer.PlaybackState.PlayingState
-        )
+        is_paused = not self.is_playing()
 
         # Values
         state = {
@@ -271,7 +372,7 @@ class iBroadcastNative(QMainWindow):
             "volume": self.audio_output.volume(),
         }
 
-        self.socket.send_set_state(state)
+        return state
 
     def init_navigation_stack(self):
         """Initialize the navigation stack and last search query."""
@@ -335,15 +436,17 @@ class iBroadcastNative(QMainWindow):
         self.login_screen.loginRequested.connect(self.on_login_requested)
         self.root_stack.addWidget(self.login_screen)
 
-        # 2. Main App Container
+        # 2. Main App Container, filled in by init_deferred
         self.main_app_widget = QWidget()
-        self.setup_main_app_ui(self.main_app_widget)
         self.root_stack.addWidget(self.main_app_widget)
 
         # Default to login screen (hidden until check_auth decides)
         self.root_stack.setCurrentWidget(self.login_screen)
 
     def setup_main_app_ui(self, central_widget):
+        # PlayerControls pulls in QtWebEngine, the heaviest import of the app
+        from src.ui.player.player_controls import PlayerControls
+
         main_layout = QVBoxLayout(central_widget)
         main_layout.setContentsMargins(0, 0, 0, 0)
         main_layout.setSpacing(0)
@@ -371,8 +474,13 @@ class iBroadcastNative(QMainWindow):
         self.back_btn.clicked.connect(self.go_back)
         top_bar_layout.addWidget(self.back_btn)
 
+        self.search_controller = SearchController(self.api)
+        self.search_controller.resultsReady.connect(self.show_search_results)
+
         self.search_header = SearchHeader()
-        self.search_header.searchTextChanged.connect(self.handle_search)
+        self.search_header.searchTextChanged.connect(
+            lambda text: self.handle_search(text, immediate=False)
+        )
         top_bar_layout.addWidget(self.search_header)
 
         main_layout.addLayout(top_bar_layout)
@@ -393,41 +501,10 @@ class iBroadcastNative(QMainWindow):
         self.artist_header = ArtistHeader()
         self._showing_artist_albums = False
 
+        # The views are built on first navigation, see the lazy_view builders below
         self.content_stack = QStackedWidget()
-        self.artists_view = LibraryGrid(self.show_artist_albums, self.api)
-        self.albums_view = LibraryGrid(self.show_album_detail, self.api)
-        self.artist_discography_view = ArtistDiscographyView(self.api)
-        self.playlists_view = LibraryGrid(self.show_playlist_detail, self.api)
-        self.search_results_view = LibraryGrid(
-            self.handle_search_result_click, self.api
-        )
-        self.album_detail_view = AlbumDetailView()
-        self.album_detail_view.playTrackRequested.connect(self.play_track_from_album)
-        self.album_detail_view.upButtonClicked.connect(self.show_artist_albums)
-        self.playlist_detail_view = PlaylistDetailView()
-        self.playlist_detail_view.playTrackRequested.connect(
-            self.play_track_from_playlist
-        )
-        self.playlist_detail_view.upButtonClicked.connect(self.load_playlists)
-
-        self.content_stack.addWidget(self.artists_view)
-        self.content_stack.addWidget(self.albums_view)
-        self.content_stack.addWidget(self.artist_discography_view)
-        self.content_stack.addWidget(self.playlists_view)
-        self.content_stack.addWidget(self.album_detail_view)
-        self.content_stack.addWidget(self.playlist_detail_view)
-        self.content_stack.addWidget(self.search_results_view)
-
         content_layout.addWidget(self.content_stack)
 
-        self.album_detail_view.album_track_list.trackContextMenuRequested.connect(
-            self.show_track_context_menu_album
-        )
-
-        self.playlist_detail_view.album_track_list.trackContextMenuRequested.connect(
-            self.show_track_context_menu_playlist
-        )
-
         body_layout.addWidget(self.content_container)
 
         self.queue_sidebar = QueueSidebar()
@@ -454,22 +531,87 @@ class iBroadcastNative(QMainWindow):
         self.controls.albumClicked.connect(self.show_album_detail)
         self.controls.artistClicked.connect(self.show_artist_albums)
 
-        self.album_detail_view.playTrackRequested.connect(self.play_track_by_id)
-        self.album_detail_view.artistClicked.connect(self.show_artist_albums)
-        self.playlist_detail_view.playTrackRequested.connect(self.play_track_by_id)
-        self.playlist_detail_view.artistClicked.connect(self.show_artist_albums)
+    # --- VIEWS (built on first use) ---
+    def _library_grid(self, on_click):
+        from src.ui.grid.library_grid import LibraryGrid
+
+        view = LibraryGrid(on_click, self.api)
+        self.content_stack.addWidget(view)
+        return view
+
+    @lazy_view
+    def artists_view(self):
+        return self._library_grid(self.show_artist_albums)
+
+    @lazy_view
+    def albums_view(self):
+        return self._library_grid(self.show_album_detail)
+
+    @lazy_view
+    def playlists_view(self):
+        return self._library_grid(self.show_playlist_detail)
+
+    @lazy_view
+    def search_results_view(self):
+        return self._library_grid(self.handle_search_result_click)
+
+    @lazy_view
+    def artist_discography_view(self):
+        from src.ui.artist.artist_discography_view import ArtistDiscographyView
+
+        view = ArtistDiscographyView(self.api)
+        view.playTrackRequested.connect(self.play_track_solo)
+        view.playAlbumRequested.connect(self.play_album)
+        view.artistClicked.connect(self.show_artist_albums)
+        view.upButtonClicked.connect(self.show_artists)
+        self.content_stack.addWidget(view)
+        return view
+
+    @lazy_view
+    def album_detail_view(self):
+        from src.ui.album.album_detail_view import AlbumDetailView
+
+        view = AlbumDetailView()
+        view.playTrackRequested.connect(self.play_track_from_album)
+        view.upButtonClicked.connect(self.show_artist_albums)
+        view.album_track_list.trackContextMenuRequested.connect(
+            self.show_track_context_menu_album
+        )
+        view.playTrackRequested.connect(self.play_track_by_id)
+        view.artistClicked.connect(self.show_artist_albums)
+        view.album_header.playButtonClicked.connect(
+            lambda: self.play_album(self.current_album_id)
+        )
+        self.content_stack.addWidget(view)
+        return view
 
-        self.artist_discography_view.playTrackRequested.connect(self.play_track_solo)
-        self.artist_discography_view.playAlbumRequested.connect(self.play_album)
-        self.artist_discography_view.artistClicked.connect(self.show_artist_albums)
-        self.artist_discography_view.upButtonClicked.connect(self.show_artists)
+    @lazy_view
+    def playlist_detail_view(self):
+        from src.ui.playlist.playlist_detail_view import PlaylistDetailView
 
-        self.album_detail_view.album_header.playButtonClicked.connect(
-            lambda: self.play_album(self.current_album_id)
+        view = PlaylistDetailView()
+        view.playTrackRequested.connect(self.play_track_from_playlist)
+        view.upButtonClicked.connect(self.load_playlists)
+        view.album_track_list.trackContextMenuRequested.connect(
+            self.show_track_context_menu_playlist
         )
-        self.playlist_detail_view.playlist_header.playButtonClicked.connect(
+        view.playTrackRequested.connect(self.play_track_by_id)
+        view.artistClicked.connect(self.show_artist_albums)
+        view.playlist_header.playButtonClicked.connect(
             lambda: self.play_playlist(self.current_playlist_id)
         )
+        self.content_stack.addWidget(view)
+        return view
+
+    def _is_current_view(self, name):
+        """Whether the lazy view name is on screen, without building it"""
+        return is_built(self, name) and self.content_stack.currentWidget() is getattr(self, name)
+
+    def _select_track_in_current_view(self, track_id):
+        for name in ("album_detail_view", "playlist_detail_view", "artist_discography_view"):
+            if self._is_current_view(name):
+                getattr(self, name).set_selected_track(track_id)
+                return
 
     def show_artists(self):
         self.switch_view(0)
@@ -508,10 +650,14 @@ class iBroadcastNative(QMainWindow):
 
     def show_options(self):
         """Show the options dialog - NEW"""
+        from src.ui.utils.options_dialog import OptionsDialog
+
         dialog = OptionsDialog(self.api, self, on_close_callback=self.check_auth)
         dialog.exec()
 
     def show_track_context_menu_album(self, track, global_pos):
+        from src.ui.utils.context_menus import TrackContextMenu
+
         menu = TrackContextMenu(self, is_playlist=False)
         menu.play_action.triggered.connect(lambda: self.play_track_by_id(track.id))
         menu.add_next_action.triggered.connect(
@@ -524,6 +670,8 @@ class iBroadcastNative(QMainWindow):
         menu.exec(global_pos)
 
     def show_track_context_menu_playlist(self, track, global_pos):
+        from src.ui.utils.context_menus import TrackContextMenu
+
         menu = TrackContextMenu(self, is_playlist=True)
         menu.play_action.triggered.connect(lambda: self.play_track_by_id(track.id))
         menu.add_next_action.triggered.connect(
@@ -544,8 +692,10 @@ class iBroadcastNative(QMainWindow):
         if album:
             self.show_album_detail(album.id)
 
-    def handle_search(self, text):
+    @timed("ui.handle_search")
+    def handle_search(self, text, immediate=True):
         if len(text) < 3:
+            self.search_controller.cancel()
             # Pop the existing search page
             if (
                 self.navigation_stack
@@ -562,30 +712,17 @@ class iBroadcastNative(QMainWindow):
             self.push_page({"type": "Search", "query": query})
         self._last_search_query = query
 
-        self.artist_header.setVisible(False)
-
-        results = self.api.search(text)
+        # Results arrive asynchronously in show_search_results
+        if immediate:
+            self.search_controller.search_now(text)
+        else:
+            self.search_controller.set_query(text)
 
+    def show_search_results(self, query, results):
+        self.artist_header.setVisible(False)
         self.search_results_view.clear()
-        for result in results:
-            artwork_id = 0
-            if isinstance(result, Artist):
-                artwork_id = result.artwork_id
-            elif isinstance(result, Album):
-                tracks = self.api.get_tracks_by_album(result.id)
-                for track in tracks:
-                    if track.artwork_id != 0:
-                        artwork_id = track.artwork_id
-                        break
-            elif isinstance(result, Track):
-                artwork_id = result.artwork_id
-            elif isinstance(result, Playlist):
-                artwork_id = result.artwork_id
-            else:
-                continue
-            self.search_results_view.add_item(
-                result, self.api.get_artwork_url(artwork_id)
-            )
+        for result, artwork_url in results:
+            self.search_results_view.add_item(result, artwork_url)
         self.content_stack.setCurrentWidget(self.search_results_view)
 
     def check_auth(self):
@@ -602,65 +739,35 @@ class iBroadcastNative(QMainWindow):
 
     def on_login_requested(self):
         """Called when user clicks login on the LoginScreen"""
-        # Credentials are already saved, re-initialize API with new keys
-        self.api = iBroadcastAPI()
-        # Try to use cached token first
-        if self.api.access_token:
-            res = self.api.load_library()
-            if res.get("success"):
-                self.root_stack.setCurrentWidget(self.main_app_widget)
-                self.navigation_stack = []
-                self.push_page({"type": "Navigation", "id": 0})
-                self.load_artists()
-                self.connect_to_queue()
-                return
-        # If no token or invalid, start OAuth flow
-        self.start_login_flow()
-
-    def start_login_flow(self):
-        """Initiate OAuth flow"""
-        self.root_stack.setCurrentWidget(self.login_screen)
-        auth_res = self.api.start_oauth_flow()
-        if "auth_url" in auth_res:
-            webbrowser.open(auth_res["auth_url"])
-            self.oauth_poll_timer = QTimer()
-            self.oauth_poll_timer.setInterval(1000)
-            self.oauth_poll_timer.timeout.connect(self.poll_oauth_callback)
-            self.oauth_poll_timer.start()
-        else:
-            self.login_screen.set_error(
-                auth_res.get("message", "Failed to start login flow")
-            )
+        # Credentials are already saved; the same API picks them up, so only
+        # one token refresh timer ever writes token.json
+        self.login_controller.cancel()
+        self.api.reload_credentials()
+        # Cached token first, then the browser flow; both finish off the UI thread
+        self.login_controller.login()
+
+    def on_login_required(self):
+        """The refresh token was rejected: drop the queue session and show the login screen"""
+        self.login_controller.cancel()
+        if self.socket is not None:
+            self.socket.disconnect_from_server()
+        self.check_auth()
 
-    def poll_oauth_callback(self):
-        status = self.api.check_callback_status()
-        if status.get("success") and "code" in status:
-            self.oauth_poll_timer.stop()
-            token_res = self.api.exchange_code_for_token(status["code"])
-            if token_res.get("success"):
-                lib_res = self.api.load_library()
-                if lib_res.get("success"):
-                    self.root_stack.setCurrentWidget(self.main_app_widget)
-                    self.load_artists()
-                    self.connect_to_queue()  # Connect to WS
-                else:
-                    self.login_screen.set_error("Failed to load library after login.")
-            else:
-                self.login_screen.set_error(
-                    f"Login failed: {token_res.get('message', 'Unknown error')}"
-                )
-        elif not status.get("pending", False):
-            self.oauth_poll_timer.stop()
-            self.login_screen.set_error(
-                f"Login failed: {status.get('message', 'Unknown error')}"
-            )
+    def on_login_succeeded(self):
+        self.root_stack.setCurrentWidget(self.main_app_widget)
+        self.navigation_stack = []
+        self.push_page({"type": "Navigation", "id": 0})
+        self.load_artists()
+        self.connect_to_queue()
 
     def switch_view(self, index, push_to_stack=True):
+        # A search still in flight must not pull the user back to results
+        self.search_controller.cancel()
         if push_to_stack:
             # User clicked a sidebar navigation link: reset stack to just this root
             self.navigation_stack = []
             self.push_page({"type": "Navigation", "id": index})
-        self.content_stack.setCurrentIndex(index)
+        # Each load_* method raises its own view
         self.current_album_id = None
         self._showing_artist_albums = False
 
@@ -855,10 +962,10 @@ class iBroadcastNative(QMainWindow):
 
         try:
             track_index = self._current_album_tracks.index(track_id)
-            self.tracks = self._current_album_tracks.copy()
+            self.tracks.assign(self._current_album_tracks)
             self.play_index = track_index
             self.play_from = "tracks"
-            self.play_next_queue = []
+            self.play_next_queue.clear()
 
             self.update_queue_display()
             self.play_track_by_id(track_id)
@@ -872,10 +979,10 @@ class iBroadcastNative(QMainWindow):
             return
 
         track_id = self._current_album_tracks[row]
-        self.tracks = self._current_album_tracks.copy()
+        self.tracks.assign(self._current_album_tracks)
         self.play_index = row
         self.play_from = "tracks"
-        self.play_next_queue = []
+        self.play_next_queue.clear()
 
         self.update_queue_display()
         self.play_track_by_id(track_id)
@@ -903,10 +1010,10 @@ class iBroadcastNative(QMainWindow):
             return
         try:
             track_index = self._current_playlist_tracks.index(track_id)
-            self.tracks = self._current_playlist_tracks.copy()
+            self.tracks.assign(self._current_playlist_tracks)
             self.play_index = track_index
             self.play_from = "tracks"
-            self.play_next_queue = []
+            self.play_next_queue.clear()
 
             self.update_queue_display()
             self.play_track_by_id(track_id)
@@ -920,10 +1027,10 @@ class iBroadcastNative(QMainWindow):
             return
 
         track_id = self._current_playlist_tracks[row]
-        self.tracks = self._current_playlist_tracks.copy()
+        self.tracks.assign(self._current_playlist_tracks)
         self.play_index = row
         self.play_from = "tracks"
-        self.play_next_queue = []
+        self.play_next_queue.clear()
 
         self.update_queue_display()
         self.play_track_by_id(track_id)
@@ -937,19 +1044,31 @@ class iBroadcastNative(QMainWindow):
         self.update_queue_display()
         self.push_state_to_server()
 
+    @timed("ui.play_track_by_id")
     def play_track_by_id(
         self, track_id, from_server=False, start_playing=True, position_ms=0
     ):
-        track = self.api.get_track_by_id(track_id)
-        artists = self.api.get_artists_by_track(track_id)
-        album = self.api.get_album_by_track(track_id)
+        preloaded = self.preloader.take(track_id)
+        if preloaded:
+            track = preloaded.track
+            artists = preloaded.artists
+            album = preloaded.album
+            album_artists = preloaded.album_artists
+        else:
+            track = self.api.get_track_by_id(track_id)
+            artists = self.api.get_artists_by_track(track_id)
+            album = self.api.get_album_by_track(track_id)
 
-        album_artists = self.api.get_artists_with_albums()
+            album_artists = self.api.get_artists_with_albums()
 
         if track:
-            url = self.api.get_stream_url(track_id)
             self.pending_seek_ms = position_ms
-            self.media_player.setSource(QUrl(url))
+            if preloaded:
+                # Already buffered in the standby player: just swap it in
+                self._swap_media_player(preloaded.player)
+            else:
+                url = self.api.get_stream_url(track_id)
+                self.media_player.setSource(QUrl(url))
 
             # Reset UI progress immediately for visual feedback
             self.controls.progress.setValue(0)
@@ -977,7 +1096,12 @@ class iBroadcastNative(QMainWindow):
             }
             self.track_duration = track.length if track else 0  # Duration in seconds
 
-            artwork_url = self.api.get_artwork_url(track.artwork_id if track else None)
+            if preloaded:
+                artwork_url = preloaded.artwork_url
+            else:
+                artwork_url = self.api.get_artwork_url(
+                    track.artwork_id if track else None
+                )
 
             self.controls.set_track_info(
                 track, album, artists, album_artists, artwork_url
@@ -985,12 +1109,7 @@ class iBroadcastNative(QMainWindow):
             self.controls.set_playing(start_playing)
 
             # Update selected track in current view
-            if self.content_stack.currentWidget() == self.album_detail_view:
-                self.album_detail_view.set_selected_track(track_id)
-            elif self.content_stack.currentWidget() == self.playlist_detail_view:
-                self.playlist_detail_view.set_selected_track(track_id)
-            elif self.content_stack.currentWidget() == self.artist_discography_view:
-                self.artist_discography_view.set_selected_track(track_id)
+            self._select_track_in_current_view(track_id)
 
             # Update MPRIS metadata
             self.mpris.update_metadata(
@@ -1007,30 +1126,89 @@ class iBroadcastNative(QMainWindow):
 
             self.update_queue_display()
 
+            # Keep the current and upcoming tracks available offline
+            self.api.precache_tracks([track_id] + self.upcoming_track_ids(3))
+
             if not from_server:
                 self.push_state_to_server()
 
+    def _swap_media_player(self, player):
+        """Replace the active QMediaPlayer with a preloaded one"""
+        from PyQt6.QtMultimedia import QMediaPlayer
+        from src.core.track_preloader import swap_players
+
+        self.media_player = swap_players(self.media_player, player, self.audio_output, self._player_slots())
+
+        # The standby player may already be past the status that applies seeks
+        if self.pending_seek_ms > 0 and player.mediaStatus() in (
+            QMediaPlayer.MediaStatus.LoadedMedia,
+            QMediaPlayer.MediaStatus.BufferedMedia,
+        ):
+            player.setPosition(self.pending_seek_ms)
+            self.pending_seek_ms = 0
+
+    def upcoming_track_ids(self, count):
+        """The next few track ids in play order, for prefetching"""
+        if self.play_from == "play_next":
+            upcoming = list(self.play_next_queue[1:])
+        else:
+            upcoming = list(self.play_next_queue)
+        upcoming += self.tracks[self.play_index + 1 : self.play_index + 1 + count]
+        return upcoming[:count]
+
+    def on_media_error(self, error, error_string=""):
+        """Resume from the audio cache if the network stream fails"""
+        if not self.current_track_id:
+            return
+        source = self.media_player.source()
+        if source.isLocalFile():
+            return
+        cached_url = self.api.get_cached_stream_url(self.current_track_id)
+        if cached_url:
+            position = self.media_player.position()
+            self.pending_seek_ms = position
+            self.media_player.setSource(QUrl(cached_url))
+            self.media_player.play()
+
+    def peek_next_track_id(self):
+        """Predict which track play_next() will start, without changing state"""
+        if self.repeat_mode == "track":
+            return None  # Same source, play_next only rewinds
+        if self.play_from == "play_next" or len(self.play_next_queue) > 0:
+            if len(self.play_next_queue) > 1:
+                return self.play_next_queue[1]
+            if len(self.play_next_queue) == 1:
+                if self.play_index < len(self.tracks):
+                    return self.tracks[self.play_index]
+                return None
+        next_index = self.play_index + 1
+        if next_index < len(self.tracks):
+            return self.tracks[next_index]
+        if self.repeat_mode == "queue" and self.tracks:
+            return self.tracks[0]
+        return None
+
+    def preload_next_track(self, remaining_ms):
+        """Buffer the upcoming track once the current one is about to end"""
+        if remaining_ms > self.preloader.lookahead_seconds * 1000:
+            return
+        next_id = self.peek_next_track_id()
+        if next_id and next_id != self.current_track_id:
+            self.preloader.prepare(next_id)
+
     def on_playback_state_changed(self, state):
         """Handle playback state changes"""
         # We push state when play/pause changes locally
         self.push_state_to_server()
 
         # Update MPRIS status
-        is_playing = (
-            self.media_player.playbackState() == QMediaPlayer.PlaybackState.PlayingState
-        )
-        self.mpris.update_status("Playing" if is_playing else "Paused")
+        self.mpris.update_status("Playing" if self.is_playing() else "Paused")
 
     def toggle_play(self):
         # Propagate currently playing song to all views
-        if self.content_stack.currentWidget() == self.album_detail_view:
-            self.album_detail_view.set_selected_track(self.current_track_id)
-        elif self.content_stack.currentWidget() == self.playlist_detail_view:
-            self.playlist_detail_view.set_selected_track(self.current_track_id)
-        elif self.content_stack.currentWidget() == self.artist_discography_view:
-            self.artist_discography_view.set_selected_track(self.current_track_id)
-            
-        if self.media_player.playbackState() == QMediaPlayer.PlaybackState.PlayingState:
+        self._select_track_in_current_view(self.current_track_id)
+
+        if self.is_playing():
             self.media_player.pause()
             self.controls.set_playing(False)
         else:
@@ -1174,19 +1352,20 @@ class iBroadcastNative(QMainWindow):
             self.controls.progress.setValue(int(pos))
             self.controls.update_time_labels(current_ms // 1000, total_ms // 1000)
 
+            if self.role == "player" and self.is_playing():
+                self.preload_next_track(total_ms - current_ms)
+
         # 2. Periodic State Sync (every 2 seconds)
         now = time.time()
         if now - self.last_sync_time >= 2.0:
-            if (
-                self.role == "player"
-                and self.media_player.playbackState()
-                == QMediaPlayer.PlaybackState.PlayingState
-            ):
-                self.push_state_to_server()
+            if self.role == "player" and self.is_playing():
+                self.state_publisher.mark_position()
             self.last_sync_time = now
 
     def on_media_status_changed(self, status):
         """Handle media player status changes"""
+        from PyQt6.QtMultimedia import QMediaPlayer
+
         if (
             status == QMediaPlayer.MediaStatus.LoadedMedia
             or status == QMediaPlayer.MediaStatus.BufferedMedia
@@ -1196,15 +1375,29 @@ class iBroadcastNative(QMainWindow):
                 self.pending_seek_ms = 0
 
         if status == QMediaPlayer.MediaStatus.EndOfMedia:
-            # Report play history before moving to next track
+            # Journal play history before moving to next track; reported in the background
             if self.current_track_id and self.current_track_start_time:
-                self.api.report_history(
+                self.api.queue_history(
                     self.current_track_id, self.current_track_start_time
                 )
             self.play_next()
 
-    def update_queue_display(self):
+    @timed("ui.update_queue_display")
+    def update_queue_display(self, force=False):
         """Update the queue sidebar display from tracks/play_next state"""
+        # Skip the rebuild if nothing the sidebar shows has changed
+        key = (
+            self.tracks.content_hash,
+            self.play_next_queue.content_hash,
+            self.play_index,
+            self.play_from,
+            self.current_track_id,
+        )
+        if not force and key == self._queue_display_key:
+            instrumentation.count("ui.update_queue_display.skipped")
+            return
+        self._queue_display_key = key
+
         tracks_data = []
 
         # 1. Show Up Next
@@ -1275,8 +1468,9 @@ class iBroadcastNative(QMainWindow):
         self.push_state_to_server()
 
     def clear_queue(self):
-        self.tracks = []
-        self.play_next_queue = []
+        self.preloader.clear()
+        self.tracks.clear()
+        self.play_next_queue.clear()
         self.play_index = 0
         self.play_from = "tracks"
         self.current_track_id = None
@@ -1294,7 +1488,7 @@ class iBroadcastNative(QMainWindow):
             track_id = self.play_next_queue[index]
             # iBroadcast logic: play_next is consumed.
             # If we jump to the 5th item, items 0-4 are removed.
-            self.play_next_queue = self.play_next_queue[index:]
+            self.play_next_queue.assign(self.play_next_queue[index:])
             self.play_from = "play_next"
             self.play_track_by_id(track_id)
         else:
@@ -1328,17 +1522,39 @@ class iBroadcastNative(QMainWindow):
     def closeEvent(self, a0):
         """Pause playback on server when closing if we are the player"""
         if self.role == "player":
-            if (
-                self.media_player.playbackState()
-                == QMediaPlayer.PlaybackState.PlayingState
-            ):
+            if self.is_playing():
                 self.media_player.pause()
                 # We need to force a sync before the socket closes
                 self.push_state_to_server()
+                self.state_publisher.flush()
                 # Give a small moment for the push to go out
                 time.sleep(0.5)
+        self.login_controller.cancel()
+        self.api.shutdown()
+        if os.environ.get(DUMP_ENV):
+            try:
+                instrumentation.dump(os.environ[DUMP_ENV])
+            except Exception as e:
+                print(f"Failed to write profile: {e}")
+        if self.query_tracer:
+            self.query_tracer.write_summary()
+        if self.stall_detector:
+            self.stall_detector.stop()
+            try:
+                self.stall_detector.dump(os.environ.get(REPORT_ENV, DEFAULT_REPORT))
+            except Exception as e:
+                print(f"Failed to write stall report: {e}")
         super().closeEvent(a0)
 
+    def trace_queries(self):
+        """With PYBROADCAST_SQL_TRACE=1, trace the library database; one event loop pass is one UI action"""
+        if os.environ.get(TRACE_ENV) != "1":
+            return
+        if self.query_tracer is None:
+            self.query_tracer = QueryTracer.from_env()
+            self.query_tracer.defer = lambda callback: QTimer.singleShot(0, callback)
+        self.query_tracer.install(self.api.db)
+
     def play_track_solo(self, track_id):
         if not track_id:
             return
@@ -1353,10 +1569,10 @@ class iBroadcastNative(QMainWindow):
             tracks.sort(
                 key=lambda x: x.track_number if x.track_number is not None else 0
             )
-            self.tracks = [t.id for t in tracks]
+            self.tracks.assign([t.id for t in tracks])
             self.play_index = 0
             self.play_from = "tracks"
-            self.play_next_queue = []
+            self.play_next_queue.clear()
             self.update_queue_display()
             self.play_track_by_id(self.tracks[0])
 
@@ -1365,16 +1581,20 @@ class iBroadcastNative(QMainWindow):
             return
         tracks = self.api.get_playlist_tracks(playlist_id)
         if tracks:
-            self.tracks = [t.id for t in tracks]
+            self.tracks.assign([t.id for t in tracks])
             self.play_index = 0
             self.play_from = "tracks"
-            self.play_next_queue = []
+            self.play_next_queue.clear()
             self.update_queue_display()
             self.play_track_by_id(self.tracks[0])
 
 
 if __name__ == "__main__":
+    print_startup_profile = PROFILE_FLAG in sys.argv
+    if print_startup_profile:
+        sys.argv.remove(PROFILE_FLAG)
     app = QApplication(sys.argv)
+    startup.mark("QApplication")
     # Load NataSans font
     font_path = os.path.join(
         os.path.dirname(__file__), "assets", "font", "NataSans.ttf"
@@ -1383,6 +1603,8 @@ if __name__ == "__main__":
     if font_id != -1:
         family = QFontDatabase.applicationFontFamilies(font_id)[0]
         app.setFont(QFont(family))
+    startup.mark("fonts")
     window = iBroadcastNative()
+    window.print_startup_profile = print_startup_profile
     window.showMaximized()
     sys.exit(app.exec())
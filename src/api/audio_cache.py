@@ -0,0 +1,180 @@
+import hashlib
+import os
+import queue
+import threading
+import requests
+from collections import OrderedDict
+from pathlib import Path
+
+class AudioCache:
+    """
+    Size-bounded LRU store of downloaded tracks, keyed by Track.file.
+    Recency is persisted through file mtimes so the LRU order survives restarts.
+    """
+
+    def __init__(self, cache_dir="cache/audio", max_bytes=1024 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+        # path name -> size, least recently used first
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self._load_index()
+
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+        self.download_queue = queue.Queue()
+        self.pending = set()
+        self.worker = None
+
+    def _load_index(self):
+        files = [f for f in self.cache_dir.glob("*.audio") if f.is_file()]
+        for f in sorted(files, key=lambda f: f.stat().st_mtime):
+            size = f.stat().st_size
+            self.entries[f.name] = size
+            self.total_bytes += size
+        # Leftovers from interrupted downloads
+        for f in self.cache_dir.glob("*.part"):
+            try:
+                f.unlink()
+            except Exception as e:
+                pass
+
+    def get_cache_path(self, file_key):
+        """Generate absolute cache file path for a Track.file value"""
+        digest = hashlib.sha1(str(file_key).encode("utf-8")).hexdigest()
+        return (self.cache_dir / f"{digest}.audio").resolve()
+
+    def is_cached(self, file_key):
+        """Check if a track is already cached"""
+        if not file_key:
+            return False
+        with self.lock:
+            return self.get_cache_path(file_key).name in self.entries
+
+    def get_cached_url(self, file_key):
+        """Get file:// URL for a cached track and record a hit, or record a miss"""
+        if not file_key:
+            return None
+        cache_path = self.get_cache_path(file_key)
+        with self.lock:
+            size = self.entries.get(cache_path.name)
+            if size is None or not cache_path.exists():
+                self.entries.pop(cache_path.name, None)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(cache_path.name)
+            self.hits += 1
+            self.bytes_saved += size
+        try:
+            os.utime(cache_path)
+        except Exception as e:
+            pass
+        return cache_path.as_uri()
+
+    def download_and_cache(self, url, file_key):
+        """Download a track into the cache, evicting least recently used tracks"""
+        if not url or not file_key:
+            return None
+        cache_path = self.get_cache_path(file_key)
+        if self.is_cached(file_key):
+            return cache_path.as_uri()
+
+        part_path = cache_path.with_suffix(".part")
+        try:
+            with requests.get(url, stream=True, timeout=30) as response:
+                response.raise_for_status()
+                with open(part_path, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        f.write(chunk)
+            size = part_path.stat().st_size
+            if size > self.max_bytes:
+                part_path.unlink()
+                return None
+            with self.lock:
+                self._evict(size)
+                os.replace(part_path, cache_path)
+                self.entries[cache_path.name] = size
+                self.total_bytes += size
+            return cache_path.as_uri()
+        except Exception as e:
+            try:
+                part_path.unlink()
+            except Exception:
+                pass
+            return None
+
+    def _evict(self, incoming_bytes):
+        """Drop least recently used tracks until incoming_bytes fits. Lock must be held."""
+        while self.entries and self.total_bytes + incoming_bytes > self.max_bytes:
+            name, size = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                (self.cache_dir / name).unlink()
+            except Exception as e:
+                pass
+
+    def prefetch(self, url, file_key):
+        """Queue a background download unless the track is cached or already queued"""
+        if not url or not file_key or self.is_cached(file_key):
+            return
+        with self.lock:
+            if file_key in self.pending:
+                return
+            self.pending.add(file_key)
+            self.download_queue.put((url, file_key))
+            if self.worker is None:
+                self.worker = threading.Thread(target=self._run_downloads, daemon=True)
+                self.worker.start()
+
+    def _run_downloads(self):
+        while True:
+            try:
+                url, file_key = self.download_queue.get(timeout=5)
+            except queue.Empty:
+                with self.lock:
+                    if self.download_queue.empty():
+                        self.worker = None
+                        return
+                continue
+            try:
+                self.download_and_cache(url, file_key)
+            finally:
+                with self.lock:
+                    self.pending.discard(file_key)
+
+    def get_stats(self):
+        """Hit rate and bytes served from disk instead of the network"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "bytes_saved": self.bytes_saved,
+                "size": self.total_bytes,
+                "count": len(self.entries),
+            }
+
+    def clear_cache(self):
+        """Clear all cached tracks"""
+        with self.lock:
+            for name in list(self.entries):
+                try:
+                    (self.cache_dir / name).unlink()
+                except Exception as e:
+                    pass
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def get_cache_size(self):
+        """Get total size of cache in bytes"""
+        return self.total_bytes
+
+    def get_cache_count(self):
+        """Get number of cached tracks"""
+        return len(self.entries)
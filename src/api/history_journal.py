@@ -0,0 +1,118 @@
+import threading
+from typing import Callable, Dict, List
+
+
+def build_history(plays: List[tuple]) -> List[Dict]:
+    """
+    Group (play_id, track_id, ts) rows into the API's multi-day history array:
+    one entry per day with play counts and per-play detail keyed by track id.
+    """
+    days = {}
+    for _, track_id, ts in plays:
+        day = ts.split(" ")[0]
+        entry = days.setdefault(day, {"day": day, "plays": {}, "detail": {}})
+        key = str(track_id)
+        entry["plays"][key] = entry["plays"].get(key, 0) + 1
+        entry["detail"].setdefault(key, []).append({"event": "play", "ts": ts})
+    return list(days.values())
+
+
+class HistoryUnavailable(Exception):
+    """The history could not be delivered right now (offline, logged out, server error)"""
+
+
+class HistoryJournal:
+    """
+    Durable queue of plays waiting to be reported.
+    Plays are written to the Play_History table first, then a background worker
+    sends them in batches and only deletes them once the server accepted them.
+    Failed sends are retried with exponential backoff; anything left over is
+    picked up again on the next start.
+    send_history returns False when the server rejected the batch and raises
+    when it could not be delivered. Only rejections count toward
+    max_attempts, so plays made offline are kept however long that lasts.
+    """
+
+    def __init__(self, db, send_history: Callable[[List[Dict]], bool], batch_size: int = 100,
+                 retry_delay: float = 5.0, max_retry_delay: float = 600.0, max_attempts: int = 20):
+        self.db = db
+        self.send_history = send_history
+        self.batch_size = batch_size
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.max_attempts = max_attempts
+
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stopped = False
+        self.worker = None
+        self.failures = 0
+
+    def record(self, track_id: int, timestamp: str):
+        """Journal a play and let the worker report it"""
+        try:
+            self.db.add_play_history(track_id, timestamp)
+        except Exception as e:
+            print(f"Error journaling play: {e}")
+            return
+        self.flush()
+
+    def flush(self):
+        """Wake the worker, starting it if needed"""
+        with self.lock:
+            self.stopped = False
+            if self.worker is None:
+                self.worker = threading.Thread(target=self._run, daemon=True)
+                self.worker.start()
+        self.wake.set()
+
+    def pending_count(self) -> int:
+        return self.db.count_pending_play_history()
+
+    def stop(self):
+        with self.lock:
+            self.stopped = True
+        self.wake.set()
+
+    def _run(self):
+        while True:
+            with self.lock:
+                if self.stopped:
+                    self.worker = None
+                    return
+            self.wake.clear()
+            try:
+                plays = self.db.get_pending_play_history(self.batch_size)
+            except Exception as e:
+                plays = []
+            if not plays:
+                with self.lock:
+                    if not self.wake.is_set():
+                        self.worker = None
+                        return
+                continue
+
+            if self._send(plays):
+                self.failures = 0
+                continue  # More may be waiting
+
+            self.failures += 1
+            delay = min(self.retry_delay * (2 ** (self.failures - 1)), self.max_retry_delay)
+            self.wake.wait(delay)
+
+    def _send(self, plays: List[tuple]) -> bool:
+        play_ids = [p[0] for p in plays]
+        try:
+            ok = self.send_history(build_history(plays))
+        except Exception as e:
+            return False  # Not delivered; retry without counting an attempt
+        try:
+            if ok:
+                self.db.delete_play_history(play_ids)
+            else:
+                dropped = self.db.mark_play_history_attempt(play_ids, self.max_attempts)
+                if dropped:
+                    print(f"Dropped {dropped} plays after {self.max_attempts} failed reports")
+        except Exception as e:
+            pass
+        return ok
@@ -1,15 +1,121 @@
+import functools
 import sqlite3
-from typing import List, List, Optional
+import threading
+import types
+from typing import Dict, Iterator, List, List, Optional
 from src.api.ibroadcast.models import Artist, Album, Track, Playlist, BaseModel
+from src.core.instrumentation import instrumentation
 
 DB_PATH = "library.db"
 
+# Playlist_Tracks.position is sparse: rows start POSITION_GAP apart so a track can be
+# moved or inserted between two neighbours without shifting the rest of the playlist.
+POSITION_GAP = 1024
+
+# Rows pulled from sqlite per fetchmany call by the iter_* generators
+FETCH_BATCH = 500
+
+# Columns in model field order, so a row builds its model positionally
+ARTIST_COLUMNS = "artist_id, name, rating, artwork_id"
+ALBUM_COLUMNS = "album_id, name, rating, disc, year"
+TRACK_COLUMNS = "track_id, title, track_number, year, length, artwork_id, rating, plays, file"
+PLAYLIST_COLUMNS = "playlist_id, name, description, artwork_id"
+
+
+def _aliased(columns: str, alias: str) -> str:
+    return ", ".join(f"{alias}.{c}" for c in columns.split(", "))
+
+
+A_COLUMNS = _aliased(ARTIST_COLUMNS, "a")
+AL_COLUMNS = _aliased(ALBUM_COLUMNS, "al")
+T_COLUMNS = _aliased(TRACK_COLUMNS, "t")
+
+
+def model_row_factory(model):
+    """sqlite3 row factory building model from the row tuple, without an intermediate dict"""
+    return lambda cursor, row: model(*row)
+
+
+ROW_FACTORIES = {model: model_row_factory(model) for model in (Artist, Album, Track, Playlist)}
+
+
+def _synchronized(cls):
+    """
+    Class decorator running every public method under self.lock.
+    The connection is shared by the UI thread and the background workers
+    (search, history journal, library sync, playlist sync), so a method's
+    statements and its commit or rollback must not interleave with another
+    thread's.
+    """
+    def locked(func):
+        @functools.wraps(func)
+        def synchronized_method(self, *args, **kwargs):
+            with self.lock:
+                return func(self, *args, **kwargs)
+        return synchronized_method
+
+    for attr, value in list(vars(cls).items()):
+        if not attr.startswith("_") and isinstance(value, types.FunctionType):
+            setattr(cls, attr, locked(value))
+    return cls
+
+
+@instrumentation.instrument_class("db")
+@_synchronized
 class DatabaseManager:
     def __init__(self):
+        # Reentrant so public methods can call each other
+        self.lock = threading.RLock()
         self.conn = sqlite3.connect(DB_PATH, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
         self._create_tables()
 
+    def close(self):
+        """Close the connection once no other thread is using it"""
+        self.conn.close()
+
+    @property
+    def change_count(self) -> int:
+        """Rows inserted, updated or deleted through this connection so far; read without the lock"""
+        return self.conn.total_changes
+
+    def _models(self, model, query: str, params=()):
+        """Cursor yielding model instances; query must select the model's *_COLUMNS"""
+        cursor = self.conn.execute(query, params)
+        cursor.row_factory = ROW_FACTORIES[model]
+        return cursor
+
+    def _iter_models(self, model, query: str, batch_size: int, label: str):
+        # Runs after the public method has returned, so it takes the lock per batch.
+        # Each fetch is timed under label; the consumer's work between batches is not.
+        with instrumentation.timer(label), self.lock:
+            cursor = self._models(model, query)
+        while True:
+            with instrumentation.timer(label), self.lock:
+                batch = cursor.fetchmany(batch_size)
+            if not batch:
+                return
+            yield from batch
+
+    def _page(self, model, table: str, columns: str, name_column: str, id_column: str,
+              after_name: Optional[str], after_id: Optional[int], limit: int) -> List:
+        if after_id is None:
+            if after_name is not None:
+                raise ValueError("after_name needs the after_id of the same item")
+            return self._models(model, f"SELECT {columns} FROM {table} ORDER BY {name_column}, {id_column} LIMIT ?",
+                                (limit,)).fetchall()
+        if after_name is not None:
+            query = f"SELECT {columns} FROM {table} WHERE ({name_column}, {id_column}) > (?, ?) ORDER BY {name_column}, {id_column} LIMIT ?"
+            return self._models(model, query, (after_name, after_id, limit)).fetchall()
+        # NULL names sort first and never compare greater than anything, so
+        # finish the NULL run by id, then start on the named rows
+        query = f"SELECT {columns} FROM {table} WHERE {name_column} IS NULL AND {id_column} > ? ORDER BY {id_column} LIMIT ?"
+        rows = self._models(model, query, (after_id, limit)).fetchall()
+        if len(rows) < limit:
+            query = f"SELECT {columns} FROM {table} WHERE {name_column} IS NOT NULL ORDER BY {name_column}, {id_column} LIMIT ?"
+            rows += self._models(model, query, (limit - len(rows),)).fetchall()
+        return rows
+
     def _create_tables(self):
         with self.conn:
             self.conn.executescript('''
@@ -22,6 +128,15 @@ class DatabaseManager:
                 CREATE TABLE IF NOT EXISTS Track_Artists (ta_id INTEGER PRIMARY KEY AUTOINCREMENT, track_id INTEGER, artist_id INTEGER, UNIQUE(track_id, artist_id), FOREIGN KEY(track_id) REFERENCES Tracks(track_id) ON DELETE CASCADE, FOREIGN KEY(artist_id) REFERENCES Artists(artist_id) ON DELETE CASCADE);
                 CREATE TABLE IF NOT EXISTS Album_Artists (aa_id INTEGER PRIMARY KEY AUTOINCREMENT, album_id INTEGER, artist_id INTEGER, UNIQUE(album_id, artist_id), FOREIGN KEY(album_id) REFERENCES Albums(album_id) ON DELETE CASCADE, FOREIGN KEY(artist_id) REFERENCES Artists(artist_id) ON DELETE CASCADE);
                 CREATE TABLE IF NOT EXISTS Playlist_Tracks (pt_id INTEGER PRIMARY KEY AUTOINCREMENT, playlist_id INTEGER, track_id INTEGER, position INTEGER, FOREIGN KEY(playlist_id) REFERENCES Playlists(playlist_id) ON DELETE CASCADE, FOREIGN KEY(track_id) REFERENCES Tracks(track_id) ON DELETE CASCADE);
+
+                CREATE INDEX IF NOT EXISTS idx_playlist_tracks_position ON Playlist_Tracks (playlist_id, position);
+                -- Keyset pagination by name; the rowid primary key is the tie breaker
+                CREATE INDEX IF NOT EXISTS idx_artists_name ON Artists (name);
+                CREATE INDEX IF NOT EXISTS idx_albums_name ON Albums (name);
+                CREATE INDEX IF NOT EXISTS idx_tracks_title ON Tracks (title);
+
+                -- Plays not yet reported to iBroadcast; deliberately not tied to Tracks so library syncs keep them
+                CREATE TABLE IF NOT EXISTS Play_History (play_id INTEGER PRIMARY KEY AUTOINCREMENT, track_id INTEGER, ts TEXT, attempts INTEGER DEFAULT 0);
             ''')
 
     def clear_database(self):
@@ -82,7 +197,7 @@ class DatabaseManager:
             for idx, track_id in enumerate(p.get('tracks', [])):
                 self.conn.execute(
                     "INSERT INTO Playlist_Tracks (playlist_id, track_id, position) VALUES (?, ?, ?)",
-                    (int(pid), track_id, idx)
+                    (int(pid), track_id, idx * POSITION_GAP)
                 )
         
         self.conn.commit()
@@ -119,96 +234,83 @@ class DatabaseManager:
 
     # --- GET EVERY ---
     def get_all_artists(self) -> List[Artist]:
-        result = []
-        for r in self.conn.execute("SELECT * FROM Artists ORDER BY name").fetchall():
-            d = dict(r)
-            result.append(Artist(d['artist_id'], d['name'], d['rating'], d['artwork_id']))
-        return result
+        return self._models(Artist, f"SELECT {ARTIST_COLUMNS} FROM Artists ORDER BY name").fetchall()
 
     def get_all_albums(self) -> List[Album]:
-        result = []
-        query = '''
-            SELECT al.* FROM Albums al
+        query = f'''
+            SELECT {AL_COLUMNS} FROM Albums al
             LEFT JOIN Album_Artists aa ON al.album_id = aa.album_id
             LEFT JOIN Artists a ON aa.artist_id = a.artist_id
             ORDER BY a.name COLLATE NOCASE, al.year
         '''
-        for r in self.conn.execute(query).fetchall():
-            d = dict(r)
-            result.append(Album(d['album_id'], d['name'], d['rating'], d['disc'], d['year']))
-        return result
+        return self._models(Album, query).fetchall()
 
     def get_all_tracks(self) -> List[Track]:
-        result = []
-        for r in self.conn.execute("SELECT * FROM Tracks").fetchall():
-            d = dict(r)
-            result.append(Track(d['track_id'], d['title'], d['track_number'], d['year'], d['length'], d['artwork_id'], d['rating'], d['plays'], d['file']))
-        return result
+        return self._models(Track, f"SELECT {TRACK_COLUMNS} FROM Tracks").fetchall()
 
     def get_all_playlists(self) -> List[Playlist]:
-        result = []
-        for r in self.conn.execute("SELECT * FROM Playlists").fetchall():
-            d = dict(r)
-            result.append(Playlist(d['playlist_id'], d['name'], d['description'], d['artwork_id']))
-        return result
+        return self._models(Playlist, f"SELECT {PLAYLIST_COLUMNS} FROM Playlists").fetchall()
+
+    # --- STREAMING ---
+    # Same rows and order as get_all_*, pulled from the cursor in batches as they are consumed.
+    # A call only builds the generator, so each batch is timed as db.iter_*.fetch instead.
+    @instrumentation.untimed
+    def iter_artists(self, batch_size: int = FETCH_BATCH) -> Iterator[Artist]:
+        query = f"SELECT {ARTIST_COLUMNS} FROM Artists ORDER BY name"
+        return self._iter_models(Artist, query, batch_size, "db.iter_artists.fetch")
+
+    @instrumentation.untimed
+    def iter_albums(self, batch_size: int = FETCH_BATCH) -> Iterator[Album]:
+        query = f'''
+            SELECT {AL_COLUMNS} FROM Albums al
+            LEFT JOIN Album_Artists aa ON al.album_id = aa.album_id
+            LEFT JOIN Artists a ON aa.artist_id = a.artist_id
+            ORDER BY a.name COLLATE NOCASE, al.year
+        '''
+        return self._iter_models(Album, query, batch_size, "db.iter_albums.fetch")
+
+    @instrumentation.untimed
+    def iter_tracks(self, batch_size: int = FETCH_BATCH) -> Iterator[Track]:
+        return self._iter_models(Track, f"SELECT {TRACK_COLUMNS} FROM Tracks", batch_size, "db.iter_tracks.fetch")
+
+    # --- KEYSET PAGES ---
+    # Ordered by name then id, NULL names first. Pass the last item's name and id
+    # (both, even when the name is None) to get the next page; unlike OFFSET this
+    # costs the same however deep the page is.
+    def get_artists_page(self, after_name: Optional[str] = None, after_id: Optional[int] = None, limit: int = 200) -> List[Artist]:
+        return self._page(Artist, "Artists", ARTIST_COLUMNS, "name", "artist_id", after_name, after_id, limit)
+
+    def get_albums_page(self, after_name: Optional[str] = None, after_id: Optional[int] = None, limit: int = 200) -> List[Album]:
+        return self._page(Album, "Albums", ALBUM_COLUMNS, "name", "album_id", after_name, after_id, limit)
+
+    def get_tracks_page(self, after_name: Optional[str] = None, after_id: Optional[int] = None, limit: int = 200) -> List[Track]:
+        return self._page(Track, "Tracks", TRACK_COLUMNS, "title", "track_id", after_name, after_id, limit)
     
     # --- GET BY ID ---
     def get_artist_by_id(self, artist_id: int) -> Optional[Artist]:
-        row = self.conn.execute("SELECT * FROM Artists WHERE artist_id = ?", (artist_id,)).fetchone()
-        if row:
-            d = dict(row)
-            return Artist(d['artist_id'], d['name'], d['rating'], d['artwork_id'])
-        return None
+        return self._models(Artist, f"SELECT {ARTIST_COLUMNS} FROM Artists WHERE artist_id = ?", (artist_id,)).fetchone()
     
     def get_album_by_id(self, album_id: int) -> Optional[Album]:
-        row = self.conn.execute("SELECT * FROM Albums WHERE album_id = ?", (album_id,)).fetchone()
-        if row:
-            d = dict(row)
-            return Album(d['album_id'], d['name'], d['rating'], d['disc'], d['year'])
-        return None
+        return self._models(Album, f"SELECT {ALBUM_COLUMNS} FROM Albums WHERE album_id = ?", (album_id,)).fetchone()
     
     def get_track_by_id(self, track_id: int) -> Optional[Track]:
-        row = self.conn.execute("SELECT * FROM Tracks WHERE track_id = ?", (track_id,)).fetchone()
-        if row:
-            d = dict(row)
-            return Track(d['track_id'], d['title'], d['track_number'], d['year'], d['length'], d['artwork_id'], d['rating'], d['plays'], d['file'])
-        return None
+        return self._models(Track, f"SELECT {TRACK_COLUMNS} FROM Tracks WHERE track_id = ?", (track_id,)).fetchone()
     
     def get_playlist_by_id(self, playlist_id: int) -> Optional[Playlist]:
-        row = self.conn.execute("SELECT * FROM Playlists WHERE playlist_id = ?", (playlist_id,)).fetchone()
-        if row:
-            d = dict(row)
-            return Playlist(d['playlist_id'], d['name'], d['description'], d['artwork_id'])
-        return None
+        return self._models(Playlist, f"SELECT {PLAYLIST_COLUMNS} FROM Playlists WHERE playlist_id = ?", (playlist_id,)).fetchone()
 
     # --- FILTERED RETRIEVAL ---
     def get_tracks_by_artist(self, artist_id: int) -> List[Track]:
-        result = []
-        for r in self.conn.execute("SELECT t.* FROM Tracks t JOIN Track_Artists ta ON t.track_id = ta.track_id WHERE ta.artist_id = ?", (artist_id,)).fetchall():
-            d = dict(r)
-            result.append(Track(d['track_id'], d['title'], d['track_number'], d['year'], d['length'], d['artwork_id'], d['rating'], d['plays'], d['file']))
-        return result
+        return self._models(Track, f"SELECT {T_COLUMNS} FROM Tracks t JOIN Track_Artists ta ON t.track_id = ta.track_id WHERE ta.artist_id = ?", (artist_id,)).fetchall()
 
     def get_tracks_by_album(self, album_id: int) -> List[Track]:
-        result = []
-        for r in self.conn.execute("SELECT * FROM Tracks WHERE album_id = ? ORDER BY track_number", (album_id,)).fetchall():
-            d = dict(r)
-            result.append(Track(d['track_id'], d['title'], d['track_number'], d['year'], d['length'], d['artwork_id'], d['rating'], d['plays'], d['file']))
-        return result
+        return self._models(Track, f"SELECT {TRACK_COLUMNS} FROM Tracks WHERE album_id = ? ORDER BY track_number", (album_id,)).fetchall()
 
     def get_tracks_by_playlist(self, playlist_id: int) -> List[Track]:
-        result = []
-        for r in self.conn.execute("SELECT t.* FROM Tracks t JOIN Playlist_Tracks pt ON t.track_id = pt.track_id WHERE pt.playlist_id = ? ORDER BY pt.position", (playlist_id,)).fetchall():
-            d = dict(r)
-            result.append(Track(d['track_id'], d['title'], d['track_number'], d['year'], d['length'], d['artwork_id'], d['rating'], d['plays'], d['file']))
-        return result
+        return self._models(Track, f"SELECT {T_COLUMNS} FROM Tracks t JOIN Playlist_Tracks pt ON t.track_id = pt.track_id WHERE pt.playlist_id = ? ORDER BY pt.position", (playlist_id,)).fetchall()
 
     def get_artists_by_album(self, album_id: int) -> List[Artist]:
-        result = []
-        for r in self.conn.execute("SELECT a.* FROM Artists a JOIN Album_Artists aa ON a.artist_id = aa.artist_id WHERE aa.album_id = ?", (album_id,)).fetchall():
-            d = dict(r)
-            result.append(Artist(d['artist_id'], d['name'], d['rating'], d['artwork_id']))
-        return result
+        return self._models(Artist, f"SELECT {A_COLUMNS} FROM Artists a JOIN Album_Artists aa ON a.artist_id = aa.artist_id WHERE aa.album_id = ?", (album_id,)).fetchall()
 
     def get_artists_with_albums(self) -> List[Artist]:
         """
@@ -234,16 +336,14 @@ class DatabaseManager:
             ])
 
             # 2. Get all artists with albums
-            all_artists_with_albums_rows = self.conn.execute("""
-                SELECT DISTINCT a.* 
+            all_artists = self._models(Artist, f"""
+                SELECT DISTINCT {A_COLUMNS}
                 FROM Artists a
                 JOIN Album_Artists aa ON a.artist_id = aa.artist_id
                 JOIN Albums al ON aa.album_id = al.album_id
                 ORDER BY a.name COLLATE NOCASE
             """).fetchall()
             
-            all_artists = [Artist(dict(r)['artist_id'], dict(r)['name'], dict(r)['rating'], dict(r)['artwork_id']) for r in all_artists_with_albums_rows]
-            
             # 3. Filter
             final_artists = []
             for artist in all_artists:
@@ -281,26 +381,89 @@ class DatabaseManager:
             return final_artists
     
     def get_artists_by_track(self, track_id: int) -> List[Artist]:
-        result = []
-        for r in self.conn.execute("SELECT a.* FROM Artists a JOIN Track_Artists ta ON a.artist_id = ta.artist_id WHERE ta.track_id = ?", (track_id,)).fetchall():
-            d = dict(r)
-            result.append(Artist(d['artist_id'], d['name'], d['rating'], d['artwork_id']))
-        return result
+        return self._models(Artist, f"SELECT {A_COLUMNS} FROM Artists a JOIN Track_Artists ta ON a.artist_id = ta.artist_id WHERE ta.track_id = ?", (track_id,)).fetchall()
 
     def get_album_by_track(self, track_id: int) -> Optional[Album]:
-        row = self.conn.execute("SELECT al.* FROM Albums al JOIN Tracks t ON al.album_id = t.album_id WHERE t.track_id = ?", (track_id,)).fetchone()
-        if row:
-            d = dict(row)
-            return Album(d['album_id'], d['name'], d['rating'], d['disc'], d['year'])
-        return None
+        return self._models(Album, f"SELECT {AL_COLUMNS} FROM Albums al JOIN Tracks t ON al.album_id = t.album_id WHERE t.track_id = ?", (track_id,)).fetchone()
 
     def get_albums_by_artist(self, artist_id: int) -> List[Album]:
-        result = []
-        for r in self.conn.execute("SELECT al.* FROM Albums al JOIN Album_Artists aa ON al.album_id = aa.album_id WHERE aa.artist_id = ? ORDER BY al.year", (artist_id,)).fetchall():
-            d = dict(r)
-            result.append(Album(d['album_id'], d['name'], d['rating'], d['disc'], d['year']))
+        return self._models(Album, f"SELECT {AL_COLUMNS} FROM Albums al JOIN Album_Artists aa ON al.album_id = aa.album_id WHERE aa.artist_id = ? ORDER BY al.year", (artist_id,)).fetchall()
+
+    def get_most_played_track_ids(self, limit: int) -> List[int]:
+        rows = self.conn.execute("SELECT track_id FROM Tracks WHERE plays > 0 ORDER BY plays DESC LIMIT ?", (limit,)).fetchall()
+        return [r[0] for r in rows]
+
+    # --- BULK LOOKUPS ---
+    def _chunked(self, ids: List[int], size: int = 500):
+        ids = list(dict.fromkeys(ids))
+        for i in range(0, len(ids), size):
+            yield ids[i:i + size]
+
+    def get_album_names_by_tracks(self, track_ids: List[int]) -> Dict[int, str]:
+        """Map each track id to its album name in one query per chunk."""
+        result = {}
+        for chunk in self._chunked(track_ids):
+            placeholders = ",".join("?" * len(chunk))
+            for r in self.conn.execute(f"SELECT t.track_id, al.name FROM Tracks t JOIN Albums al ON al.album_id = t.album_id WHERE t.track_id IN ({placeholders})", chunk).fetchall():
+                result[r[0]] = r[1]
+        return result
+
+    def get_artist_names_by_tracks(self, track_ids: List[int]) -> Dict[int, List[str]]:
+        """Map each track id to its artist names in one query per chunk."""
+        result = {}
+        for chunk in self._chunked(track_ids):
+            placeholders = ",".join("?" * len(chunk))
+            for r in self.conn.execute(f"SELECT ta.track_id, a.name FROM Track_Artists ta JOIN Artists a ON a.artist_id = ta.artist_id WHERE ta.track_id IN ({placeholders}) ORDER BY ta.ta_id", chunk).fetchall():
+                result.setdefault(r[0], []).append(r[1])
+        return result
+
+    def get_artist_names_by_albums(self, album_ids: List[int]) -> Dict[int, List[str]]:
+        """Map each album id to its artist names in one query per chunk."""
+        result = {}
+        for chunk in self._chunked(album_ids):
+            placeholders = ",".join("?" * len(chunk))
+            for r in self.conn.execute(f"SELECT aa.album_id, a.name FROM Album_Artists aa JOIN Artists a ON a.artist_id = aa.artist_id WHERE aa.album_id IN ({placeholders}) ORDER BY aa.aa_id", chunk).fetchall():
+                result.setdefault(r[0], []).append(r[1])
         return result
 
+    def get_album_artwork_ids(self, album_ids: List[int]) -> Dict[int, int]:
+        """Map each album id to the artwork of its first track that has one."""
+        result = {}
+        for chunk in self._chunked(album_ids):
+            placeholders = ",".join("?" * len(chunk))
+            for r in self.conn.execute(f"SELECT album_id, artwork_id FROM Tracks WHERE album_id IN ({placeholders}) AND artwork_id IS NOT NULL AND artwork_id != 0 ORDER BY album_id, track_number", chunk).fetchall():
+                result.setdefault(r[0], r[1])
+        return result
+
+    # --- PLAY HISTORY JOURNAL ---
+    def add_play_history(self, track_id: int, ts: str) -> int:
+        with self.conn:
+            cur = self.conn.execute("INSERT INTO Play_History (track_id, ts) VALUES (?, ?)", (track_id, ts))
+        return cur.lastrowid
+
+    def get_pending_play_history(self, limit: int) -> List[tuple]:
+        """Oldest unreported plays as (play_id, track_id, ts)"""
+        rows = self.conn.execute("SELECT play_id, track_id, ts FROM Play_History ORDER BY play_id LIMIT ?", (limit,)).fetchall()
+        return [(r[0], r[1], r[2]) for r in rows]
+
+    def count_pending_play_history(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM Play_History").fetchone()[0]
+
+    def delete_play_history(self, play_ids: List[int]):
+        with self.conn:
+            for chunk in self._chunked(play_ids):
+                placeholders = ",".join("?" * len(chunk))
+                self.conn.execute(f"DELETE FROM Play_History WHERE play_id IN ({placeholders})", chunk)
+
+    def mark_play_history_attempt(self, play_ids: List[int], max_attempts: int) -> int:
+        """Count a failed send; plays past max_attempts are dropped. Returns how many were dropped."""
+        with self.conn:
+            for chunk in self._chunked(play_ids):
+                placeholders = ",".join("?" * len(chunk))
+                self.conn.execute(f"UPDATE Play_History SET attempts = attempts + 1 WHERE play_id IN ({placeholders})", chunk)
+            cur = self.conn.execute("DELETE FROM Play_History WHERE attempts >= ?", (max_attempts,))
+        return cur.rowcount
+
     # --- Get all artwork ids ---
     def get_all_artwork_ids(self) -> List[int]:
         rows = self.conn.execute("""
@@ -314,26 +477,154 @@ class DatabaseManager:
         return [row['artwork_id'] for row in rows if row['artwork_id'] is not None]
 
     # --- PLAYLIST MANIPULATION ---
-    def add_track_to_playlist(self, playlist_id: int, track_id: int):
+    # Index-based edits locate rows with OFFSET, which walks index rows of the position
+    # index: O(index) reads, though still only one row written. Callers that already
+    # hold the rows (pt_id from get_playlist_rows) should use the *_row variants below,
+    # whose lookups are all index seeks.
+    def _position_at(self, playlist_id: int, index: int) -> Optional[tuple]:
+        """(pt_id, position) of the index-th row in playlist order; reads index + 1 index rows"""
+        if index < 0:
+            return None
+        row = self.conn.execute("SELECT pt_id, position FROM Playlist_Tracks WHERE playlist_id = ? ORDER BY position LIMIT 1 OFFSET ?", (playlist_id, index)).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def _end_position(self, playlist_id: int) -> int:
+        last = self.conn.execute("SELECT MAX(position) FROM Playlist_Tracks WHERE playlist_id = ?", (playlist_id,)).fetchone()[0]
+        return 0 if last is None else last + POSITION_GAP
+
+    def renumber_playlist(self, playlist_id: int):
+        """Spread positions POSITION_GAP apart again once a gap has been used up"""
+        with self.conn:
+            self._renumber_playlist(playlist_id)
+
+    def _renumber_playlist(self, playlist_id: int):
+        rows = self.conn.execute("SELECT pt_id FROM Playlist_Tracks WHERE playlist_id = ? ORDER BY position", (playlist_id,)).fetchall()
+        self.conn.executemany("UPDATE Playlist_Tracks SET position = ? WHERE pt_id = ?", [(i * POSITION_GAP, r[0]) for i, r in enumerate(rows)])
+
+    def add_track_to_playlist(self, playlist_id: int, track_id: int) -> int:
+        """Append a track to the end of a playlist; returns the new row id"""
+        with self.conn:
+            pos = self._end_position(playlist_id)
+            cur = self.conn.execute("INSERT INTO Playlist_Tracks (playlist_id, track_id, position) VALUES (?, ?, ?)", (playlist_id, track_id, pos))
+        return cur.lastrowid
+
+    def append_tracks_to_playlist(self, playlist_id: int, track_ids: List[int]) -> List[int]:
+        """Append several tracks in one transaction; returns the new row ids"""
+        pt_ids = []
+        with self.conn:
+            pos = self._end_position(playlist_id)
+            for offset, track_id in enumerate(track_ids):
+                cur = self.conn.execute("INSERT INTO Playlist_Tracks (playlist_id, track_id, position) VALUES (?, ?, ?)", (playlist_id, track_id, pos + offset * POSITION_GAP))
+                pt_ids.append(cur.lastrowid)
+        return pt_ids
+
+    def delete_playlist_rows(self, playlist_id: int, pt_ids: List[int]):
+        """Remove specific Playlist_Tracks rows; positions stay ordered without renumbering"""
         with self.conn:
-            pos = self.conn.execute("SELECT COALESCE(MAX(position), 0) + 1 FROM Playlist_Tracks WHERE playlist_id = ?", (playlist_id,)).fetchone()[0]
-            self.conn.execute("INSERT INTO Playlist_Tracks (playlist_id, track_id, position) VALUES (?, ?, ?)", (playlist_id, track_id, pos))
+            for chunk in self._chunked(pt_ids):
+                placeholders = ",".join("?" * len(chunk))
+                self.conn.execute(f"DELETE FROM Playlist_Tracks WHERE playlist_id = ? AND pt_id IN ({placeholders})", [playlist_id, *chunk])
+
+    def replace_playlist_id(self, old_id: int, new_id: int):
+        """Re-key a playlist, e.g. a locally created one once the server assigned its id"""
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO Playlists (playlist_id, name, description, artwork_id) SELECT ?, name, description, artwork_id FROM Playlists WHERE playlist_id = ?", (new_id, old_id))
+            self.conn.execute("UPDATE Playlist_Tracks SET playlist_id = ? WHERE playlist_id = ?", (new_id, old_id))
+            self.conn.execute("DELETE FROM Playlists WHERE playlist_id = ?", (old_id,))
+
+    def insert_track_into_playlist(self, playlist_id: int, index: int, track_id: int) -> int:
+        """Insert a track so it ends up at index; only the new row is written"""
+        with self.conn:
+            pos = self._free_position(playlist_id, index)
+            if pos is None:
+                self._renumber_playlist(playlist_id)
+                pos = self._free_position(playlist_id, index)
+            cur = self.conn.execute("INSERT INTO Playlist_Tracks (playlist_id, track_id, position) VALUES (?, ?, ?)", (playlist_id, track_id, pos))
+        return cur.lastrowid
+
+    def _free_position(self, playlist_id: int, index: int) -> Optional[int]:
+        """A position between the rows now at index - 1 and index, or None if they have no gap"""
+        before = self._position_at(playlist_id, index - 1)
+        after = self._position_at(playlist_id, index)
+        return self._between(before and before[1], after and after[1])
+
+    @staticmethod
+    def _between(before: Optional[int], after: Optional[int]) -> Optional[int]:
+        """A position strictly between two neighbours (None for a playlist end), or None if there is no gap"""
+        if before is None and after is None:
+            return 0
+        if before is None:
+            return after - POSITION_GAP
+        if after is None:
+            return before + POSITION_GAP
+        if after - before < 2:
+            return None
+        return (before + after) // 2
 
     def remove_track_from_playlist(self, playlist_id: int, position: int):
+        """Remove the track at index position; no other rows are touched"""
         with self.conn:
-            self.conn.execute("DELETE FROM Playlist_Tracks WHERE playlist_id = ? AND position = ?", (playlist_id, position))
-            self.conn.execute("UPDATE Playlist_Tracks SET position = position - 1 WHERE playlist_id = ? AND position > ?", (playlist_id, position))
+            row = self._position_at(playlist_id, position)
+            if row:
+                self.conn.execute("DELETE FROM Playlist_Tracks WHERE pt_id = ?", (row[0],))
 
     def rearrange_playlist_track(self, playlist_id: int, old_pos: int, new_pos: int):
+        """Move the track at index old_pos to index new_pos by rewriting only its position"""
+        if old_pos == new_pos:
+            return
         with self.conn:
-            target_id = self.conn.execute("SELECT pt_id FROM Playlist_Tracks WHERE playlist_id = ? AND position = ?", (playlist_id, old_pos)).fetchone()[0]
-            self.conn.execute("UPDATE Playlist_Tracks SET position = -1 WHERE pt_id = ?", (target_id,))
-            if old_pos > new_pos:
-                self.conn.execute("UPDATE Playlist_Tracks SET position = position + 1 WHERE playlist_id = ? AND position >= ? AND position < ?", (playlist_id, new_pos, old_pos))
-            else:
-                self.conn.execute("UPDATE Playlist_Tracks SET position = position - 1 WHERE playlist_id = ? AND position > ? AND position <= ?", (playlist_id, old_pos, new_pos))
-            self.conn.execute("UPDATE Playlist_Tracks SET position = ? WHERE pt_id = ?", (new_pos, target_id))
+            row = self._position_at(playlist_id, old_pos)
+            if not row:
+                return
+            # Moving up, the row lands before the one now at new_pos; moving down, after it
+            slot = new_pos if new_pos < old_pos else new_pos + 1
+            pos = self._free_position(playlist_id, slot)
+            if pos is None:
+                self._renumber_playlist(playlist_id)
+                pos = self._free_position(playlist_id, slot)
+            self.conn.execute("UPDATE Playlist_Tracks SET position = ? WHERE pt_id = ?", (pos, row[0]))
     
+    # --- PLAYLIST ROWS BY ID ---
+    def get_playlist_rows(self, playlist_id: int) -> List[tuple]:
+        """(pt_id, track_id) for every row in playlist order"""
+        rows = self.conn.execute("SELECT pt_id, track_id FROM Playlist_Tracks WHERE playlist_id = ? ORDER BY position", (playlist_id,)).fetchall()
+        return [(r[0], r[1]) for r in rows]
+
+    def _slot_after(self, playlist_id: int, after_pt_id: Optional[int], moving_pt_id: Optional[int] = None) -> Optional[int]:
+        """A free position right after row after_pt_id (None: first), ignoring the row being moved"""
+        before = None
+        if after_pt_id is not None:
+            row = self.conn.execute("SELECT position FROM Playlist_Tracks WHERE pt_id = ? AND playlist_id = ?", (after_pt_id, playlist_id)).fetchone()
+            before = row[0] if row else None
+        query = "SELECT position FROM Playlist_Tracks WHERE playlist_id = ? AND pt_id IS NOT ?"
+        params = [playlist_id, moving_pt_id]
+        if before is not None:
+            query += " AND position > ?"
+            params.append(before)
+        row = self.conn.execute(query + " ORDER BY position LIMIT 1", params).fetchone()
+        return self._between(before, row[0] if row else None)
+
+    def insert_track_after_row(self, playlist_id: int, after_pt_id: Optional[int], track_id: int) -> int:
+        """Insert a track right after row after_pt_id (None: at the top); returns the new row id"""
+        with self.conn:
+            pos = self._slot_after(playlist_id, after_pt_id)
+            if pos is None:
+                self._renumber_playlist(playlist_id)
+                pos = self._slot_after(playlist_id, after_pt_id)
+            cur = self.conn.execute("INSERT INTO Playlist_Tracks (playlist_id, track_id, position) VALUES (?, ?, ?)", (playlist_id, track_id, pos))
+        return cur.lastrowid
+
+    def move_playlist_row(self, playlist_id: int, pt_id: int, after_pt_id: Optional[int]):
+        """Move row pt_id right after row after_pt_id (None: to the top), writing only that row"""
+        if pt_id == after_pt_id:
+            return
+        with self.conn:
+            pos = self._slot_after(playlist_id, after_pt_id, pt_id)
+            if pos is None:
+                self._renumber_playlist(playlist_id)
+                pos = self._slot_after(playlist_id, after_pt_id, pt_id)
+            self.conn.execute("UPDATE Playlist_Tracks SET position = ? WHERE pt_id = ? AND playlist_id = ?", (pos, pt_id, playlist_id))
+
     def search_library(self, query: str) -> list[BaseModel]:
         """
         Searches across Tracks, Albums, Artists, and Playlists.
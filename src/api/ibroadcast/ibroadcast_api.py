@@ -7,16 +7,22 @@ import hashlib
 import threading
 import time
 from src.core.credentials_manager import CredentialsManager
+from src.core.instrumentation import timed
 
 from typing import List
 
-from http.server import HTTPServer
 from urllib.parse import urlencode
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional
 
-from src.api.ibroadcast.oauth_callback_handler import OAuthCallbackHandler
+from src.api.ibroadcast.oauth_callback_server import OAuthCallbackServer
+from src.api.ibroadcast.token_manager import RefreshRejected, TokenManager
 from src.api.artwork_cache import ArtworkCache
+from src.api.audio_cache import AudioCache
+from src.api.history_journal import HistoryJournal, HistoryUnavailable, build_history
+from src.api.playlist_sync import PlaylistSync
+from src.api.stream_proxy import StreamProxy
 from src.api.ibroadcast.database import DatabaseManager
+from src.api.ibroadcast.library_snapshot import LibrarySnapshot, SNAPSHOT_ENV
 from src.api.ibroadcast.models import Artist, Album, Track, Playlist, BaseModel
 
 
@@ -38,32 +44,201 @@ def get_oauth_config():
     }
 
 
+def process_section(lib_data, section_name):
+    """Helper to decode iBroadcast map-based JSON response"""
+    section = lib_data.get(section_name, {})
+    index_map = section.get("map", {})
+    processed = {}
+
+    for item_id, item_data in section.items():
+        if item_id == "map":
+            continue
+        if isinstance(item_data, list):
+            obj = {}
+            for key, index in index_map.items():
+                if key != "artists_additional":
+                    if isinstance(index, int) and index < len(item_data):
+                        val = item_data[index]
+                        # Force ID types
+                        if (
+                            (key.endswith("_id") or key == "artwork_id")
+                            and isinstance(val, str)
+                            and val.isdigit()
+                        ):
+                            val = int(val)
+                        obj[key] = val
+                else:
+                    additional = []
+                    add_map = index_map.get("artists_additional_map", {})
+                    if (
+                        item_data is not None
+                        and index < len(item_data)
+                        and item_data[index] is not None
+                    ):
+                        for item in item_data[index]:
+                            add_obj = {
+                                k: item[i]
+                                for k, i in add_map.items()
+                                if isinstance(i, int) and i < len(item)
+                            }
+                            additional.append(add_obj)
+                    obj[key] = additional
+
+            final_id = int(item_id) if str(item_id).isdigit() else item_id
+            obj["item_id"] = final_id
+            processed[final_id] = obj
+    return processed
+
+
+def process_library(lib: dict) -> dict:
+    """Decode a map-encoded library response into the dicts sync_library expects"""
+    processed_lib = {
+        "artists": process_section(lib, "artists"),
+        "albums": process_section(lib, "albums"),
+        "tracks": process_section(lib, "tracks"),
+        "playlists": process_section(lib, "playlists"),
+    }
+
+    # Backfill missing Album artwork from its children tracks
+    for al_id, al in processed_lib["albums"].items():
+        if not al.get("artwork_id"):
+            for t_id in al.get("tracks", []):
+                track_data = processed_lib["tracks"].get(t_id)
+                if track_data and track_data.get("artwork_id"):
+                    al["artwork_id"] = track_data["artwork_id"]
+                    break
+
+    # Remove "Recently Played" and "Most Recently Uploaded" playlists
+    processed_lib["playlists"] = {
+        k: v
+        for k, v in processed_lib["playlists"].items()
+        if v.get("name") not in ["Recently Played", "Most Recent Uploads"]
+    }
+    return processed_lib
+
+
 TOKEN_FILE = "token.json"
 
+# Base URL of a stand-in server (see benchmarks/mock_server.py) that replaces every iBroadcast host
+SERVER_URL_ENV = "PYBROADCAST_SERVER_URL"
+
 
 class iBroadcastAPI:
-    def __init__(self):
+    def __init__(self, server_url: Optional[str] = None):
         self.base_url = "https://api.ibroadcast.com"
         self.library_url = "https://library.ibroadcast.com"
         self.streaming_server = "https://streaming.ibroadcast.com"
-        self.access_token: Optional[str] = None
-        self.refresh_token: Optional[str] = None
+        self.artwork_server = "https://artwork.ibroadcast.com"
+        self.queue_url = "wss://queue.ibroadcast.com"
+        self.server_url: Optional[str] = None
+        server_url = server_url or os.environ.get(SERVER_URL_ENV)
+        if server_url:
+            self.use_server(server_url)
+        self.tokens = TokenManager(self._request_token_refresh, on_refreshed=self.save_token,
+                                   on_rejected=self._on_refresh_rejected)
+        # Called, possibly off the UI thread, once the user has to log in again
+        self.on_login_required: Optional[Callable[[], None]] = None
         self.session = requests.Session()
+        self.oauth_state: Optional[str] = None
+        self.callback_server: Optional[OAuthCallbackServer] = None
 
-        # Initialize database and artwork cache
+        # Initialize database, artwork cache and audio cache
         self.db = DatabaseManager()
         self.artwork_cache = ArtworkCache()
+        self.audio_cache = AudioCache()
+        self.history_journal = HistoryJournal(self.db, self.send_history)
+
+        # Optimistic playlist edits, reconciled with the server in the background
+        self.playlist_sync = PlaylistSync()
+        self.playlist_lock = threading.Lock()
+        self.playlist_ids: Dict[int, int] = {}  # temporary local id -> server id
+        self._temp_playlist_id = 0
+
+        # Optional loopback proxy that caches streamed byte ranges
+        self.stream_proxy: Optional[StreamProxy] = None
+        if os.environ.get("PYBROADCAST_STREAM_PROXY") == "1":
+            self.enable_stream_proxy()
+
+        # Optional columnar copy of the library for smart views, rebuilt after each sync
+        self.snapshot: Optional[LibrarySnapshot] = None
+        self.build_snapshot_on_sync = os.environ.get(SNAPSHOT_ENV) == "1"
 
         self.load_cached_token()
 
+    def use_server(self, server_url: str):
+        """Send every request (API, library, streaming, artwork, OAuth, play queue) to server_url"""
+        self.server_url = server_url.rstrip("/")
+        self.base_url = self.server_url
+        self.library_url = self.server_url
+        self.streaming_server = self.server_url
+        self.artwork_server = self.server_url
+        if self.server_url.startswith("https://"):
+            self.queue_url = "wss://" + self.server_url[len("https://"):]
+        else:
+            self.queue_url = "ws://" + self.server_url.split("://", 1)[-1]
+
+    def oauth_config(self) -> Dict:
+        """OAuth settings, pointed at the stand-in server when one is configured"""
+        config = get_oauth_config()
+        if self.server_url:
+            config["authorization_url"] = f"{self.server_url}/authorize"
+            config["token_url"] = f"{self.server_url}/token"
+            config["client_id"] = config["client_id"] or "pybroadcast-local"
+            config["client_secret"] = config["client_secret"] or "pybroadcast-local"
+        return config
+
+    def enable_stream_proxy(self):
+        """Route uncached streams through a local range-caching proxy"""
+        if self.stream_proxy is None:
+            try:
+                self.stream_proxy = StreamProxy()
+                self.stream_proxy.start()
+            except Exception as e:
+                print(f"Failed to start stream proxy: {e}")
+                self.stream_proxy = None
+
+    def disable_stream_proxy(self):
+        if self.stream_proxy is not None:
+            self.stream_proxy.stop()
+            self.stream_proxy = None
+
+    @timed("api.build_snapshot")
+    def build_snapshot(self) -> Optional[LibrarySnapshot]:
+        """Rebuild the columnar library snapshot from the database"""
+        try:
+            self.snapshot = LibrarySnapshot.from_db(self.db)
+        except Exception as e:
+            print(f"Failed to build library snapshot: {e}")
+            self.snapshot = None
+        return self.snapshot
+
+    @property
+    def access_token(self) -> Optional[str]:
+        return self.tokens.access_token
+
+    @access_token.setter
+    def access_token(self, value: Optional[str]):
+        self.tokens.access_token = value
+
+    @property
+    def refresh_token(self) -> Optional[str]:
+        return self.tokens.refresh_token
+
+    @refresh_token.setter
+    def refresh_token(self, value: Optional[str]):
+        self.tokens.refresh_token = value
+
     def load_cached_token(self):
         """Load token from local file on startup"""
         if os.path.exists(TOKEN_FILE):
             try:
                 with open(TOKEN_FILE, "r") as f:
                     data = json.load(f)
-                    self.access_token = data.get("access_token")
-                    self.refresh_token = data.get("refresh_token")
+                    self.tokens.set_tokens(
+                        data.get("access_token"),
+                        data.get("refresh_token"),
+                        expires_at=data.get("expires_at"),
+                    )
             except Exception as e:
                 pass
 
@@ -74,68 +249,46 @@ class iBroadcastAPI:
                 {
                     "access_token": self.access_token,
                     "refresh_token": self.refresh_token,
+                    "expires_at": self.tokens.expires_at,
                 },
                 f,
             )
 
+    def reload_credentials(self):
+        """
+        Start over with the cached token after the user saved new credentials.
+        Client id and secret are read on every oauth_config() call, so only the
+        tokens need reloading; this instance, its workers and its single
+        refresh timer stay in place.
+        """
+        self.stop_callback_server()
+        self.tokens.clear()
+        self.load_cached_token()
+
+    def shutdown(self):
+        """Stop the refresh timer and background workers before exit"""
+        self.stop_callback_server()
+        self.tokens.clear()
+        self.history_journal.stop()
+        self.disable_stream_proxy()
+
     def logout(self):
         """Delete cached token and reset state"""
         if os.path.exists(TOKEN_FILE):
             os.remove(TOKEN_FILE)
-        self.access_token = None
-        self.refresh_token = None
+        self.tokens.clear()
         self.db.clear_database()
 
     def _process_section(self, lib_data, section_name):
-        """Helper to decode iBroadcast map-based JSON response"""
-        section = lib_data.get(section_name, {})
-        index_map = section.get("map", {})
-        processed = {}
-
-        for item_id, item_data in section.items():
-            if item_id == "map":
-                continue
-            if isinstance(item_data, list):
-                obj = {}
-                for key, index in index_map.items():
-                    if key != "artists_additional":
-                        if isinstance(index, int) and index < len(item_data):
-                            val = item_data[index]
-                            # Force ID types
-                            if (
-                                (key.endswith("_id") or key == "artwork_id")
-                                and isinstance(val, str)
-                                and val.isdigit()
-                            ):
-                                val = int(val)
-                            obj[key] = val
-                    else:
-                        additional = []
-                        add_map = index_map.get("artists_additional_map", {})
-                        if (
-                            item_data is not None
-                            and index < len(item_data)
-                            and item_data[index] is not None
-                        ):
-                            for item in item_data[index]:
-                                add_obj = {
-                                    k: item[i]
-                                    for k, i in add_map.items()
-                                    if isinstance(i, int) and i < len(item)
-                                }
-                                additional.append(add_obj)
-                        obj[key] = additional
-
-                final_id = int(item_id) if str(item_id).isdigit() else item_id
-                obj["item_id"] = final_id
-                processed[final_id] = obj
-        return processed
+        return process_section(lib_data, section_name)
 
+    @timed("api.load_library")
     def load_library(self) -> Dict:
         """Load library from API and sync to SQLite"""
-        oauth_config = get_oauth_config()
+        oauth_config = self.oauth_config()
         if not oauth_config["client_id"] or not oauth_config["client_secret"]:
             return {"success": False, "message": "Missing iBroadcast OAuth credentials"}
+        self.tokens.ensure_fresh()
         try:
             url = f"{self.library_url}/s/JSON/library"
             headers = {
@@ -160,35 +313,20 @@ class iBroadcastAPI:
 
             if "library" in data:
                 lib = data["library"]
-                processed_lib = {
-                    "artists": self._process_section(lib, "artists"),
-                    "albums": self._process_section(lib, "albums"),
-                    "tracks": self._process_section(lib, "tracks"),
-                    "playlists": self._process_section(lib, "playlists"),
-                }
-
-                # Backfill missing Album artwork from its children tracks
-                for al_id, al in processed_lib["albums"].items():
-                    if not al.get("artwork_id"):
-                        for t_id in al.get("tracks", []):
-                            track_data = processed_lib["tracks"].get(t_id)
-                            if track_data and track_data.get("artwork_id"):
-                                al["artwork_id"] = track_data["artwork_id"]
-                                break
-
-                # Remove "Recently Played" and "Most Recently Uploaded" playlists
-                processed_lib["playlists"] = {
-                    k: v
-                    for k, v in processed_lib["playlists"].items()
-                    if v.get("name") not in ["Recently Played", "Most Recent Uploads"]
-                }
+                processed_lib = process_library(lib)
 
                 # Save to DB
                 self.db.sync_library(processed_lib)
                 self.save_token()
+                if self.build_snapshot_on_sync:
+                    self.build_snapshot()
 
                 # Start background caching
                 threading.Thread(target=self._precache_artworks, daemon=True).start()
+                self.precache_frequently_played()
+
+                # Report plays journaled while offline or before the last exit
+                self.history_journal.flush()
 
                 return {"success": True}
             return {"success": False}
@@ -202,15 +340,11 @@ class iBroadcastAPI:
 
         for artwork_id in artwork_ids:
             if not self.artwork_cache.is_cached(artwork_id):
-                artwork_url = f"https://artwork.ibroadcast.com/artwork/{artwork_id}"
+                artwork_url = f"{self.artwork_server}/artwork/{artwork_id}"
                 self.artwork_cache.download_and_cache(artwork_url, artwork_id)
 
-    def get_stream_url(self, track_id: int) -> str:
-        """Get streaming URL by querying the database"""
-        track = self.db.get_track_by_id(track_id)
-        if not track or not track.file:
-            return ""
-
+    def _build_stream_url(self, track: Track) -> str:
+        self.tokens.ensure_fresh()
         expires = int(time.time() * 1000)
         params = {
             "Expires": expires,
@@ -221,6 +355,37 @@ class iBroadcastAPI:
         }
         return f"{self.streaming_server}{track.file}?{urlencode(params)}"
 
+    def get_stream_url(self, track_id: int) -> str:
+        """Get streaming URL by querying the database, preferring the local audio cache"""
+        track = self.db.get_track_by_id(track_id)
+        if not track or not track.file:
+            return ""
+
+        cached_url = self.audio_cache.get_cached_url(track.file)
+        if cached_url:
+            return cached_url
+        if self.stream_proxy is not None:
+            return self.stream_proxy.register(self._build_stream_url(track), track.file)
+        return self._build_stream_url(track)
+
+    def get_cached_stream_url(self, track_id: int) -> Optional[str]:
+        """Get the local file URL of a track if it is in the audio cache"""
+        track = self.db.get_track_by_id(track_id)
+        if not track or not track.file or not self.audio_cache.is_cached(track.file):
+            return None
+        return self.audio_cache.get_cached_url(track.file)
+
+    def precache_tracks(self, track_ids: List[int]):
+        """Queue background downloads of tracks into the audio cache"""
+        for track_id in track_ids:
+            track = self.db.get_track_by_id(track_id)
+            if track and track.file and not self.audio_cache.is_cached(track.file):
+                self.audio_cache.prefetch(self._build_stream_url(track), track.file)
+
+    def precache_frequently_played(self, limit: int = 5):
+        """Keep the most played tracks available offline"""
+        self.precache_tracks(self.db.get_most_played_track_ids(limit))
+
     def get_artwork_url(self, artwork_id: Optional[int], use_cache: bool = True) -> str:
         if not artwork_id or artwork_id == 0:
             return ""
@@ -228,31 +393,78 @@ class iBroadcastAPI:
             cached_url = self.artwork_cache.get_cached_url(artwork_id)
             if cached_url:
                 return cached_url
-        return f"https://artwork.ibroadcast.com/artwork/{artwork_id}"
+        return f"{self.artwork_server}/artwork/{artwork_id}"
 
     # --- Playlist Operations ---
-    # These call the API and then trigger a reload of the library to keep the DB in sync.
-
-    def create_playlist(self, name: str, **kwargs) -> Dict:
-        url = f"{self.base_url}/s/JSON/playlists"
-        data = {"mode": "createplaylist", "name": name, **kwargs}
-        headers = {"Authorization": f"Bearer {self.access_token}"}
+    # These apply the change to the local DB first and sync it to the server in the background.
 
-        response = self.session.post(url, json=data, headers=headers)
-        if response.status_code == 200:
-            self.load_library()  # Update local DB
-            return {"success": True, **response.json()}
-        return {"success": False, "message": "API Error"}
+    def create_playlist(self, name: str, on_done=None, **kwargs) -> Dict:
+        """Create a playlist locally right away and on the server in the background.
 
-    def append_to_playlist(self, playlist_id: int, tracks: list) -> Dict:
-        url = f"{self.base_url}/s/JSON/playlists"
-        data = {"mode": "appendplaylist", "playlist_id": playlist_id, "tracks": tracks}
+        The local playlist gets a temporary negative id that is replaced by the
+        server's id once the request succeeds, or removed if it fails. on_done
+        receives the final result from the background thread.
+        """
+        with self.playlist_lock:
+            self._temp_playlist_id -= 1
+            temp_id = self._temp_playlist_id
+        self.db.insert_playlist(Playlist(temp_id, name, kwargs.get("description"), None))
+        if kwargs.get("tracks"):
+            self.db.append_tracks_to_playlist(temp_id, kwargs["tracks"])
+
+        def send():
+            url = f"{self.base_url}/s/JSON/playlists"
+            data = {"mode": "createplaylist", "name": name, **kwargs}
+            return self._post_playlist_request(url, data)
+
+        def on_success(response):
+            real_id = response.get("playlist_id")
+            if real_id:
+                with self.playlist_lock:
+                    self.playlist_ids[temp_id] = int(real_id)
+                self.db.replace_playlist_id(temp_id, int(real_id))
+
+        self.playlist_sync.submit(send, lambda: self.db.delete_playlist(temp_id), on_success, on_done)
+        return {"success": True, "playlist_id": temp_id, "pending": True}
+
+    def append_to_playlist(self, playlist_id: int, tracks: list, on_done=None) -> Dict:
+        """Append tracks locally right away and on the server in the background"""
+        pt_ids = self.db.append_tracks_to_playlist(playlist_id, tracks)
+
+        def send():
+            # A playlist created locally may only now have its server id
+            with self.playlist_lock:
+                server_id = self.playlist_ids.get(playlist_id, playlist_id)
+            if server_id < 0:
+                return None
+            url = f"{self.base_url}/s/JSON/playlists"
+            data = {"mode": "appendplaylist", "playlist_id": server_id, "tracks": tracks}
+            return self._post_playlist_request(url, data)
+
+        def rollback():
+            with self.playlist_lock:
+                local_id = self.playlist_ids.get(playlist_id, playlist_id)
+            self.db.delete_playlist_rows(local_id, pt_ids)
+
+        self.playlist_sync.submit(send, rollback, None, on_done)
+        return {"success": True, "pending": True}
+
+    def _post_playlist_request(self, url: str, data: Dict) -> Optional[Dict]:
+        """POST a playlist mutation; returns the response body, or None on failure"""
+        self.tokens.ensure_fresh()
         headers = {"Authorization": f"Bearer {self.access_token}"}
-
-        if self.session.post(url, json=data, headers=headers).status_code == 200:
-            self.load_library()
-            return {"success": True}
-        return {"success": False}
+        response = self.session.post(url, json=data, headers=headers, timeout=30)
+        if response.status_code != 200:
+            return None
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        if not isinstance(body, dict):
+            body = {}
+        if body.get("result") is False:
+            return None
+        return body
 
     # --- OAuth Logic ---
 
@@ -265,9 +477,14 @@ class iBroadcastAPI:
         challenge_bytes = hashlib.sha256(self.code_verifier.encode("utf-8")).digest()
         return base64.urlsafe_b64encode(challenge_bytes).decode("utf-8").rstrip("=")
 
-    def start_oauth_flow(self) -> Dict:
+    def start_oauth_flow(self, on_callback) -> Dict:
+        """Start the local callback server and build the authorization URL.
+
+        on_callback(code, state, error) is called from the server thread once the
+        browser is redirected back.
+        """
         try:
-            oauth_config = get_oauth_config()
+            oauth_config = self.oauth_config()
             if not oauth_config["client_id"] or not oauth_config["client_secret"]:
                 return {
                     "success": False,
@@ -285,37 +502,32 @@ class iBroadcastAPI:
                 "redirect_uri": oauth_config["redirect_uri"],
             }
             auth_url = f"{oauth_config['authorization_url']}?{urlencode(params)}"
-            self.start_callback_server()
+            self.start_callback_server(on_callback)
             return {"success": True, "auth_url": auth_url}
         except Exception as e:
             return {"success": False, "message": str(e)}
 
-    def start_callback_server(self):
-        def run_server():
-            server = HTTPServer(("localhost", 8888), OAuthCallbackHandler)
-            server.handle_request()
-
-        threading.Thread(target=run_server, daemon=True).start()
-
-    def check_callback_status(self) -> Dict:
-        """Check if OAuth callback has been received"""
-        if OAuthCallbackHandler.auth_code is not None:
-            if OAuthCallbackHandler.auth_state != self.oauth_state:
-                return {
-                    "success": False,
-                    "message": "State mismatch - possible CSRF attack",
-                }
-
-            auth_code = OAuthCallbackHandler.auth_code
-            OAuthCallbackHandler.auth_code = None
-            OAuthCallbackHandler.auth_state = None
-
-            return {"success": True, "code": auth_code}
-
-        return {"success": False, "pending": True}
+    def start_callback_server(self, on_callback):
+        self.stop_callback_server()
+        self.callback_server = OAuthCallbackServer(on_callback)
+        self.callback_server.start()
+
+    def stop_callback_server(self):
+        if self.callback_server is not None:
+            self.callback_server.stop()
+            self.callback_server = None
+
+    def complete_oauth(self, auth_code: str, state: Optional[str]) -> Dict:
+        """Validate the callback state and exchange the code for tokens"""
+        if not self.oauth_state or state != self.oauth_state:
+            return {
+                "success": False,
+                "message": "State mismatch - possible CSRF attack",
+            }
+        return self.exchange_code_for_token(auth_code)
 
     def exchange_code_for_token(self, auth_code: str) -> Dict:
-        oauth_config = get_oauth_config()
+        oauth_config = self.oauth_config()
         data = {
             "grant_type": "authorization_code",
             "code": auth_code,
@@ -323,30 +535,49 @@ class iBroadcastAPI:
             "redirect_uri": oauth_config["redirect_uri"],
             "code_verifier": self.code_verifier,
         }
-        resp = requests.post(oauth_config["token_url"], data=data)
+        try:
+            resp = requests.post(oauth_config["token_url"], data=data, timeout=30)
+        except Exception as e:
+            return {"success": False, "message": str(e)}
         if resp.status_code == 200:
             token_data = resp.json()
-            self.access_token = token_data["access_token"]
-            self.refresh_token = token_data["refresh_token"]
+            self.tokens.set_tokens(
+                token_data["access_token"],
+                token_data["refresh_token"],
+                expires_in=token_data.get("expires_in"),
+            )
             self.save_token()
             return {"success": True}
         return {"success": False}
 
     def refresh_access_token(self) -> bool:
-        oauth_config = get_oauth_config()
+        """Refresh now, sharing any refresh already in flight"""
+        return self.tokens.refresh()
+
+    def _request_token_refresh(self, refresh_token: str) -> Optional[dict]:
+        oauth_config = self.oauth_config()
         data = {
             "grant_type": "refresh_token",
-            "refresh_token": self.refresh_token,
+            "refresh_token": refresh_token,
             "client_id": oauth_config["client_id"],
         }
-        resp = requests.post(oauth_config["token_url"], data=data)
+        resp = requests.post(oauth_config["token_url"], data=data, timeout=30)
         if resp.status_code == 200:
-            token_data = resp.json()
-            self.access_token = token_data["access_token"]
-            self.refresh_token = token_data["refresh_token"]
-            self.save_token()
-            return True
-        return False
+            return resp.json()
+        # A revoked or expired refresh token; timeouts and rate limits are worth retrying
+        if 400 <= resp.status_code < 500 and resp.status_code not in (408, 429):
+            raise RefreshRejected(f"HTTP {resp.status_code}")
+        return None
+
+    def _on_refresh_rejected(self):
+        """The refresh token is dead: forget the cached copy and ask for a login"""
+        try:
+            if os.path.exists(TOKEN_FILE):
+                os.remove(TOKEN_FILE)
+        except Exception as e:
+            print(f"Failed to remove cached token: {e}")
+        if self.on_login_required:
+            self.on_login_required()
 
     def get_artists(self) -> List[Artist]:
         """Returns all artists sorted by name."""
@@ -372,6 +603,10 @@ class iBroadcastAPI:
         """Search the library for tracks matching the query."""
         return self.db.search_library(query)
 
+    def library_version(self) -> int:
+        """Changes whenever any row of the local library does, sync or local edit"""
+        return self.db.change_count
+
     def get_track_details(self, track_id: int) -> Optional[Track]:
         """Fetch a single track's metadata."""
         return self.db.get_track_by_id(track_id)
@@ -424,8 +659,25 @@ class iBroadcastAPI:
         """Get all tracks associated with a specific artist."""
         return self.db.get_tracks_by_artist(artist_id)
 
+    def get_album_names_by_tracks(self, track_ids: List[int]) -> Dict[int, str]:
+        """Get album names for many tracks at once."""
+        return self.db.get_album_names_by_tracks(track_ids)
+
+    def get_artist_names_by_tracks(self, track_ids: List[int]) -> Dict[int, List[str]]:
+        """Get artist names for many tracks at once."""
+        return self.db.get_artist_names_by_tracks(track_ids)
+
+    def get_artist_names_by_albums(self, album_ids: List[int]) -> Dict[int, List[str]]:
+        """Get artist names for many albums at once."""
+        return self.db.get_artist_names_by_albums(album_ids)
+
+    def get_album_artwork_ids(self, album_ids: List[int]) -> Dict[int, int]:
+        """Get the artwork id to display for many albums at once."""
+        return self.db.get_album_artwork_ids(album_ids)
+
     def get_play_queue_token(self) -> Optional[dict]:
         """Fetch a one-time token for the Play Queue WebSocket."""
+        self.tokens.ensure_fresh()
 
         url = f"{self.base_url}/s/JSON/status"
         headers = {
@@ -471,35 +723,42 @@ class iBroadcastAPI:
         Returns:
             True if history was successfully reported, False otherwise
         """
-        print(
-            "Reporting history for track_id: {}, timestamp: {}".format(
-                track_id, timestamp
-            )
-        )
+        try:
+            return self.send_history(build_history([(None, track_id, timestamp)]))
+        except HistoryUnavailable as e:
+            print(f"Error reporting history: {e}")
+            return False
+
+    def queue_history(self, track_id: int, timestamp: str):
+        """Journal a play; it is reported in the background and retried until accepted"""
+        self.history_journal.record(track_id, timestamp)
+
+    def send_history(self, history: List[Dict]) -> bool:
+        """
+        Send a history array (one entry per day) in a single status request.
+        Returns whether the server accepted it; raises HistoryUnavailable when
+        it could not be delivered (logged out, network error, 5xx).
+        """
+        self.tokens.ensure_fresh()
+        if not self.access_token:
+            raise HistoryUnavailable("Not logged in")
         url = f"{self.base_url}/s/JSON/status"
         headers = {
             "Authorization": f"Bearer {self.access_token}",
             "Content-Type": "application/json",
         }
-
-        # Extract date from timestamp
-        day = timestamp.split(" ")[0]
-
-        # Format history according to iBroadcast API spec
-        history = [
-            {
-                "day": day,
-                "plays": {str(track_id): 1},
-                "detail": {str(track_id): [{"event": "play", "ts": timestamp}]},
-            }
-        ]
-
         payload = {"mode": "status", "history": history}
 
         try:
-            response = self.session.post(url, json=payload, headers=headers)
-            data = response.json()
-            return data.get("result", False)
-        except Exception as e:
-            print(f"Error reporting history: {e}")
+            response = self.session.post(url, json=payload, headers=headers, timeout=30)
+        except requests.RequestException as e:
+            raise HistoryUnavailable(str(e)) from e
+        if response.status_code >= 500:
+            raise HistoryUnavailable(f"HTTP {response.status_code}")
+        if response.status_code >= 400:
             return False
+        try:
+            data = response.json()
+        except ValueError as e:
+            raise HistoryUnavailable("Invalid API response") from e
+        return bool(data.get("result", False))
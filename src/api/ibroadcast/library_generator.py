@@ -0,0 +1,116 @@
+"""
+Synthetic iBroadcast libraries for tests, benchmarks and the mock server.
+
+generate_library() returns the map-encoded "library" object of a library
+response, shaped like the real one: every section has a "map" of field ->
+column index and one row list per id. Artist popularity is skewed, albums have
+8-16 tracks, some tracks and albums have additional artists, and there are a
+few large playlists.
+
+    python -m src.api.ibroadcast.library_generator --tracks 100000 --out library.json
+"""
+import argparse
+import json
+import random
+from typing import Dict
+
+ARTIST_MAP = {"name": 0, "rating": 1, "artwork_id": 2}
+ALBUM_MAP = {
+    "name": 0, "artist_id": 1, "tracks": 2, "rating": 3, "disc": 4, "year": 5,
+    "artists_additional": 6, "artists_additional_map": {"artist_id": 0, "type": 1},
+}
+TRACK_MAP = {
+    "title": 0, "album_id": 1, "artist_id": 2, "track": 3, "year": 4, "length": 5,
+    "artwork_id": 6, "rating": 7, "plays": 8, "file": 9,
+    "artists_additional": 10, "artists_additional_map": {"artist_id": 0, "type": 1},
+}
+PLAYLIST_MAP = {"name": 0, "description": 1, "artwork_id": 2, "tracks": 3}
+
+_SYLLABLES = ["la", "mo", "ri", "ka", "sen", "tor", "vel", "an", "dra", "ne", "shi", "quo", "bel", "ur", "zan", "fi"]
+
+
+def _name(rng: random.Random, words: int) -> str:
+    return " ".join(
+        "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(1, 3))).capitalize()
+        for _ in range(words)
+    )
+
+
+def generate_library(tracks: int = 10000, seed: int = 0, tracks_per_artist: int = 40,
+                     multi_artist_ratio: float = 0.15, playlists: int = None,
+                     max_playlist_size: int = 10000) -> Dict:
+    """Build a map-encoded library with roughly `tracks` tracks"""
+    rng = random.Random(seed)
+    artist_count = max(1, tracks // tracks_per_artist)
+    playlists = playlists if playlists is not None else max(5, tracks // 2000)
+
+    artists = {"map": ARTIST_MAP}
+    for artist_id in range(1, artist_count + 1):
+        artwork = artist_id if rng.random() < 0.7 else None
+        artists[str(artist_id)] = [_name(rng, rng.randint(1, 3)), rng.choice([0, 0, 0, 5, 10]), artwork]
+
+    def pick_artist():
+        # Skewed towards low ids: a few artists own many albums, most own one or two
+        return int(artist_count * rng.random() ** 3) + 1
+
+    def additional_artists(primary):
+        if artist_count < 2 or rng.random() >= multi_artist_ratio:
+            return []
+        extra = {rng.randint(1, artist_count) for _ in range(rng.randint(1, 2))} - {primary}
+        return [[a, "feat"] for a in sorted(extra)]
+
+    albums = {"map": ALBUM_MAP}
+    track_rows = {"map": TRACK_MAP}
+    track_id = 1
+    album_id = 1
+    while track_id <= tracks:
+        artist_id = pick_artist()
+        year = rng.randint(1960, 2025)
+        album_tracks = []
+        artwork_id = 100000 + album_id if rng.random() < 0.9 else None
+        for number in range(1, rng.randint(8, 16) + 1):
+            if track_id > tracks:
+                break
+            track_rows[str(track_id)] = [
+                _name(rng, rng.randint(1, 4)), album_id, artist_id, number, year,
+                rng.randint(90, 420), artwork_id, rng.choice([0, 0, 0, 0, 5, 10]),
+                int(rng.paretovariate(1.5)) - 1, f"/{album_id}/{track_id}.mp3",
+                additional_artists(artist_id),
+            ]
+            album_tracks.append(track_id)
+            track_id += 1
+        albums[str(album_id)] = [
+            _name(rng, rng.randint(1, 4)), artist_id, album_tracks, rng.choice([0, 0, 5]),
+            1, year, additional_artists(artist_id),
+        ]
+        album_id += 1
+
+    playlist_rows = {"map": PLAYLIST_MAP}
+    total_tracks = track_id - 1
+    for playlist_id in range(1, playlists + 1):
+        if playlist_id == 1:
+            size = min(total_tracks, max_playlist_size)  # One "everything" playlist
+        else:
+            size = min(total_tracks, int(rng.paretovariate(1.1) * 20))
+        playlist_rows[str(playlist_id)] = [
+            _name(rng, 2), _name(rng, 6), None, rng.sample(range(1, total_tracks + 1), size),
+        ]
+
+    return {"artists": artists, "albums": albums, "tracks": track_rows, "playlists": playlist_rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic iBroadcast library")
+    parser.add_argument("--tracks", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="library.json")
+    args = parser.parse_args()
+    library = generate_library(args.tracks, args.seed)
+    with open(args.out, "w") as f:
+        json.dump({"library": library}, f)
+    print(f"Wrote {len(library['tracks']) - 1} tracks, {len(library['albums']) - 1} albums, "
+          f"{len(library['artists']) - 1} artists, {len(library['playlists']) - 1} playlists to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
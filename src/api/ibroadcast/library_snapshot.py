@@ -0,0 +1,251 @@
+import heapq
+from array import array
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+# PYBROADCAST_LIBRARY_SNAPSHOT=1 rebuilds the snapshot after every library sync
+SNAPSHOT_ENV = "PYBROADCAST_LIBRARY_SNAPSHOT"
+
+TRACK_COLUMNS = ("track_id", "album_id", "track_number", "year", "length", "artwork_id", "rating", "plays")
+ALBUM_COLUMNS = ("album_id", "rating", "disc", "year")
+# Derived column: seconds listened, length * plays
+PLAY_TIME = "play_time"
+
+
+class LibrarySnapshot:
+    """
+    Read-only columnar copy of Tracks and Albums for smart views.
+    Each numeric column is one typed array (NumPy when installed, the array
+    module otherwise) indexed by row, with rows in track id order. Filters
+    return row indices that sorts, top-N and aggregates accept, so a
+    chain of them never builds a Track object; track_ids() turns rows back
+    into ids at the end. Artist credits (Track_Artists) are kept as two
+    parallel arrays so every credited artist counts in per-artist results.
+    """
+
+    def __init__(self, tracks: Dict[str, list], titles: List[str], credits: List[tuple],
+                 albums: Dict[str, list], album_names: List[str], artist_names: Dict[int, str],
+                 use_numpy: Optional[bool] = None):
+        self.use_numpy = HAS_NUMPY if use_numpy is None else use_numpy and HAS_NUMPY
+        self.titles = titles
+        self.album_names = album_names
+        self.artist_names = artist_names
+        self.tracks = {name: self._array(values) for name, values in tracks.items()}
+        self.albums = {name: self._array(values) for name, values in albums.items()}
+        self.size = len(titles)
+
+        track_ids = self.tracks["track_id"]
+        if self.use_numpy:
+            credit_ids = np.array([c[0] for c in credits], dtype=np.int64)
+            rows = np.searchsorted(track_ids, credit_ids)
+            known = (rows < self.size) & (track_ids[np.minimum(rows, self.size - 1)] == credit_ids) if self.size else rows < 0
+            self.credit_rows = rows[known]
+            self.credit_artists = np.array([c[1] for c in credits], dtype=np.int64)[known]
+        else:
+            position = {track_id: row for row, track_id in enumerate(track_ids)}
+            pairs = [(position[t], a) for t, a in credits if t in position]
+            self.credit_rows = array("q", [p[0] for p in pairs])
+            self.credit_artists = array("q", [p[1] for p in pairs])
+        self._rows_by_artist = None
+
+    @classmethod
+    def from_db(cls, db, use_numpy: Optional[bool] = None) -> "LibrarySnapshot":
+        """Read the tables once; NULLs become 0 so every column is a plain integer array"""
+        # Hold the database lock so a sync on another thread can't land between the reads
+        with db.lock:
+            return cls._from_db(db, use_numpy)
+
+    @classmethod
+    def _from_db(cls, db, use_numpy: Optional[bool]) -> "LibrarySnapshot":
+        track_rows = cls._tuples(db, "SELECT {}, COALESCE(title, '') FROM Tracks ORDER BY track_id".format(
+            ", ".join(f"COALESCE({c}, 0)" for c in TRACK_COLUMNS)))
+        album_rows = cls._tuples(db, "SELECT {}, COALESCE(name, '') FROM Albums ORDER BY album_id".format(
+            ", ".join(f"COALESCE({c}, 0)" for c in ALBUM_COLUMNS)))
+        credits = cls._tuples(db, "SELECT track_id, artist_id FROM Track_Artists ORDER BY ta_id")
+        artist_names = dict(cls._tuples(db, "SELECT artist_id, name FROM Artists"))
+
+        track_columns = list(zip(*track_rows)) or [()] * (len(TRACK_COLUMNS) + 1)
+        album_columns = list(zip(*album_rows)) or [()] * (len(ALBUM_COLUMNS) + 1)
+        return cls(
+            dict(zip(TRACK_COLUMNS, track_columns)),
+            list(track_columns[-1]),
+            credits,
+            dict(zip(ALBUM_COLUMNS, album_columns)),
+            list(album_columns[-1]),
+            artist_names,
+            use_numpy,
+        )
+
+    @staticmethod
+    def _tuples(db, query: str) -> List[tuple]:
+        cursor = db.conn.execute(query)
+        cursor.row_factory = None
+        return cursor.fetchall()
+
+    def _array(self, values):
+        if self.use_numpy:
+            return np.array(values, dtype=np.int64)
+        return array("q", values)
+
+    def column(self, name: str):
+        """A track column by name, including the derived play_time"""
+        if name == PLAY_TIME:
+            length, plays = self.tracks["length"], self.tracks["plays"]
+            if self.use_numpy:
+                return length * plays
+            return array("q", [l * p for l, p in zip(length, plays)])
+        return self.tracks[name]
+
+    # --- FILTERS ---
+    def where(self, rows=None, artist_id: Optional[int] = None, **conditions):
+        """
+        Rows matching every condition, in row order. A condition is a column
+        name with either a value (equality) or an inclusive (low, high) range
+        where either end may be None, e.g. where(year=(1990, 1999), rating=(4, None)).
+        """
+        if self.use_numpy:
+            mask = np.ones(self.size, dtype=bool)
+            if rows is not None:
+                mask[:] = False
+                mask[rows] = True
+            mask = self._mask(self.column, mask, conditions)
+            if artist_id is not None:
+                credited = np.zeros(self.size, dtype=bool)
+                credited[self.credit_rows[self.credit_artists == artist_id]] = True
+                mask &= credited
+            return np.flatnonzero(mask)
+
+        result = self._filter(self.column, range(self.size) if rows is None else rows, conditions)
+        if artist_id is not None:
+            credited = self._artist_rows().get(artist_id, set())
+            result = [r for r in result if r in credited]
+        return list(result)
+
+    @staticmethod
+    def _mask(column, mask, conditions: Dict):
+        for name, condition in conditions.items():
+            values = column(name)
+            if isinstance(condition, tuple):
+                low, high = condition
+                if low is not None:
+                    mask &= values >= low
+                if high is not None:
+                    mask &= values <= high
+            else:
+                mask &= values == condition
+        return mask
+
+    @staticmethod
+    def _filter(column, rows, conditions: Dict):
+        for name, condition in conditions.items():
+            values = column(name)
+            if isinstance(condition, tuple):
+                low, high = condition
+                rows = [r for r in rows if (low is None or values[r] >= low) and (high is None or values[r] <= high)]
+            else:
+                rows = [r for r in rows if values[r] == condition]
+        return rows
+
+    def _artist_rows(self) -> Dict[int, set]:
+        if self._rows_by_artist is None:
+            rows_by_artist: Dict[int, set] = {}
+            for row, artist_id in zip(self.credit_rows, self.credit_artists):
+                rows_by_artist.setdefault(artist_id, set()).add(row)
+            self._rows_by_artist = rows_by_artist
+        return self._rows_by_artist
+
+    def _all_rows(self, rows):
+        if rows is not None:
+            return rows
+        return np.arange(self.size) if self.use_numpy else range(self.size)
+
+    # --- SORTS ---
+    def order_by(self, column: str, rows=None, descending: bool = False):
+        """Rows sorted by column; ties keep row (track id) order"""
+        values = self.column(column)
+        rows = self._all_rows(rows)
+        if self.use_numpy:
+            rows = np.asarray(rows, dtype=np.int64)
+            keys = -values[rows] if descending else values[rows]
+            return rows[np.argsort(keys, kind="stable")]
+        if descending:
+            return sorted(rows, key=lambda r: -values[r])
+        return sorted(rows, key=values.__getitem__)
+
+    def top(self, column: str, n: int = 50, rows=None):
+        """The n rows with the highest values, highest first (most played, top rated...)"""
+        values = self.column(column)
+        rows = self._all_rows(rows)
+        if self.use_numpy:
+            rows = np.asarray(rows, dtype=np.int64)
+            if n < len(rows):
+                # Keep everything at or above the n-th highest value so ties
+                # break by row order, like the sort below
+                candidates = values[rows]
+                nth = -np.partition(-candidates, n - 1)[n - 1]
+                rows = rows[candidates >= nth]
+            return self.order_by(column, rows, descending=True)[:n]
+        return heapq.nlargest(n, rows, key=values.__getitem__)
+
+    # --- AGGREGATES ---
+    def sum_by(self, key: str, column: str = "length", rows=None) -> Dict[int, int]:
+        """
+        Total of column per key, where key is artist_id (every credited artist)
+        or a track column such as album_id or year. sum_by("artist_id", "play_time")
+        is listening time per artist.
+        """
+        return self._totals(key, self.column(column), rows)
+
+    def count_by(self, key: str, rows=None) -> Dict[int, int]:
+        """Number of tracks per key, with the same keys as sum_by"""
+        ones = np.ones(self.size, dtype=np.int64) if self.use_numpy else array("q", [1]) * self.size
+        return self._totals(key, ones, rows)
+
+    def _totals(self, key: str, values, rows) -> Dict[int, int]:
+        if key == "artist_id":
+            key_rows, keys = self.credit_rows, self.credit_artists
+            if rows is not None:
+                if self.use_numpy:
+                    selected = np.zeros(self.size, dtype=bool)
+                    selected[rows] = True
+                    keep = selected[key_rows]
+                    key_rows, keys = key_rows[keep], keys[keep]
+                else:
+                    selected = set(rows)
+                    pairs = [(r, k) for r, k in zip(key_rows, keys) if r in selected]
+                    key_rows, keys = [p[0] for p in pairs], [p[1] for p in pairs]
+        else:
+            key_rows = self._all_rows(rows)
+            column_keys = self.column(key)
+            keys = column_keys[key_rows] if self.use_numpy else [column_keys[r] for r in key_rows]
+
+        if self.use_numpy:
+            unique, inverse = np.unique(np.asarray(keys, dtype=np.int64), return_inverse=True)
+            totals = np.bincount(inverse, weights=values[key_rows], minlength=len(unique))
+            return dict(zip(unique.tolist(), totals.astype(np.int64).tolist()))
+        totals: Dict[int, int] = {}
+        for row, k in zip(key_rows, keys):
+            totals[k] = totals.get(k, 0) + values[row]
+        return totals
+
+    # --- ALBUMS ---
+    def albums_where(self, **conditions) -> List[int]:
+        """Album ids matching equality or (low, high) conditions on ALBUM_COLUMNS"""
+        ids = self.albums["album_id"]
+        if self.use_numpy:
+            mask = self._mask(self.albums.__getitem__, np.ones(len(ids), dtype=bool), conditions)
+            return ids[mask].tolist()
+        return [ids[r] for r in self._filter(self.albums.__getitem__, range(len(ids)), conditions)]
+
+    # --- RESULTS ---
+    def track_ids(self, rows) -> List[int]:
+        ids = self.tracks["track_id"]
+        if self.use_numpy:
+            return ids[np.asarray(rows, dtype=np.int64)].tolist()
+        return [ids[r] for r in rows]
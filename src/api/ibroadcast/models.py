@@ -1,33 +1,37 @@
+import sys
 from dataclasses import dataclass, field
 from typing import List, Optional
 
+# Slotted models have no per-instance __dict__, which matters with a full library
+# in memory; dataclass(slots=True) needs Python 3.10
+SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+@dataclass(**SLOTS)
 class BaseModel:
     id: int = 0
     name: str = ""
 
 
-@dataclass
+@dataclass(**SLOTS)
 class Artist(BaseModel):
     rating: int = 0
     artwork_id: int = 0
 
 
-@dataclass
+@dataclass(**SLOTS)
 class Album(BaseModel):
     rating: int = 0
     disc: int = 0
     year: int = 0
 
 
-@dataclass
+@dataclass(**SLOTS)
 class ExtraData:
     artists: List[Artist] = field(default_factory=list)
     artist_name: Optional[str] = None
 
 
-@dataclass
+@dataclass(**SLOTS)
 class Track(BaseModel):
     track_number: int = 0
     year: int = 0
@@ -39,7 +43,7 @@ class Track(BaseModel):
     extra_data: Optional[ExtraData] = None
 
 
-@dataclass
+@dataclass(**SLOTS)
 class Playlist(BaseModel):
     description: Optional[str] = None
     artwork_id: int = 0
@@ -2,20 +2,16 @@ from http.server import BaseHTTPRequestHandler
 from urllib.parse import parse_qs
 
 class OAuthCallbackHandler(BaseHTTPRequestHandler):
-    """Handle OAuth callback"""
-    auth_code = None
-    auth_state = None
-    
+    """Handle OAuth callback and report it to the owning OAuthCallbackServer"""
+
     def do_GET(self):
         # Parse the callback URL
         if self.path.startswith('/callback'):
             query_string = self.path.split('?', 1)[1] if '?' in self.path else ''
             params = parse_qs(query_string)
             
+            state = params.get('state', [None])[0]
             if 'code' in params:
-                OAuthCallbackHandler.auth_code = params['code'][0]
-                OAuthCallbackHandler.auth_state = params.get('state', [None])[0]
-                
                 self.send_response(200)
                 self.send_header('Content-type', 'text/html')
                 self.end_headers()
@@ -28,6 +24,7 @@ class OAuthCallbackHandler(BaseHTTPRequestHandler):
                     </body>
                     </html>
                 ''')
+                self.server.report(params['code'][0], state, None)
             else:
                 error = params.get('error', ['Unknown error'])[0]
                 error_desc = params.get('error_description', [''])[0]
@@ -45,7 +42,12 @@ class OAuthCallbackHandler(BaseHTTPRequestHandler):
                     </body>
                     </html>
                 '''.encode())
-    
+                self.server.report(None, state, f"{error}: {error_desc}" if error_desc else error)
+        else:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
     def log_message(self, format, *args):
         # Suppress logging
         pass
\ No newline at end of file
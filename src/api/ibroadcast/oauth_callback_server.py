@@ -0,0 +1,39 @@
+import threading
+from http.server import HTTPServer
+from typing import Callable, Optional
+
+from src.api.ibroadcast.oauth_callback_handler import OAuthCallbackHandler
+
+
+class OAuthCallbackServer(HTTPServer):
+    """
+    Local redirect target for the OAuth flow.
+    Serves on a background thread and hands the first callback to on_callback
+    as (code, state, error) from that thread. stop() shuts the server down and
+    joins the thread, so the port is free again when it returns.
+    """
+
+    def __init__(self, on_callback: Callable[[Optional[str], Optional[str], Optional[str]], None],
+                 host: str = "localhost", port: int = 8888):
+        super().__init__((host, port), OAuthCallbackHandler)
+        self.on_callback = on_callback
+        self.reported = False
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    def report(self, code: Optional[str], state: Optional[str], error: Optional[str]):
+        """Called by the handler; only the first callback counts"""
+        if self.reported:
+            return
+        self.reported = True
+        self.on_callback(code, state, error)
+
+    def stop(self):
+        if self.thread is not None:
+            self.shutdown()
+            self.thread.join(timeout=5)
+            self.thread = None
+        self.server_close()
@@ -3,6 +3,8 @@ from PyQt6.QtWebSockets import QWebSocket
 import json
 import traceback
 
+QUEUE_URL = "wss://queue.ibroadcast.com"
+
 class PlayQueueSocket(QObject):
     stateUpdated = pyqtSignal(dict)
     libraryUpdateRequested = pyqtSignal(str)
@@ -10,8 +12,9 @@ class PlayQueueSocket(QObject):
     connected = pyqtSignal()
     disconnected = pyqtSignal()
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, server_url: str = QUEUE_URL):
         super().__init__(parent)
+        self.server_url = server_url
         self.socket = QWebSocket()
         self.socket.connected.connect(self._on_connected)
         self.socket.disconnected.connect(self._on_disconnected)
@@ -31,7 +34,7 @@ class PlayQueueSocket(QObject):
         if session_uuid:
             self.session_uuid = session_uuid
         self.manual_disconnect = False
-        url = f"wss://queue.ibroadcast.com/ws?token={token}&onequeue=1"
+        url = f"{self.server_url}/ws?token={token}&onequeue=1"
         self.socket.open(QUrl(url))
 
     def disconnect_from_server(self):
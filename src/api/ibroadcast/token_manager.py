@@ -0,0 +1,162 @@
+import threading
+import time
+from typing import Callable, Optional
+
+
+class RefreshRejected(Exception):
+    """The token endpoint refused the refresh token; retrying will not help"""
+
+
+class TokenManager:
+    """
+    Holds the OAuth tokens and keeps the access token fresh.
+    The expiry from the token response is tracked and a background timer
+    refreshes the token refresh_margin seconds before it runs out. Callers that
+    need a refresh while one is already running wait for that one instead of
+    starting their own. A failed refresh is retried with exponential backoff;
+    a rejected one (request_refresh raising RefreshRejected) clears the tokens
+    and calls on_rejected instead.
+    """
+
+    def __init__(self, request_refresh: Callable[[str], Optional[dict]],
+                 on_refreshed: Optional[Callable[[], None]] = None,
+                 refresh_margin: float = 300, retry_delay: float = 60,
+                 max_retry_delay: float = 3600,
+                 on_rejected: Optional[Callable[[], None]] = None):
+        self.request_refresh = request_refresh
+        self.on_refreshed = on_refreshed
+        self.on_rejected = on_rejected
+        self.refresh_margin = refresh_margin
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+
+        self.access_token: Optional[str] = None
+        self.refresh_token: Optional[str] = None
+        self.expires_at: Optional[float] = None
+
+        self.lock = threading.Lock()
+        self.in_flight: Optional[threading.Event] = None
+        self.last_result = False
+        self.timer: Optional[threading.Timer] = None
+        # Consecutive failed refreshes, and when the next retry is due
+        self.failures = 0
+        self.retry_at: Optional[float] = None
+
+    def set_tokens(self, access_token, refresh_token=None, expires_in=None, expires_at=None):
+        """Store new tokens; expires_in (seconds) wins over an absolute expires_at"""
+        with self.lock:
+            self.access_token = access_token
+            if refresh_token is not None:
+                self.refresh_token = refresh_token
+            if expires_in is not None:
+                self.expires_at = time.time() + float(expires_in)
+            else:
+                self.expires_at = expires_at
+            self.failures = 0
+            self.retry_at = None
+        self._schedule()
+
+    def clear(self):
+        self._cancel_timer()
+        with self.lock:
+            self.access_token = None
+            self.refresh_token = None
+            self.expires_at = None
+            self.failures = 0
+            self.retry_at = None
+
+    def needs_refresh(self) -> bool:
+        expires_at = self.expires_at
+        return expires_at is not None and time.time() >= expires_at - self.refresh_margin
+
+    def ensure_fresh(self) -> Optional[str]:
+        """
+        Return a usable access token, refreshing first only if it is about to
+        expire. While a failed refresh waits for its retry, the current token is
+        returned as is rather than blocking the caller on another request.
+        """
+        retry_at = self.retry_at
+        if self.refresh_token and self.needs_refresh() and (retry_at is None or time.time() >= retry_at):
+            self.refresh()
+        return self.access_token
+
+    def refresh(self) -> bool:
+        """Refresh the access token, or wait for the refresh already in flight"""
+        with self.lock:
+            event = self.in_flight
+            owner = event is None
+            if owner:
+                event = threading.Event()
+                self.in_flight = event
+            refresh_token = self.refresh_token
+        if not owner:
+            event.wait(timeout=60)
+            return self.last_result
+
+        token_data = None
+        rejected = False
+        try:
+            if refresh_token:
+                token_data = self.request_refresh(refresh_token)
+        except RefreshRejected as e:
+            print(f"Refresh token rejected, login required: {e}")
+            rejected = True
+        except Exception as e:
+            print(f"Failed to refresh access token: {e}")
+        ok = bool(token_data and token_data.get("access_token"))
+        if ok:
+            self.set_tokens(
+                token_data["access_token"],
+                token_data.get("refresh_token"),
+                expires_in=token_data.get("expires_in"),
+            )
+            if self.on_refreshed:
+                try:
+                    self.on_refreshed()
+                except Exception as e:
+                    print(f"Failed to save refreshed token: {e}")
+        elif rejected:
+            self.clear()
+        elif refresh_token:
+            self._retry_later()
+
+        with self.lock:
+            self.last_result = ok
+            self.in_flight = None
+        event.set()
+        if rejected and self.on_rejected:
+            try:
+                self.on_rejected()
+            except Exception as e:
+                print(f"Failed to handle rejected refresh token: {e}")
+        return ok
+
+    def _retry_later(self):
+        with self.lock:
+            self.failures += 1
+            delay = min(self.retry_delay * 2 ** (self.failures - 1), self.max_retry_delay)
+            self.retry_at = time.time() + delay
+        self._schedule(delay)
+
+    def _schedule(self, delay: Optional[float] = None):
+        self._cancel_timer()
+        if delay is None:
+            if self.expires_at is None or not self.refresh_token:
+                return
+            delay = max(0.0, self.expires_at - self.refresh_margin - time.time())
+        timer = threading.Timer(delay, self._background_refresh)
+        timer.daemon = True
+        with self.lock:
+            self.timer = timer
+        timer.start()
+
+    def _cancel_timer(self):
+        with self.lock:
+            timer = self.timer
+            self.timer = None
+        if timer is not None:
+            timer.cancel()
+
+    def _background_refresh(self):
+        # A failure schedules its own retry
+        self.refresh()
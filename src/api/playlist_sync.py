@@ -0,0 +1,66 @@
+import queue
+import threading
+from typing import Callable, Dict, Optional
+
+
+class PlaylistSync:
+    """
+    Background reconciler for optimistic playlist edits.
+    Each mutation has already been applied to SQLite by the caller; here its
+    request is sent to the server in submission order. On success on_success
+    gets the server response, on failure rollback undoes the local change.
+    on_done always receives the final result dict.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.jobs = queue.Queue()
+        self.worker = None
+
+    def submit(self, send: Callable[[], Optional[Dict]], rollback: Callable[[], None],
+               on_success: Optional[Callable[[Dict], None]] = None,
+               on_done: Optional[Callable[[Dict], None]] = None):
+        with self.lock:
+            self.jobs.put((send, rollback, on_success, on_done))
+            if self.worker is None:
+                self.worker = threading.Thread(target=self._run, daemon=True)
+                self.worker.start()
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until every submitted mutation has been reconciled"""
+        worker = self.worker
+        if worker is not None:
+            worker.join(timeout)
+        return self.worker is None
+
+    def _run(self):
+        while True:
+            with self.lock:
+                if self.jobs.empty():
+                    self.worker = None
+                    return
+                send, rollback, on_success, on_done = self.jobs.get()
+            result = self._apply(send, rollback, on_success)
+            if on_done:
+                try:
+                    on_done(result)
+                except Exception as e:
+                    pass
+
+    def _apply(self, send, rollback, on_success) -> Dict:
+        try:
+            response = send()
+        except Exception as e:
+            response = None
+        if response is not None:
+            try:
+                if on_success:
+                    on_success(response)
+                return {"success": True, **response}
+            except Exception as e:
+                pass
+        try:
+            rollback()
+        except Exception as e:
+            print(f"Error rolling back playlist change: {e}")
+        return {"success": False, "message": "API Error"}
@@ -0,0 +1,439 @@
+import bisect
+import hashlib
+import json
+import os
+import re
+import threading
+import requests
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+
+CHUNK_SIZE = 64 * 1024
+# Registered stream URLs and RangeStores kept in memory; the oldest are dropped first
+MAX_ROUTES = 256
+MAX_OPEN_STORES = 16
+
+
+class RangeStore:
+    """
+    Sparse on-disk copy of one upstream file.
+    Fetched byte ranges are kept as sorted, merged half-open [start, end) intervals
+    in a JSON sidecar next to the data file.
+    """
+
+    def __init__(self, cache_dir: Path, key: str):
+        self.digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        self.data_path = cache_dir / f"{self.digest}.bin"
+        self.meta_path = cache_dir / f"{self.digest}.json"
+        self.lock = threading.Lock()
+        self.total: Optional[int] = None
+        self.content_type = "application/octet-stream"
+        self.ranges = []
+        self.size = 0  # Bytes fetched, the sum of the ranges
+        self.users = 0  # Requests being served from this store; guarded by the proxy lock
+        if self.meta_path.exists() and self.data_path.exists():
+            try:
+                with open(self.meta_path, "r") as f:
+                    meta = json.load(f)
+                self.total = meta.get("total")
+                self.content_type = meta.get("content_type", self.content_type)
+                self.ranges = [list(r) for r in meta.get("ranges", [])]
+            except Exception as e:
+                self.ranges = []
+        self.size = sum(e - s for s, e in self.ranges)
+
+    def set_info(self, total: int, content_type: Optional[str]):
+        with self.lock:
+            self.total = total
+            if content_type:
+                self.content_type = content_type
+            self._save_meta()
+
+    def covered_until(self, pos: int) -> Optional[int]:
+        """End of the fetched interval containing pos, or None if pos is a gap"""
+        with self.lock:
+            i = bisect.bisect_right(self.ranges, [pos, float("inf")]) - 1
+            if i >= 0 and self.ranges[i][0] <= pos < self.ranges[i][1]:
+                return self.ranges[i][1]
+            return None
+
+    def next_covered_start(self, pos: int) -> Optional[int]:
+        with self.lock:
+            for start, _ in self.ranges:
+                if start > pos:
+                    return start
+            return None
+
+    def write(self, offset: int, data: bytes) -> int:
+        """Store data at offset; returns how many of its bytes were not cached before"""
+        with self.lock:
+            mode = "r+b" if self.data_path.exists() else "wb"
+            with open(self.data_path, mode) as f:
+                f.seek(offset)
+                f.write(data)
+            before = self.size
+            self._add_range(offset, offset + len(data))
+            self.size = sum(e - s for s, e in self.ranges)
+            return self.size - before
+
+    def read(self, offset: int, length: int) -> bytes:
+        with self.lock:
+            with open(self.data_path, "rb") as f:
+                f.seek(offset)
+                return f.read(length)
+
+    def flush(self):
+        with self.lock:
+            if self.ranges or self.total is not None:
+                self._save_meta()
+
+    def delete(self):
+        """Forget every fetched range and remove the files"""
+        with self.lock:
+            self.ranges = []
+            self.size = 0
+            self.total = None
+            _unlink(self.data_path)
+            _unlink(self.meta_path)
+
+    def _add_range(self, start: int, end: int):
+        merged = []
+        for s, e in self.ranges:
+            if e < start or s > end:
+                merged.append([s, e])
+            else:
+                start, end = min(s, start), max(e, end)
+        merged.append([start, end])
+        merged.sort()
+        self.ranges = merged
+
+    def _save_meta(self):
+        with open(self.meta_path, "w") as f:
+            json.dump({"total": self.total, "content_type": self.content_type, "ranges": self.ranges}, f)
+
+
+class StreamProxy:
+    """
+    Optional localhost HTTP proxy between QMediaPlayer and the streaming server.
+    Range requests are forwarded upstream, fetched bytes are cached on disk and
+    seeks into already fetched ranges are answered locally.
+    """
+
+    def __init__(self, cache_dir="cache/ranges", host="127.0.0.1", port=0, max_bytes=1024 * 1024 * 1024,
+                 max_routes=MAX_ROUTES, max_open_stores=MAX_OPEN_STORES):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_routes = max_routes
+        self.max_open_stores = max_open_stores
+        self.session = requests.Session()
+        self.lock = threading.Lock()
+        self.routes = OrderedDict()  # token -> (upstream url, key), least recently registered first
+        self.stores = OrderedDict()  # key -> RangeStore, least recently used first
+
+        # Cached bytes per store digest, least recently used first, like AudioCache
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self._load_index()
+
+        self.bytes_from_upstream = 0
+        self.bytes_from_cache = 0
+        self.upstream_requests = 0
+
+        proxy = self
+
+        class Handler(ProxyRequestHandler):
+            pass
+
+        Handler.proxy = proxy
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    def _load_index(self):
+        files = [f for f in self.cache_dir.glob("*.bin") if f.is_file()]
+        for f in sorted(files, key=lambda f: f.stat().st_mtime):
+            try:
+                with open(f.with_suffix(".json"), "r") as meta:
+                    size = sum(e - s for s, e in json.load(meta).get("ranges", []))
+            except Exception as e:
+                _unlink(f)
+                continue
+            self.entries[f.stem] = size
+            self.total_bytes += size
+        self._evict()
+
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        for store in self.stores.values():
+            store.flush()
+
+    def register(self, upstream_url: str, key: str) -> str:
+        """Return the local URL that proxies upstream_url, cached under key"""
+        token = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        with self.lock:
+            self.routes[token] = (upstream_url, key)
+            self.routes.move_to_end(token)
+            while len(self.routes) > self.max_routes:
+                self.routes.popitem(last=False)
+        return f"http://127.0.0.1:{self.port}/stream/{token}"
+
+    def acquire_store(self, key: str) -> RangeStore:
+        """The store for key, pinned against eviction until release_store"""
+        with self.lock:
+            store = self.stores.get(key)
+            if store is None:
+                store = RangeStore(self.cache_dir, key)
+                self.stores[key] = store
+            self.stores.move_to_end(key)
+            store.users += 1
+            if store.digest in self.entries:
+                self.entries.move_to_end(store.digest)
+        try:
+            os.utime(store.data_path)
+        except Exception as e:
+            pass
+        return store
+
+    def release_store(self, store: RangeStore):
+        store.flush()
+        with self.lock:
+            store.users -= 1
+            # Drop the oldest idle stores; they are reloaded from disk on demand
+            for key, open_store in list(self.stores.items()):
+                if len(self.stores) <= self.max_open_stores:
+                    break
+                if open_store.users == 0:
+                    del self.stores[key]
+
+    def stored(self, store: RangeStore, added: int):
+        """Account for newly cached bytes and evict least recently used stores over budget"""
+        with self.lock:
+            self.entries[store.digest] = store.size
+            self.entries.move_to_end(store.digest)
+            self.total_bytes += added
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used stores until the cache fits max_bytes. Lock must be held."""
+        busy = {s.digest for s in self.stores.values() if s.users}
+        for digest in list(self.entries):
+            if self.total_bytes <= self.max_bytes:
+                return
+            if digest in busy:
+                continue
+            self.total_bytes -= self.entries.pop(digest)
+            for key, open_store in list(self.stores.items()):
+                if open_store.digest == digest:
+                    del self.stores[key]
+            _unlink(self.cache_dir / f"{digest}.bin")
+            _unlink(self.cache_dir / f"{digest}.json")
+
+    def open_upstream(self, url: str, start: int, end: Optional[int] = None):
+        """Open a streaming upstream request for bytes start..end (inclusive)"""
+        range_value = f"bytes={start}-" if end is None else f"bytes={start}-{end}"
+        response = self.session.get(url, headers={"Range": range_value}, stream=True, timeout=30)
+        with self.lock:
+            self.upstream_requests += 1
+        response.raise_for_status()
+        return response
+
+    def record(self, upstream: int = 0, cached: int = 0):
+        with self.lock:
+            self.bytes_from_upstream += upstream
+            self.bytes_from_cache += cached
+
+    def get_stats(self):
+        """Bandwidth metrics for everything that went through the proxy"""
+        with self.lock:
+            served = self.bytes_from_upstream + self.bytes_from_cache
+            return {
+                "bytes_from_upstream": self.bytes_from_upstream,
+                "bytes_from_cache": self.bytes_from_cache,
+                "upstream_requests": self.upstream_requests,
+                "cache_ratio": self.bytes_from_cache / served if served else 0.0,
+                "size": self.total_bytes,
+                "count": len(self.entries),
+            }
+
+    def clear_cache(self):
+        with self.lock:
+            self.stores.clear()
+            self.entries.clear()
+            self.total_bytes = 0
+        for f in list(self.cache_dir.glob("*.bin")) + list(self.cache_dir.glob("*.json")):
+            _unlink(f)
+
+
+def _unlink(path: Path):
+    try:
+        path.unlink()
+    except Exception as e:
+        pass
+
+
+_RANGE_RE = re.compile(r"bytes=(\d*)-(\d*)")
+_CONTENT_RANGE_RE = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)")
+
+
+class ProxyRequestHandler(BaseHTTPRequestHandler):
+    """Serves /stream/<token> by stitching cached ranges and upstream gaps"""
+
+    proxy: StreamProxy = None
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        token = self.path.rsplit("/", 1)[-1]
+        with self.proxy.lock:
+            route = self.proxy.routes.get(token)
+        if not route:
+            self.send_error(404)
+            return
+        url, key = route
+        store = self.proxy.acquire_store(key)
+        try:
+            self._handle(url, store)
+        finally:
+            self.proxy.release_store(store)
+
+    def _handle(self, url, store):
+        start, end = 0, None
+        range_header = self.headers.get("Range")
+        if range_header:
+            match = _RANGE_RE.match(range_header.strip())
+            if match and match.group(1):
+                start = int(match.group(1))
+                end = int(match.group(2)) if match.group(2) else None
+            elif match and match.group(2):
+                # Suffix range: last N bytes
+                suffix = int(match.group(2))
+                try:
+                    if store.total is None:
+                        response = self._learn_total(url, store)
+                        if response is not None:
+                            response.close()
+                except Exception as e:
+                    self.send_error(502)
+                    return
+                start = max(0, store.total - suffix)
+
+        first_response = None
+        try:
+            if store.total is None:
+                first_response = self._learn_total(url, store, start)
+        except Exception as e:
+            self.send_error(502)
+            return
+
+        total = store.total
+        if end is None or end >= total:
+            end = total - 1
+        if start > end:
+            if first_response is not None:
+                first_response.close()
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{total}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(206 if range_header else 200)
+        self.send_header("Content-Type", store.content_type)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(end - start + 1))
+        if range_header:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{total}")
+        self.end_headers()
+
+        try:
+            if not self._serve(url, store, start, end, first_response):
+                # Fewer bytes than announced; the client must not reuse the connection
+                self.close_connection = True
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # Player seeked away or closed the stream
+        except Exception as e:
+            self.close_connection = True
+        finally:
+            if first_response is not None:
+                first_response.close()
+
+    def _learn_total(self, url, store, start=0):
+        """Open upstream at start and record the file size; returns the open response"""
+        response = self.proxy.open_upstream(url, start)
+        total = None
+        match = _CONTENT_RANGE_RE.match(response.headers.get("Content-Range", ""))
+        if response.status_code == 206 and match and match.group(3) != "*":
+            total = int(match.group(3))
+        elif "Content-Length" in response.headers:
+            total = int(response.headers["Content-Length"])
+            if response.status_code == 206:
+                total += start
+        if total is None:
+            response.close()
+            raise ValueError("Upstream did not report a size")
+        store.set_info(total, response.headers.get("Content-Type"))
+        if response.status_code != 206 and start > 0:
+            # Upstream ignored the range; the caller would have to skip bytes
+            response.close()
+            return None
+        return response
+
+    def _serve(self, url, store, start, end, first_response=None) -> bool:
+        """Write bytes start..end to the client; returns False if cut short"""
+        pos = start
+        while pos <= end:
+            covered_end = store.covered_until(pos)
+            if covered_end is not None:
+                stop = min(covered_end, end + 1)
+                while pos < stop:
+                    data = store.read(pos, min(CHUNK_SIZE, stop - pos))
+                    if not data:
+                        return False
+                    self.wfile.write(data)
+                    self.proxy.record(cached=len(data))
+                    pos += len(data)
+                continue
+
+            next_start = store.next_covered_start(pos)
+            gap_end = end if next_start is None else min(end, next_start - 1)
+            if first_response is not None and pos == start:
+                response = first_response
+                first_response = None
+            else:
+                response = self.proxy.open_upstream(url, pos, gap_end)
+            try:
+                skip = pos if response.status_code == 200 else 0
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    if skip:
+                        dropped = min(skip, len(chunk))
+                        chunk = chunk[dropped:]
+                        skip -= dropped
+                        if not chunk:
+                            continue
+                    chunk = chunk[: gap_end + 1 - pos]
+                    self.proxy.stored(store, store.write(pos, chunk))
+                    self.proxy.record(upstream=len(chunk))
+                    self.wfile.write(chunk)
+                    pos += len(chunk)
+                    if pos > gap_end:
+                        break
+            finally:
+                response.close()
+            if pos <= gap_end:
+                return False  # Upstream ended early
+        return True
+
+    def log_message(self, format, *args):
+        # Suppress logging
+        pass
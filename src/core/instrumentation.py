@@ -0,0 +1,203 @@
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+import types
+from typing import Callable, Dict, Optional
+
+# PYBROADCAST_PROFILE=1 turns instrumentation on at startup
+ENABLED_ENV = "PYBROADCAST_PROFILE"
+# Where to write the JSON report on exit, if anywhere
+DUMP_ENV = "PYBROADCAST_PROFILE_DUMP"
+
+# Upper bucket bounds in milliseconds; the last bucket is open ended
+BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class Histogram:
+    """Fixed-bucket distribution of values, cheap enough to update on every call"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(BUCKETS_MS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of values"""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "total": round(self.total, 3),
+            "mean": round(self.total / self.count, 3) if self.count else 0.0,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "buckets": {str(b): n for b, n in zip(BUCKETS_MS + ["inf"], self.counts) if n},
+        }
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    def __init__(self, owner, name):
+        self.owner = owner
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.owner.record_time(self.name, (time.perf_counter() - self.start) * 1000)
+        return False
+
+
+class Instrumentation:
+    """
+    Process-wide timers, counters and histograms.
+    Timers are histograms of milliseconds per call. Every entry point checks
+    enabled first, so when instrumentation is off a timed call costs one
+    attribute lookup and the wrapper call.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.timers: Dict[str, Histogram] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[str, int] = {}
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self.lock:
+            self.started = time.time()
+            self.timers.clear()
+            self.histograms.clear()
+            self.counters.clear()
+
+    def count(self, name: str, n: int = 1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name: str, value: float):
+        if not self.enabled:
+            return
+        with self.lock:
+            self._histogram(self.histograms, name).observe(value)
+
+    def record_time(self, name: str, ms: float):
+        with self.lock:
+            self._histogram(self.timers, name).observe(ms)
+
+    def timer(self, name: str):
+        """Context manager timing its block under name"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def timed(self, name: Optional[str] = None) -> Callable:
+        """Decorator timing every call of the function under name (default: its qualified name)"""
+
+        def decorator(func):
+            label = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record_time(label, (time.perf_counter() - start) * 1000)
+
+            return wrapper
+
+        return decorator
+
+    @staticmethod
+    def untimed(func):
+        """Mark a method for instrument_class to leave alone, e.g. one returning a generator"""
+        func.untimed = True
+        return func
+
+    def instrument_class(self, prefix: str) -> Callable:
+        """Class decorator timing every public method as <prefix>.<method>, except untimed ones"""
+
+        def decorator(cls):
+            for attr, value in list(vars(cls).items()):
+                if attr.startswith("_") or getattr(value, "untimed", False):
+                    continue
+                if isinstance(value, types.FunctionType):
+                    setattr(cls, attr, self.timed(f"{prefix}.{attr}")(value))
+            return cls
+
+        return decorator
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            return {
+                "enabled": self.enabled,
+                "started": self.started,
+                "uptime": round(time.time() - self.started, 3),
+                "timers_ms": {k: h.to_dict() for k, h in sorted(self.timers.items())},
+                "histograms": {k: h.to_dict() for k, h in sorted(self.histograms.items())},
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def dump(self, path: str):
+        with open(path, "w") as f:
+            f.write(self.to_json())
+
+    @staticmethod
+    def _histogram(table: Dict[str, Histogram], name: str) -> Histogram:
+        histogram = table.get(name)
+        if histogram is None:
+            histogram = table[name] = Histogram()
+        return histogram
+
+
+instrumentation = Instrumentation(enabled=os.environ.get(ENABLED_ENV) == "1")
+timed = instrumentation.timed
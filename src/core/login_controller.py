@@ -0,0 +1,114 @@
+import threading
+import webbrowser
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+
+class LoginController(QObject):
+    """
+    Event-driven login pipeline.
+    A cached token is tried first; otherwise the browser OAuth flow is started
+    and the callback server reports the redirect directly. Token exchange and
+    the first library load run on a worker thread, and the callback server is
+    stopped as soon as the callback arrives, on timeout or on cancel.
+    """
+
+    loginSucceeded = pyqtSignal()
+    loginFailed = pyqtSignal(str)
+    _callbackReceived = pyqtSignal(object, object, object)  # code, state, error
+    _workerFinished = pyqtSignal(int, bool, str)  # attempt, success, message
+
+    def __init__(self, api, timeout_ms: int = 5 * 60 * 1000, open_url=webbrowser.open, parent=None):
+        super().__init__(parent)
+        self.api = api
+        self.open_url = open_url
+        self.attempt = 0
+        self.in_progress = False
+
+        self.timeout_timer = QTimer(self)
+        self.timeout_timer.setSingleShot(True)
+        self.timeout_timer.setInterval(timeout_ms)
+        self.timeout_timer.timeout.connect(self._on_timeout)
+
+        self._callbackReceived.connect(self._on_callback)
+        self._workerFinished.connect(self._on_worker_finished)
+
+    def login(self):
+        """Log in with the cached token if it still works, else via the browser"""
+        self.cancel()
+        self.in_progress = True
+        if self.api.access_token:
+            self._run_in_background(self._load_with_cached_token)
+        else:
+            self.start_oauth()
+
+    def start_oauth(self):
+        self.in_progress = True
+        res = self.api.start_oauth_flow(self._callbackReceived.emit)
+        if "auth_url" not in res:
+            self._fail(res.get("message", "Failed to start login flow"))
+            return
+        self.timeout_timer.start()
+        self.open_url(res["auth_url"])
+
+    def cancel(self):
+        """Abandon the current attempt and free the callback port"""
+        self.attempt += 1
+        self.in_progress = False
+        self.timeout_timer.stop()
+        self.api.stop_callback_server()
+
+    def _on_callback(self, code, state, error):
+        self.timeout_timer.stop()
+        self.api.stop_callback_server()
+        if not self.in_progress:
+            return
+        if error or not code:
+            self._fail(f"Login failed: {error or 'Unknown error'}")
+            return
+        self._run_in_background(lambda: self._exchange_and_load(code, state))
+
+    def _on_timeout(self):
+        self.api.stop_callback_server()
+        if self.in_progress:
+            self._fail("Login timed out. Please try again.")
+
+    def _run_in_background(self, job):
+        attempt = self.attempt
+
+        def run():
+            try:
+                success, message = job()
+            except Exception as e:
+                success, message = False, f"Login failed: {e}"
+            self._workerFinished.emit(attempt, success, message)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _load_with_cached_token(self):
+        if self.api.load_library().get("success"):
+            return True, ""
+        return False, ""  # No message: fall back to the browser flow
+
+    def _exchange_and_load(self, code, state):
+        token_res = self.api.complete_oauth(code, state)
+        if not token_res.get("success"):
+            return False, f"Login failed: {token_res.get('message', 'Unknown error')}"
+        if not self.api.load_library().get("success"):
+            return False, "Failed to load library after login."
+        return True, ""
+
+    def _on_worker_finished(self, attempt, success, message):
+        if attempt != self.attempt or not self.in_progress:
+            return  # Cancelled or superseded
+        if success:
+            self.in_progress = False
+            self.loginSucceeded.emit()
+        elif message:
+            self._fail(message)
+        else:
+            self.start_oauth()
+
+    def _fail(self, message):
+        self.in_progress = False
+        self.loginFailed.emit(message)
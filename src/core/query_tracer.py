@@ -0,0 +1,397 @@
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+# PYBROADCAST_SQL_TRACE=1 installs the tracer on the library database at startup
+TRACE_ENV = "PYBROADCAST_SQL_TRACE"
+# Slow-query threshold in milliseconds and where the slow-query log goes
+SLOW_MS_ENV = "PYBROADCAST_SQL_SLOW_MS"
+LOG_ENV = "PYBROADCAST_SQL_LOG"
+DEFAULT_LOG = "slow_queries.log"
+
+# The progress handler runs every PROGRESS_OPS virtual machine instructions
+PROGRESS_OPS = 100
+# Longest statement text kept in reports and the log
+MAX_SQL = 2000
+
+# Frames from these files are the plumbing between a call site and sqlite
+_DB_FILES = ("database.py",)
+_SKIP_FILES = ("query_tracer.py", "instrumentation.py")
+# The lock wrapper around every DatabaseManager method
+_SKIP_FUNCTIONS = ("synchronized_method",)
+
+_PLACEHOLDERS = re.compile(r"\?(\s*,\s*\?)+")
+_WHITESPACE = re.compile(r"\s+")
+# Statements sqlite3 issues itself around DML
+_TRANSACTION = ("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE")
+
+
+def normalize(sql: str) -> str:
+    """Statement shape: whitespace collapsed and IN (?, ?, ...) lists of any length folded"""
+    return _PLACEHOLDERS.sub("?...", _WHITESPACE.sub(" ", sql).strip())
+
+
+def _call_site() -> str:
+    """'file:line (function) -> db.method' for the code that called into DatabaseManager"""
+    frame = sys._getframe(2)
+    db_method = None
+    while frame is not None:
+        filename = os.path.basename(frame.f_code.co_filename)
+        if filename in _DB_FILES:
+            if frame.f_code.co_name not in _SKIP_FUNCTIONS:
+                db_method = frame.f_code.co_name
+        elif filename not in _SKIP_FILES:
+            break
+        frame = frame.f_back
+    if frame is None:
+        return f"db.{db_method}" if db_method else "<unknown>"
+    code = frame.f_code
+    site = f"{os.path.basename(code.co_filename)}:{frame.f_lineno} ({getattr(code, 'co_qualname', code.co_name)})"
+    return f"{site} -> db.{db_method}" if db_method else site
+
+
+class QueryStats:
+    """Totals for one statement issued from one call site"""
+
+    def __init__(self, sql: str, site: str):
+        self.sql = sql
+        self.site = site
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.steps = 0
+        self.last_params = None
+
+    def to_dict(self) -> Dict:
+        return {
+            "sql": self.sql[:MAX_SQL],
+            "site": self.site,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "steps": self.steps,
+            "last_params": repr(self.last_params)[:200],
+        }
+
+
+class _Call:
+    __slots__ = ("sql", "params", "site", "ms", "steps", "expanded", "done")
+
+    def __init__(self, sql, params, site):
+        self.sql = sql
+        self.params = params
+        self.site = site
+        self.ms = 0.0
+        self.steps = 0
+        self.expanded = None
+        self.done = False
+
+
+class _Action:
+    def __init__(self, name: str, implicit: bool = False):
+        self.name = name
+        self.implicit = implicit
+        self.depth = 1
+        self.counts = Counter()
+        self.sites: Dict[str, set] = {}
+        self.flagged: Dict[str, Dict] = {}
+
+
+class TracedCursor:
+    """Cursor wrapper that adds fetch time to the statement it came from"""
+
+    def __init__(self, tracer, cursor, call):
+        self._tracer = tracer
+        self._cursor = cursor
+        self._call = call
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        # row_factory and arraysize belong to the real cursor
+        if name.startswith("_"):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._cursor, name, value)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return self._tracer._run(self._call, self._cursor.__next__)
+        except StopIteration:
+            self._tracer._finish(self._call)
+            raise
+
+    def fetchone(self):
+        row = self._tracer._run(self._call, self._cursor.fetchone)
+        self._tracer._finish(self._call)
+        return row
+
+    def fetchall(self):
+        rows = self._tracer._run(self._call, self._cursor.fetchall)
+        self._tracer._finish(self._call)
+        return rows
+
+    def fetchmany(self, size=None):
+        size = self._cursor.arraysize if size is None else size
+        rows = self._tracer._run(self._call, self._cursor.fetchmany, size)
+        if len(rows) < size:
+            self._tracer._finish(self._call)
+        return rows
+
+    def close(self):
+        self._tracer._finish(self._call)
+        self._cursor.close()
+
+    def __del__(self):
+        try:
+            self._tracer._finish(self._call)
+        except Exception:
+            pass
+
+
+class TracedConnection:
+    """Stands in for DatabaseManager.conn while a tracer is installed"""
+
+    def __init__(self, tracer, conn):
+        self._tracer = tracer
+        self.raw = conn
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+    def __enter__(self):
+        return self.raw.__enter__()
+
+    def __exit__(self, *exc):
+        return self.raw.__exit__(*exc)
+
+    def execute(self, sql, params=()):
+        return self._tracer._execute(self.raw.execute, sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self._tracer._execute(self.raw.executemany, sql, seq_of_params)
+
+
+class QueryTracer:
+    """
+    Opt-in SQL tracer for DatabaseManager.
+    Records every statement with its parameters, count, duration and
+    virtual machine steps per call site. The sqlite3 trace callback supplies
+    the statement as executed (parameters bound) for the slow-query log, and
+    the progress handler counts steps, which unlike time do not depend on the
+    machine.
+
+    Statements on one thread between begin_action and end_action belong to
+    one UI action. When defer is set (e.g. to QTimer.singleShot(0, ...)),
+    statements on the main thread outside an explicit action are grouped
+    until control returns to the event loop. A statement shape executed more
+    than n_plus_one times in one action is flagged as an N+1 pattern.
+    """
+
+    def __init__(self, slow_ms: float = 50.0, n_plus_one: int = 20, log_path: Optional[str] = None):
+        self.slow_ms = slow_ms
+        self.n_plus_one = n_plus_one
+        self.log_path = log_path
+        self.log_failed = False  # Report a broken log file once, not per query
+        self.defer: Optional[Callable[[Callable], None]] = None
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.stats: Dict[tuple, QueryStats] = {}
+        self.slow_queries: List[Dict] = []
+        self.n_plus_one_patterns: List[Dict] = []
+        self.installed = []
+
+    @classmethod
+    def from_env(cls) -> "QueryTracer":
+        slow_ms = 50.0
+        try:
+            slow_ms = float(os.environ.get(SLOW_MS_ENV, slow_ms))
+        except ValueError:
+            pass
+        return cls(slow_ms=slow_ms, log_path=os.environ.get(LOG_ENV, DEFAULT_LOG))
+
+    # --- INSTALLATION ---
+    def install(self, db):
+        """Route db.conn through the tracer and register the sqlite hooks"""
+        if isinstance(db.conn, TracedConnection):
+            return
+        conn = db.conn
+        conn.set_trace_callback(self._on_statement)
+        conn.set_progress_handler(self._on_progress, PROGRESS_OPS)
+        db.conn = TracedConnection(self, conn)
+        self.installed.append(db)
+
+    def uninstall(self, db):
+        if not isinstance(db.conn, TracedConnection):
+            return
+        conn = db.conn.raw
+        conn.set_trace_callback(None)
+        conn.set_progress_handler(None, PROGRESS_OPS)
+        db.conn = conn
+        if db in self.installed:
+            self.installed.remove(db)
+
+    # --- ACTIONS ---
+    def begin_action(self, name: str):
+        action = getattr(self.local, "action", None)
+        if action is not None and not action.implicit:
+            action.depth += 1
+            return
+        if action is not None:
+            self._close_action(action)
+        self.local.action = _Action(name)
+
+    def end_action(self):
+        action = getattr(self.local, "action", None)
+        if action is None or action.implicit:
+            return
+        action.depth -= 1
+        if action.depth == 0:
+            self._close_action(action)
+            self.local.action = None
+
+    @contextmanager
+    def action(self, name: str):
+        self.begin_action(name)
+        try:
+            yield
+        finally:
+            self.end_action()
+
+    def _current_action(self, site: str) -> Optional[_Action]:
+        action = getattr(self.local, "action", None)
+        if action is None and self.defer is not None and threading.current_thread() is threading.main_thread():
+            action = self.local.action = _Action(site.split(" -> ")[0], implicit=True)
+            self.defer(self._end_implicit_action)
+        return action
+
+    def _end_implicit_action(self):
+        action = getattr(self.local, "action", None)
+        if action is not None and action.implicit:
+            self._close_action(action)
+            self.local.action = None
+
+    def _close_action(self, action: _Action):
+        with self.lock:
+            for shape, pattern in action.flagged.items():
+                pattern["count"] = action.counts[shape]
+                pattern["sites"] = sorted(action.sites[shape])
+
+    # --- HOOKS ---
+    def _on_statement(self, statement: str):
+        call = getattr(self.local, "call", None)
+        if call is not None and call.expanded is None and not statement.lstrip().upper().startswith(_TRANSACTION):
+            call.expanded = statement
+
+    def _on_progress(self) -> int:
+        call = getattr(self.local, "call", None)
+        if call is not None:
+            call.steps += PROGRESS_OPS
+        return 0
+
+    # --- RECORDING ---
+    def _run(self, call: _Call, func, *args):
+        previous = getattr(self.local, "call", None)
+        self.local.call = call
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            call.ms += (time.perf_counter() - start) * 1000
+            self.local.call = previous
+
+    def _execute(self, execute, sql, params):
+        call = _Call(sql, params, _call_site())
+        self._count_in_action(call)
+        cursor = self._run(call, execute, sql, params)
+        if cursor.description is None:
+            # Not a query: the statement has already run to completion
+            self._finish(call)
+        return TracedCursor(self, cursor, call)
+
+    def _count_in_action(self, call: _Call):
+        action = self._current_action(call.site)
+        if action is None:
+            return
+        shape = normalize(call.sql)
+        action.counts[shape] += 1
+        action.sites.setdefault(shape, set()).add(call.site)
+        if action.counts[shape] == self.n_plus_one + 1:
+            pattern = {"action": action.name, "sql": shape[:MAX_SQL], "count": action.counts[shape], "sites": [call.site]}
+            action.flagged[shape] = pattern
+            with self.lock:
+                self.n_plus_one_patterns.append(pattern)
+            self._log(f"N+1 {action.name}: executed more than {self.n_plus_one} times from {call.site}: {shape}")
+
+    def _finish(self, call: _Call):
+        if call.done:
+            return
+        call.done = True
+        key = (normalize(call.sql), call.site)
+        with self.lock:
+            stats = self.stats.get(key)
+            if stats is None:
+                stats = self.stats[key] = QueryStats(key[0], call.site)
+            stats.count += 1
+            stats.total_ms += call.ms
+            stats.max_ms = max(stats.max_ms, call.ms)
+            stats.steps += call.steps
+            stats.last_params = call.params
+            if call.ms < self.slow_ms:
+                return
+            entry = {
+                "ms": round(call.ms, 3),
+                "steps": call.steps,
+                "site": call.site,
+                "sql": (call.expanded or call.sql)[:MAX_SQL],
+                "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            self.slow_queries.append(entry)
+        self._log(f"SLOW {entry['ms']:.1f} ms, {entry['steps']} steps, {entry['site']}: {_WHITESPACE.sub(' ', entry['sql'])}")
+
+    def _log(self, line: str):
+        if not self.log_path:
+            return
+        try:
+            with open(self.log_path, "a") as f:
+                f.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')} {line}\n")
+        except Exception as e:
+            if not self.log_failed:
+                self.log_failed = True
+                print(f"Failed to write query log: {e}")
+
+    # --- REPORTS ---
+    def reset(self):
+        with self.lock:
+            self.stats.clear()
+            self.slow_queries.clear()
+            self.n_plus_one_patterns.clear()
+
+    def report(self, limit: int = 20) -> Dict:
+        """The statements with the most total time, plus slow queries and N+1 patterns"""
+        with self.lock:
+            top = sorted(self.stats.values(), key=lambda s: s.total_ms, reverse=True)[:limit]
+            return {
+                "queries": sum(s.count for s in self.stats.values()),
+                "total_ms": round(sum(s.total_ms for s in self.stats.values()), 3),
+                "top": [s.to_dict() for s in top],
+                "slow": list(self.slow_queries),
+                "n_plus_one": [dict(p) for p in self.n_plus_one_patterns],
+            }
+
+    def write_summary(self, limit: int = 20):
+        """Append the heaviest statements to the log, for the end of a session"""
+        report = self.report(limit)
+        self._log(f"SUMMARY {report['queries']} queries, {report['total_ms']:.1f} ms")
+        for s in report["top"]:
+            self._log(f"  {s['total_ms']:10.1f} ms {s['count']:7d}x {s['site']}: {s['sql'][:200]}")
@@ -0,0 +1,120 @@
+import threading
+from typing import List, Optional, Tuple
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from src.api.ibroadcast.models import Artist, Album, Track, Playlist, BaseModel
+
+
+class SearchController(QObject):
+    """
+    Debounced, asynchronous library search.
+    Queries run on a worker thread and every run is tagged with a generation
+    number; results from a generation that is no longer current are dropped.
+    When a query only extends the previous one and the library has not
+    changed since, the previous result set is filtered instead of hitting the
+    database again.
+    """
+
+    resultsReady = pyqtSignal(str, list)  # query, [(model, artwork_url), ...]
+    _workerFinished = pyqtSignal(int, str, list, object)
+
+    def __init__(self, api, debounce_ms: int = 250, parent=None):
+        super().__init__(parent)
+        self.api = api
+        self.generation = 0
+        self.pending_query = ""
+        self.last_query: Optional[str] = None
+        self.last_results: List[Tuple[BaseModel, str]] = []
+        # api.library_version() the cached results were read at
+        self.last_version: Optional[int] = None
+
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(debounce_ms)
+        self.debounce_timer.timeout.connect(lambda: self._start(self.pending_query))
+
+        self._workerFinished.connect(self._on_worker_finished)
+
+    def set_query(self, text: str):
+        """Schedule a search once typing has paused"""
+        self.pending_query = text
+        self.debounce_timer.start()
+
+    def search_now(self, text: str):
+        """Run a search immediately, superseding anything pending"""
+        self.debounce_timer.stop()
+        self._start(text)
+
+    def cancel(self):
+        """Drop the pending search and any result still in flight"""
+        self.debounce_timer.stop()
+        self.generation += 1
+        # The next search starts from the database, not whatever was typed before
+        self.invalidate()
+
+    def invalidate(self):
+        """Forget the cached result set, e.g. after the library changed"""
+        self.last_query = None
+        self.last_results = []
+        self.last_version = None
+
+    def _start(self, text: str):
+        self.generation += 1
+        generation = self.generation
+        query = text.lower()
+
+        base = None
+        if self._can_refine(query):
+            base = list(self.last_results)
+
+        threading.Thread(
+            target=self._run, args=(generation, text, query, base, self.last_version), daemon=True
+        ).start()
+
+    def _can_refine(self, query: str) -> bool:
+        if not self.last_query or not query.startswith(self.last_query):
+            return False
+        # LIKE wildcards don't mean the same thing to the substring filter
+        if "%" in query or "_" in query:
+            return False
+        # Local edits (playlist renames, re-keyed temporary ids) change rows under the cache
+        return self.last_version == self.api.library_version()
+
+    def _run(self, generation: int, text: str, query: str, base, version: Optional[int]):
+        try:
+            if base is not None:
+                results = [(m, url) for m, url in base if query in (m.name or "").lower()]
+            else:
+                version = self.api.library_version()
+                results = self._query(text)
+        except Exception as e:
+            print(f"Search failed: {e}")
+            results = []
+            version = None
+        if generation == self.generation:
+            self._workerFinished.emit(generation, query, results, version)
+
+    def _query(self, text: str) -> List[Tuple[BaseModel, str]]:
+        models = self.api.search(text)
+        album_ids = [m.id for m in models if isinstance(m, Album)]
+        album_artwork = self.api.get_album_artwork_ids(album_ids) if album_ids else {}
+
+        results = []
+        for model in models:
+            if isinstance(model, Album):
+                artwork_id = album_artwork.get(model.id, 0)
+            elif isinstance(model, (Artist, Track, Playlist)):
+                artwork_id = model.artwork_id
+            else:
+                continue
+            results.append((model, self.api.get_artwork_url(artwork_id)))
+        return results
+
+    def _on_worker_finished(self, generation: int, query: str, results: list, version: Optional[int]):
+        if generation != self.generation:
+            return  # A newer search has started since
+        self.last_query = query
+        self.last_results = results
+        self.last_version = version
+        self.resultsReady.emit(query, results)
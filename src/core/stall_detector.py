@@ -0,0 +1,140 @@
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Dict, List, Optional
+
+from PyQt6.QtCore import QObject, QTimer
+
+from src.core.instrumentation import instrumentation
+
+# PYBROADCAST_STALL_MS=<ms> starts the detector with that threshold
+THRESHOLD_ENV = "PYBROADCAST_STALL_MS"
+# Where to write the stall report on exit
+REPORT_ENV = "PYBROADCAST_STALL_REPORT"
+DEFAULT_REPORT = "stalls.json"
+
+# Innermost frames kept per captured stack
+MAX_FRAMES = 30
+
+
+class StallDetector(QObject):
+    """
+    Watchdog for the Qt main thread.
+    A timer on the main thread stamps a heartbeat every heartbeat_ms. A
+    daemon thread checks the stamp; when it is older than threshold_ms the
+    main thread's Python stack is captured, and once the heartbeat resumes
+    the stall is added to the report under that stack's signature.
+    """
+
+    def __init__(self, threshold_ms: float = 200.0, heartbeat_ms: int = 20, parent=None):
+        super().__init__(parent)
+        self.threshold_ms = threshold_ms
+        self.heartbeat_ms = heartbeat_ms
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.main_ident = None
+        self.last_beat = time.monotonic()
+        self.stalls: Dict[tuple, Dict] = {}
+        self.total_stalls = 0
+
+        self.heartbeat = QTimer(self)
+        self.heartbeat.setInterval(heartbeat_ms)
+        self.heartbeat.timeout.connect(self._beat)
+
+    @classmethod
+    def from_env(cls, parent=None) -> Optional["StallDetector"]:
+        try:
+            threshold_ms = float(os.environ.get(THRESHOLD_ENV, ""))
+        except ValueError:
+            return None
+        return cls(threshold_ms, parent=parent)
+
+    def start(self):
+        """Call from the main thread"""
+        if self.thread is not None:
+            return
+        self.main_ident = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self.stop_event.clear()
+        self.heartbeat.start()
+        self.thread = threading.Thread(target=self._watch, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.heartbeat.stop()
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=1)
+            self.thread = None
+
+    def _beat(self):
+        self.last_beat = time.monotonic()
+
+    # --- WATCHDOG ---
+    def _watch(self):
+        poll = max(self.threshold_ms / 4000, 0.005)
+        last_poll = time.monotonic()
+        stall = None  # (heartbeat it started after, signature, stack)
+        while True:
+            stopping = self.stop_event.wait(poll)
+            now = time.monotonic()
+            beat = self.last_beat
+            if stall is not None and (beat != stall[0] or stopping):
+                end = beat if beat != stall[0] else now
+                self._record(stall[1], stall[2], (end - stall[0]) * 1000)
+                stall = None
+            if stopping:
+                return
+            # A late poll means the whole process was suspended, not the UI thread
+            suspended = now - last_poll > poll + self.threshold_ms / 1000
+            last_poll = now
+            if stall is None and not suspended and (now - beat) * 1000 > self.threshold_ms:
+                stack = self._capture()
+                if stack:
+                    stall = (beat, tuple(stack), stack)
+
+    def _capture(self) -> List[str]:
+        frame = sys._current_frames().get(self.main_ident)
+        if frame is None:
+            return []
+        summary = traceback.extract_stack(frame)[-MAX_FRAMES:]
+        return [f"{os.path.basename(f.filename)}:{f.lineno} in {f.name}" for f in summary]
+
+    def _record(self, signature: tuple, stack: List[str], ms: float):
+        with self.lock:
+            self.total_stalls += 1
+            entry = self.stalls.get(signature)
+            if entry is None:
+                entry = self.stalls[signature] = {"stack": stack, "count": 0, "total_ms": 0.0, "max_ms": 0.0, "first_seen": time.time()}
+            entry["count"] += 1
+            entry["total_ms"] += ms
+            entry["max_ms"] = max(entry["max_ms"], ms)
+            entry["last_seen"] = time.time()
+        instrumentation.observe("ui.stall_ms", ms)
+
+    # --- REPORTS ---
+    def reset(self):
+        with self.lock:
+            self.stalls.clear()
+            self.total_stalls = 0
+
+    def report(self) -> Dict:
+        """Stalls grouped by stack, worst total first; each stack is outermost frame first"""
+        with self.lock:
+            entries = sorted(self.stalls.values(), key=lambda e: e["total_ms"], reverse=True)
+            return {
+                "threshold_ms": self.threshold_ms,
+                "stalls": self.total_stalls,
+                "total_ms": round(sum(e["total_ms"] for e in entries), 3),
+                "signatures": [
+                    dict(e, total_ms=round(e["total_ms"], 3), max_ms=round(e["max_ms"], 3)) for e in entries
+                ],
+            }
+
+    def dump(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
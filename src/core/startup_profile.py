@@ -0,0 +1,47 @@
+import time
+from typing import List, Tuple
+
+# Command line flag that prints the breakdown once startup has finished
+PROFILE_FLAG = "--startup-profile"
+
+
+class StartupProfile:
+    """
+    Checkpoints through startup. Each mark closes a stage: the time since the
+    previous mark is attributed to it. The clock starts when this module is
+    imported, so main.py imports it before anything heavy.
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.marks: List[Tuple[str, float]] = []
+        self.finished = False
+
+    def mark(self, name: str):
+        if not self.finished:
+            self.marks.append((name, time.perf_counter()))
+
+    def finish(self, name: str):
+        """Last mark; later marks are ignored"""
+        self.mark(name)
+        self.finished = True
+
+    def stages(self) -> List[Tuple[str, float, float]]:
+        """(name, stage ms, cumulative ms) per mark"""
+        result = []
+        previous = self.origin
+        for name, at in self.marks:
+            result.append((name, (at - previous) * 1000, (at - self.origin) * 1000))
+            previous = at
+        return result
+
+    def report(self) -> str:
+        stages = self.stages()
+        width = max([len(name) for name, _, _ in stages] + [5])
+        lines = [f"{'Stage':<{width}} {'ms':>9} {'total':>9}"]
+        for name, ms, total in stages:
+            lines.append(f"{name:<{width}} {ms:9.1f} {total:9.1f}")
+        return "\n".join(lines)
+
+
+startup = StartupProfile()
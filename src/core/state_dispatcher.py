@@ -0,0 +1,76 @@
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+
+
+def flatten_state(state: dict) -> Dict[str, object]:
+    """Flatten one level of nested dicts, e.g. data.play_index"""
+    flat = {}
+    for key, value in state.items():
+        if isinstance(value, dict):
+            for sub_key, sub_value in value.items():
+                flat[f"{key}.{sub_key}"] = sub_value
+        else:
+            flat[key] = value
+    return flat
+
+
+def changed_fields(old: dict, new: dict) -> Set[str]:
+    """
+    Flattened fields of new that differ from old.
+    Fields missing from new are not changes: partial states keep the old value.
+    """
+    old_flat = flatten_state(old)
+    return {
+        key
+        for key, value in flatten_state(new).items()
+        if key not in old_flat or old_flat[key] != value
+    }
+
+
+def merge_state(old: dict, new: dict) -> dict:
+    """Apply a possibly partial state on top of the previous one"""
+    merged = dict(old)
+    for key, value in new.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = {**merged[key], **value}
+        else:
+            merged[key] = value
+    return merged
+
+
+class StateDispatcher:
+    """
+    Field-level diffing for inbound set_state messages.
+    Handlers subscribe to the (flattened) fields they depend on and are only
+    called when one of those fields changed; each receives the merged state
+    and the set of changed fields.
+    """
+
+    def __init__(self):
+        self.handlers: List[Tuple[Set[str], Callable[[dict, Set[str]], None]]] = []
+        self.last_state: dict = {}
+
+    def register(self, fields: Iterable[str], handler: Callable[[dict, Set[str]], None]):
+        self.handlers.append((set(fields), handler))
+
+    def reset(self):
+        """Forget the last state so the next message triggers every handler"""
+        self.last_state = {}
+
+    def record_sent(self, state: dict):
+        """
+        Fold a state this client published into the baseline without running
+        handlers. Inbound states are then diffed against what the server last
+        saw, so a remote change back to an earlier value still applies.
+        """
+        self.last_state = merge_state(self.last_state, state)
+
+    def dispatch(self, state: dict) -> Set[str]:
+        """Run the handlers affected by state; returns the changed fields"""
+        changed = changed_fields(self.last_state, state)
+        self.last_state = merge_state(self.last_state, state)
+        if not changed:
+            return changed
+        for fields, handler in self.handlers:
+            if fields & changed:
+                handler(self.last_state, changed)
+        return changed
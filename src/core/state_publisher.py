@@ -0,0 +1,143 @@
+import time
+from typing import Callable, Optional
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+
+class StatePublisher(QObject):
+    """
+    Coalescing sender for the play queue state.
+    Callers only mark the state dirty. Changes made within coalesce_ms are
+    folded into one set_state message, at most one message goes out per
+    min_interval_ms, payloads that change nothing are dropped and the track
+    lists are only included when they differ from the last message sent.
+    """
+
+    # Every payload sent, as it went over the wire
+    sent = pyqtSignal(dict)
+
+    LIST_FIELDS = ("tracks", "play_next")
+    POSITION_FIELDS = ("start_position", "start_time")
+
+    def __init__(
+        self,
+        socket,
+        build_state: Callable[[], Optional[dict]],
+        coalesce_ms: int = 50,
+        min_interval_ms: int = 500,
+        seek_tolerance: float = 1.0,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.socket = socket
+        self.build_state = build_state
+        self.coalesce_ms = coalesce_ms
+        self.min_interval_ms = min_interval_ms
+        self.seek_tolerance = seek_tolerance
+
+        self.dirty = False
+        self.position_dirty = False
+        self.last_sent: Optional[dict] = None
+        self.last_send_time = 0.0
+        self.sent_count = 0
+        self.suppressed_count = 0
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.flush)
+
+        # The server may have lost what we sent before a reconnect
+        if hasattr(socket, "connected"):
+            socket.connected.connect(self.reset)
+
+    def mark_dirty(self):
+        """Schedule a send of everything that changed"""
+        self.dirty = True
+        self._schedule()
+
+    def mark_position(self):
+        """Schedule a position heartbeat even if nothing else changed"""
+        self.position_dirty = True
+        self._schedule()
+
+    def reset(self):
+        """Forget the last sent state so the next message is complete"""
+        self.last_sent = None
+
+    def _schedule(self):
+        if self.timer.isActive():
+            return
+        elapsed_ms = (time.monotonic() - self.last_send_time) * 1000
+        delay = max(self.coalesce_ms, self.min_interval_ms - elapsed_ms)
+        self.timer.start(int(delay))
+
+    def flush(self):
+        """Send pending changes now, bypassing the coalescing window"""
+        self.timer.stop()
+        if not self.dirty and not self.position_dirty:
+            return
+        force_position = self.position_dirty
+        self.dirty = False
+        self.position_dirty = False
+
+        if not self.socket.is_connected:
+            return
+        state = self.build_state()
+        if not state:
+            return
+
+        payload = self._make_payload(state, force_position)
+        if payload is None:
+            self.suppressed_count += 1
+            return
+
+        self.socket.send_set_state(payload)
+        self.sent_count += 1
+        self.last_send_time = time.monotonic()
+        snapshot = dict(state)
+        for key in self.LIST_FIELDS:
+            if key in snapshot:
+                snapshot[key] = _fingerprint(snapshot[key])
+        self.last_sent = snapshot
+        self.sent.emit(payload)
+
+    def _make_payload(self, state: dict, force_position: bool) -> Optional[dict]:
+        """State to send relative to last_sent, or None if it carries nothing new"""
+        last = self.last_sent
+        if last is None:
+            return {key: _to_json(value) for key, value in state.items()}
+
+        payload = {}
+        changed = False
+        for key, value in state.items():
+            if key in self.LIST_FIELDS:
+                if _fingerprint(value) != last.get(key):
+                    payload[key] = _to_json(value)
+                    changed = True
+            else:
+                payload[key] = value
+                if key not in self.POSITION_FIELDS and value != last.get(key):
+                    changed = True
+        if changed or force_position or self._position_jumped(state, last):
+            return payload
+        return None
+
+    def _position_jumped(self, state: dict, last: dict) -> bool:
+        """True if the position moved other than by playing on (e.g. a seek)"""
+        expected = last.get("start_position", 0)
+        if not last.get("pause", False):
+            expected += state.get("start_time", 0) - last.get("start_time", 0)
+        return abs(state.get("start_position", 0) - expected) > self.seek_tolerance
+
+
+def _fingerprint(value):
+    """Cheap comparable stand-in for a track list"""
+    if hasattr(value, "content_hash"):
+        return value.content_hash
+    return tuple(value)
+
+
+def _to_json(value):
+    if hasattr(value, "to_list"):
+        return value.to_list()
+    return value
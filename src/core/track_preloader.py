@@ -0,0 +1,107 @@
+from typing import Callable, Dict, Optional
+
+from PyQt6.QtCore import QObject, QUrl
+
+# Player signals the main window listens to; they move with the active player
+PLAYER_SIGNALS = ("mediaStatusChanged", "playbackStateChanged", "errorOccurred")
+
+
+def new_media_player(parent=None):
+    """Default player_factory; QtMultimedia is imported on first use, like in main.py"""
+    from PyQt6.QtMultimedia import QMediaPlayer
+    return QMediaPlayer(parent)
+
+
+def swap_players(old, new, audio_output, slots: Dict[str, Callable]):
+    """Retire old and make new the active player; slots maps PLAYER_SIGNALS to their handlers"""
+    for name, slot in slots.items():
+        getattr(old, name).disconnect(slot)
+    old.stop()
+    old.setAudioOutput(None)
+    old.deleteLater()
+
+    new.setAudioOutput(audio_output)
+    for name, slot in slots.items():
+        getattr(new, name).connect(slot)
+    return new
+
+
+class PreloadedTrack:
+    """Everything play_track_by_id needs for a track, resolved ahead of time"""
+
+    def __init__(self, track_id, track, artists, album, album_artists, artwork_url, player):
+        self.track_id = track_id
+        self.track = track
+        self.artists = artists
+        self.album = album
+        self.album_artists = album_artists
+        self.artwork_url = artwork_url
+        self.player = player
+
+
+class TrackPreloader(QObject):
+    """
+    Look-ahead stage for near-gapless transitions.
+    Shortly before the current track ends, the next track's metadata and stream
+    URL are resolved and its source is opened in a standby QMediaPlayer so the
+    network buffering happens while the current track is still playing.
+    """
+
+    def __init__(self, api, lookahead_seconds: int = 10, parent=None, player_factory=new_media_player):
+        super().__init__(parent)
+        self.api = api
+        self.lookahead_seconds = lookahead_seconds
+        self.player_factory = player_factory
+        self.preloaded: Optional[PreloadedTrack] = None
+        self.attempted_id = None
+
+    def is_prepared(self, track_id) -> bool:
+        return self.preloaded is not None and self.preloaded.track_id == track_id
+
+    def prepare(self, track_id):
+        """Resolve and start buffering track_id, replacing any other preload"""
+        if not track_id or track_id == self.attempted_id:
+            return
+        self.clear()
+        self.attempted_id = track_id
+
+        track = self.api.get_track_by_id(track_id)
+        if not track:
+            return
+        url = self.api.get_stream_url(track_id)
+        if not url:
+            return
+
+        player = self.player_factory(self)
+        player.setSource(QUrl(url))
+
+        self.preloaded = PreloadedTrack(
+            track_id,
+            track,
+            self.api.get_artists_by_track(track_id),
+            self.api.get_album_by_track(track_id),
+            self.api.get_artists_with_albums(),
+            self.api.get_artwork_url(track.artwork_id),
+            player,
+        )
+
+    def take(self, track_id) -> Optional[PreloadedTrack]:
+        """Hand over the preload for track_id, or None if it is not usable"""
+        if not self.is_prepared(track_id):
+            self.clear()
+            return None
+        preloaded = self.preloaded
+        self.preloaded = None
+        self.attempted_id = None
+        if preloaded.player.mediaStatus() == preloaded.player.MediaStatus.InvalidMedia:
+            preloaded.player.deleteLater()
+            return None
+        preloaded.player.setParent(None)
+        return preloaded
+
+    def clear(self):
+        self.attempted_id = None
+        if self.preloaded is not None:
+            self.preloaded.player.stop()
+            self.preloaded.player.deleteLater()
+            self.preloaded = None
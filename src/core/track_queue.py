@@ -0,0 +1,112 @@
+import hashlib
+from array import array
+from typing import Iterable, List
+
+# Unsigned 64-bit on every platform, unlike "I" or "L"
+TYPECODE = "Q"
+
+
+def track_ids(values) -> List[int]:
+    """Valid track ids from an inbound queue; None, negative or non-numeric entries are dropped"""
+    if not isinstance(values, (list, tuple)):
+        print(f"Ignoring malformed queue: {values!r}")
+        return []
+    ids = []
+    for value in values:
+        try:
+            track_id = int(value)
+        except (TypeError, ValueError):
+            continue
+        if 0 <= track_id < 2 ** 64:
+            ids.append(track_id)
+    if len(ids) < len(values):
+        print(f"Ignoring {len(values) - len(ids)} malformed queue entries")
+    return ids
+
+
+class TrackQueue:
+    """
+    Compact list of track ids backed by an unsigned 64-bit array.
+    Supports the list operations the play queue uses and exposes a content
+    hash, cached until the next mutation, so unchanged queues can be detected
+    without comparing them element by element.
+    """
+
+    def __init__(self, values: Iterable[int] = ()):
+        self.ids = array(TYPECODE, values)
+        self._hash = None
+
+    @staticmethod
+    def hash_of(ids: array) -> str:
+        return hashlib.blake2b(ids.tobytes(), digest_size=8).hexdigest()
+
+    @property
+    def content_hash(self) -> str:
+        if self._hash is None:
+            self._hash = TrackQueue.hash_of(self.ids)
+        return self._hash
+
+    def assign(self, values: Iterable[int]) -> bool:
+        """Replace the contents; returns False if they were already equal"""
+        ids = array(TYPECODE, values.ids if isinstance(values, TrackQueue) else values)
+        if ids == self.ids:
+            return False
+        self.ids = ids
+        self._hash = None
+        return True
+
+    def to_list(self) -> List[int]:
+        return self.ids.tolist()
+
+    def copy(self) -> "TrackQueue":
+        return TrackQueue(self.ids)
+
+    # --- list protocol ---
+
+    def append(self, track_id: int):
+        self.ids.append(track_id)
+        self._hash = None
+
+    def insert(self, index: int, track_id: int):
+        self.ids.insert(index, track_id)
+        self._hash = None
+
+    def pop(self, index: int = -1) -> int:
+        track_id = self.ids.pop(index)
+        self._hash = None
+        return track_id
+
+    def clear(self):
+        if self.ids:
+            self.ids = array(TYPECODE)
+            self._hash = None
+
+    def index(self, track_id: int) -> int:
+        return self.ids.index(track_id)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.ids[index].tolist()
+        return self.ids[index]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __contains__(self, track_id):
+        return track_id in self.ids
+
+    def __bool__(self):
+        return len(self.ids) > 0
+
+    def __eq__(self, other):
+        if isinstance(other, TrackQueue):
+            return self.ids == other.ids
+        if isinstance(other, (list, tuple)):
+            return self.ids.tolist() == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"TrackQueue({self.ids.tolist()!r})"
@@ -1,3 +1,6 @@
+import time
+from collections import deque
+
 from PyQt6.QtGui import QImage, QPixmap
 from PyQt6.QtWidgets import QScrollArea, QGridLayout, QWidget, QVBoxLayout, QFrame
 from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest
@@ -10,15 +13,31 @@ from src.ui.utils.scrolling_label import ScrollingLabel
 
 from src.api.ibroadcast.models import BaseModel, Track, Album, Artist, Playlist
 
+_UNRESOLVED = object()
+
 class LibraryItem():
     def __init__(self, model: BaseModel, image_url: str):
         self.model = model
         self.image_url = image_url
+        # Subtitles are resolved at most once per item, either in bulk by
+        # prefetch_subtitles() or lazily by the getters below
+        self._subtitle = _UNRESOLVED
+        self._second_subtitle = _UNRESOLVED
         
     def get_title(self):
         return self.model.name
     
     def get_subtitle(self, api: iBroadcastAPI):
+        if self._subtitle is _UNRESOLVED:
+            self._subtitle = self._resolve_subtitle(api)
+        return self._subtitle
+        
+    def get_second_subtitle(self, api: iBroadcastAPI):
+        if self._second_subtitle is _UNRESOLVED:
+            self._second_subtitle = self._resolve_second_subtitle(api)
+        return self._second_subtitle
+
+    def _resolve_subtitle(self, api: iBroadcastAPI):
         if isinstance(self.model, Track):
             # For tracks, get album name
             album = api.get_album_by_track(self.model.id)
@@ -35,7 +54,7 @@ class LibraryItem():
             return self.model.description or ""
         return None
         
-    def get_second_subtitle(self, api: iBroadcastAPI):
+    def _resolve_second_subtitle(self, api: iBroadcastAPI):
         if isinstance(self.model, Track):
             # For tracks, get artist name
             artists = api.get_artists_by_track(self.model.id)
@@ -51,6 +70,24 @@ class LibraryItem():
             return None
         return None
 
+def prefetch_subtitles(items, api: iBroadcastAPI):
+    """Resolve the DB-backed subtitles of many items with a few bulk queries"""
+    track_ids = [i.model.id for i in items if isinstance(i.model, Track) and i._subtitle is _UNRESOLVED]
+    album_ids = [i.model.id for i in items if isinstance(i.model, Album) and i._subtitle is _UNRESOLVED]
+    album_names = api.get_album_names_by_tracks(track_ids) if track_ids else {}
+    track_artists = api.get_artist_names_by_tracks(track_ids) if track_ids else {}
+    album_artists = api.get_artist_names_by_albums(album_ids) if album_ids else {}
+    for item in items:
+        if item._subtitle is not _UNRESOLVED:
+            continue
+        if isinstance(item.model, Track):
+            item._subtitle = album_names.get(item.model.id) or "Unknown Album"
+            names = track_artists.get(item.model.id)
+            item._second_subtitle = ", ".join(names) if names else "Unknown Artist"
+        elif isinstance(item.model, Album):
+            names = album_artists.get(item.model.id)
+            item._subtitle = ", ".join(names) if names else "Unknown Artist"
+
 class LibraryGrid(QScrollArea):
     def __init__(self, item_click_callback, api: iBroadcastAPI):
         super().__init__()
@@ -92,11 +129,17 @@ class LibraryGrid(QScrollArea):
         self.active_requests = 0
         self.max_concurrent = 4
         
-        # Queue for items to add
-        self.items_queue : list[LibraryItem] = []
+        # Queue for items to add, drained in time-sliced chunks
+        self.items_queue : deque[LibraryItem] = deque()
         self.current_row = 0
         self.current_col = 0
         self.columns = 5 
+        self.populate_budget_ms = 8
+        self.populate_batch_size = 32
+        self.populate_timer = QTimer()
+        self.populate_timer.setSingleShot(True)
+        self.populate_timer.setInterval(0)
+        self.populate_timer.timeout.connect(self.process_items_queue)
         
         # Debounce timer for scroll events
         self.load_timer = QTimer()
@@ -133,7 +176,7 @@ class LibraryGrid(QScrollArea):
 
     def clear(self):
         self.pending_items.clear()
-        self.items_queue.clear()
+        self.cancel_population()
         self.current_row = 0
         self.current_col = 0
         for i in reversed(range(self.grid.count())): 
@@ -150,20 +193,46 @@ class LibraryGrid(QScrollArea):
         self.items_queue.append(libraryItem)
         
         # Process queue on next event loop
-        QTimer.singleShot(0, self.process_items_queue)
+        if not self.populate_timer.isActive():
+            self.populate_timer.start()
+
+    def cancel_population(self):
+        """Drop any items that have not been turned into widgets yet"""
+        self.populate_timer.stop()
+        self.items_queue.clear()
+
+    def first_screen_count(self):
+        """Estimate how many items fit in the viewport"""
+        viewport = self.viewport()
+        height = viewport.height() if viewport is not None else 0
+        row_height = self.item_width + 90  # Image plus title/subtitle labels
+        rows = max(1, height // row_height + 1)
+        return rows * self.columns
 
     def process_items_queue(self):
-        """Process queued items and add them to the grid"""
+        """Add queued items to the grid, yielding to the event loop every few ms"""
         if not self.items_queue:
             return
         
-        # Recalculate columns based on current width
-        self.columns = self.calculate_columns()
+        # Recalculate columns based on current width when starting a fresh grid
+        if self.current_row == 0 and self.current_col == 0:
+            self.columns = self.calculate_columns()
+            minimum = self.first_screen_count()
+        else:
+            minimum = 1
+        
+        # The first screen is always created in one go, the rest in slices
+        deadline = time.perf_counter() + self.populate_budget_ms / 1000
+        created = 0
+        while self.items_queue and (created < minimum or time.perf_counter() < deadline):
+            batch = [self.items_queue.popleft() for _ in range(min(self.populate_batch_size, len(self.items_queue)))]
+            prefetch_subtitles(batch, self.api)
+            for item_data in batch:
+                self._add_item_to_grid(item_data)
+            created += len(batch)
         
-        # Add all queued items
-        while self.items_queue:
-            item_data = self.items_queue.pop(0)
-            self._add_item_to_grid(item_data)
+        if self.items_queue:
+            self.populate_timer.start()
 
     def _add_item_to_grid(self, library_item: LibraryItem):
         """Internal method to add item to grid at current position"""
@@ -197,9 +266,10 @@ class LibraryGrid(QScrollArea):
         layout.addWidget(img_label)
         layout.addWidget(t_label)
 
-        if (library_item.get_subtitle(self.api)):
+        subtitle = library_item.get_subtitle(self.api)
+        if subtitle:
             s_label = ScrollingLabel(item_widget)
-            s_label.setText(library_item.get_subtitle(self.api) or "")
+            s_label.setText(subtitle)
             s_label.setGap(25)
             s_label.setStyleSheet('''
                 QLabel {
@@ -213,9 +283,10 @@ class LibraryGrid(QScrollArea):
             s_label.setFixedWidth(self.item_width + 2)
             layout.addWidget(s_label)
     
-        if (library_item.get_second_subtitle(self.api)):
+        second_subtitle = library_item.get_second_subtitle(self.api)
+        if second_subtitle:
             ss_label = ScrollingLabel(item_widget)
-            ss_label.setText(library_item.get_second_subtitle(self.api) or "")
+            ss_label.setText(second_subtitle)
             ss_label.setGap(25)
             ss_label.setStyleSheet('''
                 QLabel {
@@ -318,6 +389,12 @@ class LibraryGrid(QScrollArea):
         finally:
             reply.deleteLater()
 
+    def hideEvent(self, a0):
+        super().hideEvent(a0)
+        # Navigating away cancels population; the view reloads when shown again
+        if a0 and not a0.spontaneous():
+            self.cancel_population()
+
     def resizeEvent(self, a0):
         super().resizeEvent(a0)
         # Recalculate layout when window is resized
@@ -0,0 +1,29 @@
+from src.core.instrumentation import instrumentation
+
+
+class lazy_view:
+    """
+    Method decorator turning a view builder into an attribute that builds the
+    view on first access and then caches it on the instance.
+    """
+
+    def __init__(self, builder):
+        self.builder = builder
+        self.__doc__ = builder.__doc__
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        with instrumentation.timer(f"ui.build_view.{self.name}"):
+            view = self.builder(obj)
+        # Instance attributes win over non-data descriptors from now on
+        obj.__dict__[self.name] = view
+        return view
+
+
+def is_built(obj, name: str) -> bool:
+    """Whether the lazy view name already exists, without building it"""
+    return name in obj.__dict__
@@ -3,10 +3,12 @@ Updated options dialog with tabbed interface for API credentials.
 """
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
                              QLineEdit, QPushButton, QGroupBox, QMessageBox,
-                             QTabWidget, QWidget)
+                             QTabWidget, QWidget, QCheckBox, QTableWidget,
+                             QTableWidgetItem, QHeaderView, QFileDialog)
 
 from src.api.ibroadcast.ibroadcast_api import iBroadcastAPI
 from src.core.credentials_manager import CredentialsManager
+from src.core.instrumentation import instrumentation
 
 
 class APICredentialsTab(QWidget):
@@ -157,8 +159,19 @@ class IBroadcastTab(QWidget):
         layout.addWidget(reload_btn)
         self.status_label = QLabel()
         layout.addWidget(self.status_label)
+        self.audio_cache_label = QLabel()
+        self.update_audio_cache_stats()
+        layout.addWidget(self.audio_cache_label)
         layout.addStretch()
 
+    def update_audio_cache_stats(self):
+        """Show how much playback the audio cache served locally"""
+        stats = self.ibroadcast_api.audio_cache.get_stats()
+        self.audio_cache_label.setText(
+            f"Audio cache: {stats['count']} tracks, {stats['size'] / 1048576:.1f} MB | "
+            f"hit rate {stats['hit_rate']:.0%}, {stats['bytes_saved'] / 1048576:.1f} MB saved"
+        )
+
     def reload_library(self):
         from PyQt6.QtCore import QThread, pyqtSignal, QObject
 
@@ -190,6 +203,80 @@ class IBroadcastTab(QWidget):
         else:
             self.status_label.setText(f"Failed to reload library: {result.get('message', 'Unknown error')}")
 
+class DebugTab(QWidget):
+    """Tab showing the timers and counters collected by instrumentation"""
+
+    COLUMNS = ["Name", "Calls", "Total ms", "Mean ms", "p95 ms", "Max ms"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+
+        self.enabled_checkbox = QCheckBox("Enable profiling")
+        self.enabled_checkbox.setChecked(instrumentation.enabled)
+        self.enabled_checkbox.toggled.connect(self.toggle_enabled)
+        layout.addWidget(self.enabled_checkbox)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        btn_layout = QHBoxLayout()
+        refresh_btn = QPushButton("Refresh")
+        refresh_btn.clicked.connect(self.refresh)
+        btn_layout.addWidget(refresh_btn)
+        reset_btn = QPushButton("Reset")
+        reset_btn.clicked.connect(self.reset)
+        btn_layout.addWidget(reset_btn)
+        save_btn = QPushButton("Save JSON...")
+        save_btn.clicked.connect(self.save_json)
+        btn_layout.addWidget(save_btn)
+        btn_layout.addStretch()
+        layout.addLayout(btn_layout)
+
+        self.refresh()
+
+    def toggle_enabled(self, checked):
+        if checked:
+            instrumentation.enable()
+        else:
+            instrumentation.disable()
+
+    def refresh(self):
+        snapshot = instrumentation.snapshot()
+        rows = []
+        for name, t in snapshot["timers_ms"].items():
+            rows.append([name, t["count"], t["total"], t["mean"], t["p95"], t["max"]])
+        for name, count in snapshot["counters"].items():
+            rows.append([name, count, "", "", "", ""])
+        self.table.setRowCount(len(rows))
+        for r, row in enumerate(rows):
+            for c, value in enumerate(row):
+                text = f"{value:.2f}" if isinstance(value, float) else str(value)
+                self.table.setItem(r, c, QTableWidgetItem(text))
+
+    def reset(self):
+        instrumentation.reset()
+        self.refresh()
+
+    def save_json(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Save Profile", "pybroadcast-profile.json", "JSON (*.json)")
+        if path:
+            try:
+                instrumentation.dump(path)
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Failed to save profile: {e}")
+
+    def showEvent(self, a0):
+        super().showEvent(a0)
+        self.refresh()
+
 class OptionsDialog(QDialog):
     """Main options dialog with tabbed interface"""
     
@@ -218,6 +305,10 @@ class OptionsDialog(QDialog):
         # iBroadcast tab (library reload)
         self.ibroadcast_tab = IBroadcastTab(self.ibroadcast_api)
         self.tabs.addTab(self.ibroadcast_tab, "Refresh Library")
+
+        # Debug tab (profiling timers and counters)
+        self.debug_tab = DebugTab()
+        self.tabs.addTab(self.debug_tab, "Debug")
         
         layout.addWidget(self.tabs)
         
@@ -1,108 +1,202 @@
+import time
+
 from PyQt6.QtWidgets import QLabel
-from PyQt6.QtCore import QTimer, Qt
+from PyQt6.QtCore import QObject, QTimer, Qt, QEvent
 from PyQt6.QtGui import QPainter, QFontMetrics
 
+# Cache of horizontalAdvance() results keyed by (font key, text)
+_text_width_cache = {}
+_TEXT_WIDTH_CACHE_LIMIT = 20000
+
+
+def text_width(font, text):
+    """Return the pixel width of text in font, memoized per (font, text)"""
+    key = (font.key(), text)
+    width = _text_width_cache.get(key)
+    if width is None:
+        if len(_text_width_cache) >= _TEXT_WIDTH_CACHE_LIMIT:
+            _text_width_cache.clear()
+        width = QFontMetrics(font).horizontalAdvance(text)
+        _text_width_cache[key] = width
+    return width
+
+
+class ScrollTicker(QObject):
+    """
+    Single animation clock shared by every ScrollingLabel.
+    Only labels that overflow and are shown are registered, and the timer
+    stops entirely while all of their windows are hidden or minimized.
+    """
+
+    _instance = None
+
+    def __init__(self):
+        super().__init__()
+        self.labels = set()
+        self.windows = set()
+        self.interval = 25
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.interval)
+        self.timer.timeout.connect(self.tick)
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = ScrollTicker()
+        return cls._instance
+
+    def register(self, label):
+        self.labels.add(label)
+        window = label.window()
+        if window is not None and window not in self.windows:
+            self.windows.add(window)
+            window.installEventFilter(self)
+        self.update_running()
+
+    def unregister(self, label):
+        self.labels.discard(label)
+        self.update_running()
+
+    def eventFilter(self, a0, a1):
+        if a1 and a1.type() in (QEvent.Type.WindowStateChange, QEvent.Type.Show, QEvent.Type.Hide):
+            QTimer.singleShot(0, self.update_running)
+        return False
+
+    def _is_window_active(self, label):
+        window = label.window()
+        return window is not None and window.isVisible() and not window.isMinimized()
+
+    def update_running(self):
+        """Start the clock if any label can animate, stop it otherwise"""
+        try:
+            should_run = any(self._is_window_active(lbl) for lbl in self.labels)
+        except RuntimeError:
+            # A label was deleted on the C++ side; drop it and retry
+            self.labels = {lbl for lbl in self.labels if _is_alive(lbl)}
+            should_run = any(self._is_window_active(lbl) for lbl in self.labels)
+        if should_run and not self.timer.isActive():
+            self.timer.start()
+        elif not should_run and self.timer.isActive():
+            self.timer.stop()
+
+    def tick(self):
+        now = time.monotonic()
+        any_active = False
+        for label in list(self.labels):
+            try:
+                if not self._is_window_active(label):
+                    continue
+                any_active = True
+                if label.visibleRegion().isEmpty():
+                    # Scrolled out of view inside a scroll area
+                    continue
+                label.scroll_text(now)
+            except RuntimeError:
+                self.labels.discard(label)
+        if not any_active:
+            self.timer.stop()
+
+
+def _is_alive(label):
+    try:
+        label.objectName()
+        return True
+    except RuntimeError:
+        return False
+
+
 class ScrollingLabel(QLabel):
-    
+
     onClickCallback = None
-    
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.full_text = ""
         self.scroll_offset = 0
         self.scroll_direction = 1  # 1 for left, -1 for right
-        self.scroll_timer = QTimer(self)
-        self.scroll_timer.timeout.connect(self.scroll_text)
-        self.scroll_speed = 25
-        self.wait_time = 2000  
-        self.wait_timer = QTimer(self)
-        self.wait_timer.timeout.connect(self.start_scrolling)
+        self.wait_time = 1000
+        self.paused_until = 0.0
         self.is_scrolling = False
         self.needs_scroll = False
         self.gap = 50
-    
+        self.destroyed.connect(lambda: ScrollTicker.instance().labels.discard(self))
+
     def setOnClickCallback(self, callback):
         self.onClickCallback = callback
         if callback:
             self.setCursor(Qt.CursorShape.PointingHandCursor)
         else:
             self.setCursor(Qt.CursorShape.ArrowCursor)
-    
+
     def setGap(self, gap):
         self.gap = gap
-        
+
     def setText(self, a0):
+        if a0 == self.full_text and self.text() == a0:
+            return
         self.full_text =a0
         super().setText(a0)
         self.scroll_offset = 0
         self.stop_scrolling()
         self.check_if_needs_scroll()
-        
+
     def check_if_needs_scroll(self):
         """Check if text is too long and needs scrolling"""
         if not self.full_text:
             self.needs_scroll = False
             self.stop_scrolling()
             return
-        fm = QFontMetrics(self.font())
-        text_width = fm.horizontalAdvance(self.full_text)
         available_width = self.width() - 10  # Slight padding
-        self.needs_scroll = text_width >= available_width
+        self.needs_scroll = text_width(self.font(), self.full_text) >= available_width
         if self.needs_scroll:
             self.start_scrolling()
         else:
             self.stop_scrolling()
             super().setText(self.full_text)
-    
+
     def start_scrolling(self):
-        """Start the scrolling animation or resume after pause at ends"""
-        self.wait_timer.stop()
-        if self.needs_scroll and not self.is_scrolling:
+        """Hand the label to the shared ticker if it overflows and is shown"""
+        if self.needs_scroll and not self.is_scrolling and self.isVisible():
             self.is_scrolling = True
             self.scroll_direction = 1
-            self.scroll_timer.start(self.scroll_speed)
-        elif self.needs_scroll and self.is_scrolling:
-            # Resume scrolling after pause
-            self.scroll_timer.start(self.scroll_speed)
-    
+            self.paused_until = 0.0
+            ScrollTicker.instance().register(self)
+
     def stop_scrolling(self):
         """Stop scrolling animation"""
         if self.is_scrolling:
             self.is_scrolling = False
-            self.scroll_timer.stop()
-            self.wait_timer.stop()
+            ScrollTicker.instance().unregister(self)
             self.scroll_offset = 0
             self.scroll_direction = 1
             self.update()
-    
-    def scroll_text(self):
-        """Update scroll position for back-and-forth scrolling with pause at ends"""
+
+    def scroll_text(self, now=None):
+        """Advance one step of the back-and-forth scroll, pausing at both ends"""
         if not self.needs_scroll:
             return
-        fm = QFontMetrics(self.font())
-        text_width = fm.horizontalAdvance(self.full_text)
+        now = time.monotonic() if now is None else now
+        if now < self.paused_until:
+            return
         available_width = self.width()
+        text_w = text_width(self.font(), self.full_text)
 
         # Calculate max offset so last character is fully visible
-        max_offset = text_width - available_width if text_width > available_width else 0
-        if max_offset < 0:
-            max_offset = 0
+        max_offset = max(0, text_w - available_width)
 
         self.scroll_offset += self.scroll_direction
 
         if self.scroll_offset >= max_offset:
             self.scroll_offset = max_offset
             self.scroll_direction = -1
-            self.scroll_timer.stop()
-            self.wait_timer.start(1000) 
+            self.paused_until = now + self.wait_time / 1000
         elif self.scroll_offset <= 0:
             self.scroll_offset = 0
             self.scroll_direction = 1
-            self.scroll_timer.stop()
-            self.wait_timer.start(1000)
+            self.paused_until = now + self.wait_time / 1000
 
         self.update()
-    
+
     def paintEvent(self, a0):
         """Custom paint to draw scrolling text (back-and-forth)"""
         if not self.needs_scroll or not self.is_scrolling:
@@ -116,16 +210,27 @@ class ScrollingLabel(QLabel):
         y = (self.height() + fm.ascent() - fm.descent()) // 2
         painter.drawText(x, y, self.full_text)
         painter.end()
-    
+
     def resizeEvent(self, a0):
         """Recheck if scrolling is needed when widget is resized"""
         super().resizeEvent(a0)
         if self.full_text:
             self.stop_scrolling()
             self.check_if_needs_scroll()
-    
+
+    def showEvent(self, a0):
+        super().showEvent(a0)
+        if self.full_text:
+            self.check_if_needs_scroll()
+
+    def hideEvent(self, a0):
+        super().hideEvent(a0)
+        # Spontaneous hides (window minimized) are paused by the ticker instead
+        if a0 and not a0.spontaneous():
+            self.stop_scrolling()
+
     def mouseReleaseEvent(self, ev):
         if ev and ev.button() == Qt.MouseButton.LeftButton:
             if self.onClickCallback:
                 self.onClickCallback()
-        super().mouseReleaseEvent(ev)
\ No newline at end of file
+        super().mouseReleaseEvent(ev)
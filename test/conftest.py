@@ -31,5 +31,5 @@ def db():
     manager = DatabaseManager()
     yield manager
     
-    manager.conn.close()
+    manager.close()
     src.api.ibroadcast.database.DB_PATH = original_path
@@ -1,4 +1,5 @@
 import pytest
+import threading
 from unittest.mock import MagicMock, patch
 from src.api.ibroadcast.ibroadcast_api import iBroadcastAPI
 
@@ -76,3 +77,108 @@ def test_get_play_queue_token(api):
     args, kwargs = api.session.post.call_args
     assert args[0] == "https://library.ibroadcast.com/s/JSON/status"
     assert kwargs['json'] == {'mode': 'playqueue_token'}
+
+def _response(status_code, body):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = body
+    return response
+
+def _held_post(status_code, body):
+    """post() that answers only once released, so the local change can be checked first"""
+    release = threading.Event()
+    def post(*args, **kwargs):
+        release.wait(5)
+        return _response(status_code, body)
+    return release, post
+
+def test_create_playlist_is_applied_locally_then_rekeyed(api, db):
+    db.conn.execute("INSERT INTO Albums (album_id, name) VALUES (1, 'A')")
+    db.conn.execute("INSERT INTO Tracks (track_id, album_id, title) VALUES (10, 1, 'T')")
+    release, api.session.post.side_effect = _held_post(200, {"result": True, "playlist_id": 500})
+
+    res = api.create_playlist("Mix", tracks=[10])
+    assert res["playlist_id"] < 0
+    assert [t.id for t in db.get_tracks_by_playlist(res["playlist_id"])] == [10]
+    release.set()
+
+    api.playlist_sync.wait_idle(5)
+    assert db.get_playlist_by_id(res["playlist_id"]) is None
+    assert db.get_playlist_by_id(500).name == "Mix"
+    assert [t.id for t in db.get_tracks_by_playlist(500)] == [10]
+    assert api.session.post.call_count == 1
+
+def test_failed_append_is_rolled_back(api, db):
+    db.conn.execute("INSERT INTO Albums (album_id, name) VALUES (1, 'A')")
+    for tid in (10, 11, 12):
+        db.conn.execute("INSERT INTO Tracks (track_id, album_id, title) VALUES (?, 1, 'T')", (tid,))
+    db.conn.execute("INSERT INTO Playlists (playlist_id, name) VALUES (7, 'P')")
+    db.add_track_to_playlist(7, 10)
+    release, api.session.post.side_effect = _held_post(500, {})
+    results = []
+
+    api.append_to_playlist(7, [11, 12], on_done=results.append)
+    assert [t.id for t in db.get_tracks_by_playlist(7)] == [10, 11, 12]
+    release.set()
+
+    api.playlist_sync.wait_idle(5)
+    assert results[0]["success"] is False
+    assert [t.id for t in db.get_tracks_by_playlist(7)] == [10]
+
+def test_send_history_separates_rejections_from_outages(api):
+    import requests
+    from src.api.history_journal import HistoryUnavailable
+
+    api.tokens.set_tokens("fake_token")
+    api.session.post.return_value = _response(400, {})
+    assert api.send_history([]) is False
+    api.session.post.return_value = _response(200, {"result": False})
+    assert api.send_history([]) is False
+    api.session.post.return_value = _response(200, {"result": True})
+    assert api.send_history([]) is True
+
+    api.session.post.return_value = _response(503, {})
+    with pytest.raises(HistoryUnavailable):
+        api.send_history([])
+    api.session.post.side_effect = requests.ConnectionError("offline")
+    with pytest.raises(HistoryUnavailable):
+        api.send_history([])
+    api.tokens.clear()
+    with pytest.raises(HistoryUnavailable):
+        api.send_history([])
+
+def test_reload_credentials_keeps_one_refresh_timer(api, tmp_path):
+    import json
+    token_file = tmp_path / "token.json"
+    token_file.write_text(json.dumps({"access_token": "new", "refresh_token": "r2", "expires_at": 9999999999}))
+    api.tokens.set_tokens("old", "r1", expires_in=3600)
+    old_timer = api.tokens.timer
+
+    with patch('src.api.ibroadcast.ibroadcast_api.TOKEN_FILE', str(token_file)):
+        api.reload_credentials()
+    assert (api.access_token, api.refresh_token) == ("new", "r2")
+    assert old_timer.finished.is_set() and api.tokens.timer is not old_timer
+
+    api.shutdown()
+    assert api.tokens.timer is None and api.access_token is None
+    assert api.history_journal.stopped
+
+def test_revoked_refresh_token_requires_login(api, tmp_path):
+    token_file = tmp_path / "token.json"
+    token_file.write_text("{}")
+    login_required = []
+    api.on_login_required = lambda: login_required.append(True)
+    api.tokens.set_tokens("old", "r1", expires_in=3600)
+
+    with patch('src.api.ibroadcast.ibroadcast_api.TOKEN_FILE', str(token_file)), \
+            patch('src.api.ibroadcast.ibroadcast_api.requests.post') as post:
+        # Server trouble is retried later and keeps the tokens
+        post.return_value = _response(503, {})
+        assert api.refresh_access_token() is False
+        assert api.refresh_token == "r1" and login_required == []
+        # A rejected refresh token is not
+        post.return_value = _response(400, {"error": "invalid_grant"})
+        assert api.refresh_access_token() is False
+    assert api.refresh_token is None and api.tokens.timer is None
+    assert login_required == [True]
+    assert not token_file.exists()
@@ -0,0 +1,59 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from src.api.audio_cache import AudioCache
+
+
+def fake_response(data):
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.iter_content.return_value = [data]
+    return response
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AudioCache(cache_dir=tmp_path / "audio", max_bytes=10)
+
+
+def test_download_and_hit(cache):
+    with patch('src.api.audio_cache.requests.get', return_value=fake_response(b"abcd")):
+        url = cache.download_and_cache("http://stream/1", "/1.mp3")
+
+    assert url.startswith("file://")
+    assert cache.is_cached("/1.mp3")
+    assert cache.get_cached_url("/1.mp3") == url
+    assert cache.get_cached_url("/2.mp3") is None
+
+    stats = cache.get_stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['hit_rate'] == 0.5
+    assert stats['bytes_saved'] == 4
+
+
+def test_lru_eviction_respects_budget(cache):
+    with patch('src.api.audio_cache.requests.get', side_effect=lambda *a, **k: fake_response(b"1234")):
+        cache.download_and_cache("http://stream/a", "a")
+        cache.download_and_cache("http://stream/b", "b")
+        cache.get_cached_url("a")  # a is now most recently used
+        cache.download_and_cache("http://stream/c", "c")
+
+    assert cache.is_cached("a")
+    assert not cache.is_cached("b")
+    assert cache.is_cached("c")
+    assert cache.get_cache_size() <= 10
+
+
+def test_index_survives_restart(cache, tmp_path):
+    with patch('src.api.audio_cache.requests.get', return_value=fake_response(b"xy")):
+        cache.download_and_cache("http://stream/a", "a")
+
+    reopened = AudioCache(cache_dir=tmp_path / "audio", max_bytes=10)
+    assert reopened.is_cached("a")
+    assert reopened.get_cache_size() == 2
+
+
+def test_failed_download_is_not_cached(cache):
+    with patch('src.api.audio_cache.requests.get', side_effect=Exception("offline")):
+        assert cache.download_and_cache("http://stream/a", "a") is None
+    assert not cache.is_cached("a")
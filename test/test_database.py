@@ -1,5 +1,8 @@
+import threading
 import pytest
-from src.api.ibroadcast.models import Artist, Album, Track
+from src.api.ibroadcast.models import Artist, Album, Track, Playlist
+from src.api.ibroadcast.library_generator import generate_library
+from src.api.ibroadcast.ibroadcast_api import process_library
 
 def test_database_init(db):
     """Test that tables are created."""
@@ -68,3 +71,159 @@ def test_clear_database(db):
     # Verify link tables are cleared
     count = db.conn.execute("SELECT COUNT(*) FROM Album_Artists").fetchone()[0]
     assert count == 0
+
+def test_bulk_subtitle_lookups(db):
+    db.insert_artist(Artist(1, "Artist A", 0, 0))
+    db.insert_artist(Artist(2, "Artist B", 0, 0))
+    db.insert_album(Album(10, "Album X", 0, 1, 2020))
+    db.conn.execute("INSERT INTO Album_Artists (album_id, artist_id) VALUES (10, 1)")
+    db.conn.execute("INSERT INTO Album_Artists (album_id, artist_id) VALUES (10, 2)")
+    db.conn.execute("INSERT INTO Tracks (track_id, album_id, title) VALUES (100, 10, 'Song')")
+    db.conn.execute("INSERT INTO Track_Artists (track_id, artist_id) VALUES (100, 2)")
+
+    assert db.get_album_names_by_tracks([100, 999]) == {100: "Album X"}
+    assert db.get_artist_names_by_tracks([100]) == {100: ["Artist B"]}
+    assert db.get_artist_names_by_albums([10]) == {10: ["Artist A", "Artist B"]}
+    assert db.get_artist_names_by_albums([]) == {}
+
+def _playlist_order(db, playlist_id):
+    return [t.id for t in db.get_tracks_by_playlist(playlist_id)]
+
+def test_playlist_reorder_touches_one_row(db):
+    db.insert_album(Album(1, "Album", 0, 1, 2020))
+    for tid in range(1, 6):
+        db.conn.execute("INSERT INTO Tracks (track_id, album_id, title) VALUES (?, 1, 'T')", (tid,))
+    db.conn.execute("INSERT INTO Playlists (playlist_id, name) VALUES (1, 'P')")
+    db.append_tracks_to_playlist(1, [1, 2, 3, 4, 5])
+
+    before = db.conn.total_changes
+    db.rearrange_playlist_track(1, 0, 3)
+    assert db.conn.total_changes - before == 1
+    assert _playlist_order(db, 1) == [2, 3, 4, 1, 5]
+
+    db.rearrange_playlist_track(1, 4, 0)
+    assert _playlist_order(db, 1) == [5, 2, 3, 4, 1]
+
+    before = db.conn.total_changes
+    db.remove_track_from_playlist(1, 1)
+    assert db.conn.total_changes - before == 1
+    assert _playlist_order(db, 1) == [5, 3, 4, 1]
+
+    db.insert_track_into_playlist(1, 2, 2)
+    assert _playlist_order(db, 1) == [5, 3, 2, 4, 1]
+
+def test_playlist_renumbers_when_gap_is_used_up(db):
+    db.insert_album(Album(1, "Album", 0, 1, 2020))
+    for tid in range(1, 21):
+        db.conn.execute("INSERT INTO Tracks (track_id, album_id, title) VALUES (?, 1, 'T')", (tid,))
+    db.conn.execute("INSERT INTO Playlists (playlist_id, name) VALUES (1, 'P')")
+    db.append_tracks_to_playlist(1, [1, 2])
+    expected = [1, 2]
+    # Always inserting right after the first track halves the same gap each time
+    for tid in range(3, 21):
+        db.insert_track_into_playlist(1, 1, tid)
+        expected.insert(1, tid)
+    assert _playlist_order(db, 1) == expected
+
+def test_playlist_edits_by_row_id(db):
+    db.insert_album(Album(1, "Album", 0, 1, 2020))
+    for tid in range(1, 21):
+        db.conn.execute("INSERT INTO Tracks (track_id, album_id, title) VALUES (?, 1, 'T')", (tid,))
+    db.conn.execute("INSERT INTO Playlists (playlist_id, name) VALUES (1, 'P')")
+    a, b, c = db.append_tracks_to_playlist(1, [1, 2, 3])
+    assert db.get_playlist_rows(1) == [(a, 1), (b, 2), (c, 3)]
+
+    before = db.conn.total_changes
+    db.move_playlist_row(1, c, None)
+    assert db.conn.total_changes - before == 1
+    assert _playlist_order(db, 1) == [3, 1, 2]
+    db.move_playlist_row(1, c, b)
+    assert _playlist_order(db, 1) == [1, 2, 3]
+
+    # Keep inserting into the same gap until it has to be renumbered
+    expected = [1, 2, 3]
+    for tid in range(4, 21):
+        db.insert_track_after_row(1, a, tid)
+        expected.insert(1, tid)
+    assert _playlist_order(db, 1) == expected
+    db.move_playlist_row(1, a, c)
+    assert _playlist_order(db, 1) == expected[1:] + [1]
+
+def test_playlist_row_moves_do_not_scan_by_index(db):
+    db.insert_album(Album(1, "Album", 0, 1, 2020))
+    db.conn.executemany("INSERT INTO Tracks (track_id, album_id, title) VALUES (?, 1, 'T')", [(t,) for t in range(2000)])
+    db.conn.execute("INSERT INTO Playlists (playlist_id, name) VALUES (1, 'P')")
+    pt_ids = db.append_tracks_to_playlist(1, list(range(2000)))
+    steps = []
+    db.conn.set_progress_handler(lambda: steps.append(1) and 0, 1)
+    db.rearrange_playlist_track(1, 1990, 1900)
+    by_index, steps[:] = len(steps), []
+    db.move_playlist_row(1, pt_ids[1980], pt_ids[1899])
+    db.conn.set_progress_handler(None, 1)
+    assert len(steps) * 20 < by_index
+
+def test_models_built_from_row_tuples(db):
+    db.sync_library(process_library(generate_library(50, seed=4)))
+    raw = db.conn.execute("SELECT track_id, title, file FROM Tracks WHERE track_id = 3").fetchone()
+    track = db.get_track_by_id(3)
+    assert (track.id, track.name, track.file) == tuple(raw)
+    assert db.get_all_tracks()[2] == track
+    # The positional row factory is per cursor; plain queries still return sqlite3.Row
+    assert db.conn.execute("SELECT * FROM Tracks LIMIT 1").fetchone()["track_id"] == 1
+
+def test_iter_variants_match_get_all(db):
+    db.sync_library(process_library(generate_library(300, seed=5)))
+    assert list(db.iter_tracks(batch_size=7)) == db.get_all_tracks()
+    assert list(db.iter_albums(batch_size=7)) == db.get_all_albums()
+    assert list(db.iter_artists(batch_size=7)) == db.get_all_artists()
+
+def test_keyset_pages_cover_everything_once(db):
+    db.insert_artist(Artist(1, "B", 0, 0))
+    db.insert_artist(Artist(2, "A", 0, 0))
+    db.insert_artist(Artist(3, "B", 0, 0))
+    db.insert_artist(Artist(4, "C", 0, 0))
+    first = db.get_artists_page(limit=2)
+    assert [a.id for a in first] == [2, 1]
+    # Same name as the last item: the id breaks the tie
+    second = db.get_artists_page(after_name=first[-1].name, after_id=first[-1].id, limit=2)
+    assert [a.id for a in second] == [3, 4]
+    assert db.get_artists_page(after_name="C", after_id=4) == []
+    # A name alone can't say where in a run of equal names the page ended
+    with pytest.raises(ValueError):
+        db.get_artists_page(after_name="A")
+
+def test_change_count_moves_with_local_edits(db):
+    db.insert_playlist(Playlist(-1, "Draft", "", 0))
+    before = db.change_count
+    db.replace_playlist_id(-1, 42)
+    assert db.change_count > before
+
+def test_keyset_pages_step_through_null_names(db):
+    for artist_id, name in ((1, "B"), (2, None), (3, "A"), (4, None), (5, None)):
+        db.insert_artist(Artist(artist_id, name, 0, 0))
+    pages, after = [], (None, None)
+    while True:
+        page = db.get_artists_page(*after, limit=2)
+        if not page:
+            break
+        pages.append([a.id for a in page])
+        after = (page[-1].name, page[-1].id)
+    assert pages == [[2, 4], [5, 3], [1]]
+
+def test_reads_never_see_a_half_synced_library(db):
+    library = process_library(generate_library(300, seed=6))
+    db.sync_library(library)
+    expected = len(db.get_all_tracks())
+    done = threading.Event()
+
+    def resync():
+        for _ in range(5):
+            db.sync_library(library)
+        done.set()
+
+    threading.Thread(target=resync, daemon=True).start()
+    counts = set()
+    while not done.is_set():
+        counts.add(len(db.get_all_tracks()))
+        counts.add(len(db.search_library("")) > 0)
+    assert counts <= {expected, True}
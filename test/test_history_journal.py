@@ -0,0 +1,85 @@
+import time
+from src.api.history_journal import HistoryJournal, HistoryUnavailable, build_history
+
+
+def wait_for(condition, timeout=3.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def test_build_history_groups_by_day():
+    plays = [
+        (1, 10, "2025-01-01 10:00:00"),
+        (2, 10, "2025-01-01 10:05:00"),
+        (3, 11, "2025-01-02 09:00:00"),
+    ]
+    history = build_history(plays)
+    assert [h["day"] for h in history] == ["2025-01-01", "2025-01-02"]
+    assert history[0]["plays"] == {"10": 2}
+    assert [d["ts"] for d in history[0]["detail"]["10"]] == ["2025-01-01 10:00:00", "2025-01-01 10:05:00"]
+    assert history[1]["plays"] == {"11": 1}
+
+
+def test_plays_are_sent_in_batches(db):
+    sent = []
+    journal = HistoryJournal(db, lambda history: sent.append(history) or True, batch_size=2)
+    # Journal directly so the worker sees all three at once
+    for i in range(3):
+        db.add_play_history(100 + i, f"2025-01-0{i + 1} 12:00:00")
+    journal.flush()
+    assert wait_for(lambda: db.count_pending_play_history() == 0)
+    assert len(sent) == 2
+    assert sum(len(h) for h in sent) == 3
+
+
+def test_failed_send_is_retried(db):
+    attempts = []
+
+    def flaky(history):
+        attempts.append(history)
+        return len(attempts) > 2
+
+    journal = HistoryJournal(db, flaky, retry_delay=0.01)
+    journal.record(7, "2025-03-01 08:00:00")
+    assert wait_for(lambda: db.count_pending_play_history() == 0)
+    assert len(attempts) == 3
+
+
+def test_pending_plays_survive_restart(db):
+    offline = HistoryJournal(db, lambda history: False, retry_delay=10)
+    offline.record(5, "2025-03-01 08:00:00")
+    assert wait_for(lambda: offline.failures == 1)
+    offline.stop()
+    assert db.count_pending_play_history() == 1
+
+    sent = []
+    restarted = HistoryJournal(db, lambda history: sent.append(history) or True)
+    restarted.flush()
+    assert wait_for(lambda: db.count_pending_play_history() == 0)
+    assert sent[0][0]["plays"] == {"5": 1}
+
+
+def test_plays_dropped_after_max_attempts(db):
+    journal = HistoryJournal(db, lambda history: False, retry_delay=0.001, max_attempts=3)
+    journal.record(9, "2025-03-01 08:00:00")
+    assert wait_for(lambda: db.count_pending_play_history() == 0)
+
+
+def test_undeliverable_sends_never_drop_plays(db):
+    attempts_seen = []
+
+    def offline_for_a_while(history):
+        attempts_seen.append(db.conn.execute("SELECT attempts FROM Play_History").fetchone()[0])
+        if len(attempts_seen) < 10:
+            raise HistoryUnavailable("offline")
+        return True
+
+    journal = HistoryJournal(db, offline_for_a_while, retry_delay=0.001, max_retry_delay=0.001, max_attempts=3)
+    journal.record(9, "2025-03-01 08:00:00")
+    assert wait_for(lambda: db.count_pending_play_history() == 0)
+    # Ten tries, more than max_attempts, and none counted against the play
+    assert attempts_seen == [0] * 10
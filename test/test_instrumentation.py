@@ -0,0 +1,113 @@
+import json
+from src.api.ibroadcast.library_generator import generate_library
+from src.api.ibroadcast.ibroadcast_api import process_library
+from src.core.instrumentation import Instrumentation, instrumentation
+
+def test_disabled_records_nothing():
+    inst = Instrumentation(enabled=False)
+
+    @inst.timed("work")
+    def work(x):
+        return x * 2
+
+    assert work(2) == 4
+    with inst.timer("block"):
+        pass
+    inst.count("hits")
+    inst.observe("size", 3)
+    snapshot = inst.snapshot()
+    assert snapshot["timers_ms"] == {} and snapshot["counters"] == {} and snapshot["histograms"] == {}
+
+def test_timers_counters_and_histograms():
+    inst = Instrumentation(enabled=True)
+
+    @inst.timed()
+    def work():
+        return "done"
+
+    assert work() == "done"
+    work()
+    with inst.timer("block"):
+        pass
+    inst.count("hits")
+    inst.count("hits", 2)
+    for value in (1, 2, 400):
+        inst.observe("rows", value)
+
+    snapshot = json.loads(inst.to_json())
+    timer = snapshot["timers_ms"]["test_timers_counters_and_histograms.<locals>.work"]
+    assert timer["count"] == 2
+    assert snapshot["timers_ms"]["block"]["count"] == 1
+    assert snapshot["counters"] == {"hits": 3}
+    rows = snapshot["histograms"]["rows"]
+    assert rows["count"] == 3 and rows["max"] == 400 and rows["p50"] == 2.5
+
+def test_timed_records_calls_that_raise():
+    inst = Instrumentation(enabled=True)
+
+    @inst.timed("fails")
+    def fails():
+        raise ValueError()
+
+    try:
+        fails()
+    except ValueError:
+        pass
+    assert inst.snapshot()["timers_ms"]["fails"]["count"] == 1
+
+def test_instrument_class_times_public_methods():
+    inst = Instrumentation(enabled=True)
+
+    @inst.instrument_class("db")
+    class Store:
+        def get(self, key):
+            return self._lookup(key)
+
+        def _lookup(self, key):
+            return key
+
+    assert Store().get(5) == 5
+    assert list(inst.snapshot()["timers_ms"]) == ["db.get"]
+
+def test_database_queries_are_timed(db):
+    instrumentation.reset()
+    instrumentation.enable()
+    try:
+        db.get_all_artists()
+        db.get_track_by_id(1)
+    finally:
+        instrumentation.disable()
+    timers = instrumentation.snapshot()["timers_ms"]
+    instrumentation.reset()
+    assert timers["db.get_all_artists"]["count"] == 1
+    assert timers["db.get_track_by_id"]["count"] == 1
+
+def test_iter_methods_time_their_fetches_not_the_call(db):
+    db.sync_library(process_library(generate_library(50, seed=3)))
+    instrumentation.reset()
+    instrumentation.enable()
+    try:
+        tracks = db.iter_tracks(batch_size=20)
+        assert len(list(tracks)) == 50
+    finally:
+        instrumentation.disable()
+    timers = instrumentation.snapshot()["timers_ms"]
+    instrumentation.reset()
+    assert "db.iter_tracks" not in timers
+    # Opening the cursor, then batches of 20, 20, 10 and the empty one that ends it
+    assert timers["db.iter_tracks.fetch"]["count"] == 5
+
+def test_debug_tab_lists_timers(qapp):
+    from src.ui.utils.options_dialog import DebugTab
+    instrumentation.reset()
+    instrumentation.enable()
+    try:
+        with instrumentation.timer("ui.example"):
+            pass
+        instrumentation.count("ui.example.skipped")
+    finally:
+        instrumentation.disable()
+    tab = DebugTab()
+    names = [tab.table.item(r, 0).text() for r in range(tab.table.rowCount())]
+    instrumentation.reset()
+    assert names == ["ui.example", "ui.example.skipped"]
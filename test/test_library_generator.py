@@ -0,0 +1,19 @@
+from src.api.ibroadcast.library_generator import generate_library
+from src.api.ibroadcast.ibroadcast_api import process_library
+
+
+def test_generated_library_syncs(db):
+    library = process_library(generate_library(1000, seed=1))
+    db.sync_library(library)
+
+    assert db.conn.execute("SELECT COUNT(*) FROM Tracks").fetchone()[0] == 1000
+    assert db.conn.execute("SELECT COUNT(*) FROM Albums").fetchone()[0] == len(library["albums"])
+    # Some tracks credit more than one artist
+    assert db.conn.execute("SELECT COUNT(*) FROM Track_Artists").fetchone()[0] > 1000
+    biggest = max(library["playlists"].values(), key=lambda p: len(p["tracks"]))
+    assert len(db.get_tracks_by_playlist(biggest["item_id"])) == 1000
+
+
+def test_generated_library_is_deterministic():
+    assert generate_library(500, seed=3) == generate_library(500, seed=3)
+    assert generate_library(500, seed=3) != generate_library(500, seed=4)
@@ -0,0 +1,71 @@
+import pytest
+from src.api.ibroadcast.library_snapshot import HAS_NUMPY, LibrarySnapshot
+from src.api.ibroadcast.models import Artist, Album
+from src.api.ibroadcast.library_generator import generate_library
+from src.api.ibroadcast.ibroadcast_api import process_library
+
+BACKENDS = [False, pytest.param(True, marks=pytest.mark.skipif(not HAS_NUMPY, reason="numpy not installed"))]
+
+
+def _small_library(db):
+    db.insert_artist(Artist(1, "Solo", 0, 0))
+    db.insert_artist(Artist(2, "Guest", 0, 0))
+    db.insert_album(Album(10, "First", 5, 1, 1995))
+    db.insert_album(Album(20, "Second", 3, 1, 2005))
+    rows = [
+        # track_id, album_id, year, length, rating, plays
+        (1, 10, 1995, 200, 5, 10),
+        (2, 10, 1995, 300, 4, 0),
+        (3, 20, 2005, 100, 1, 30),
+        (4, 20, 2005, 400, 5, 2),
+    ]
+    for track_id, album_id, year, length, rating, plays in rows:
+        db.conn.execute(
+            "INSERT INTO Tracks (track_id, album_id, track_number, year, title, length, rating, plays) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (track_id, album_id, track_id, year, f"Track {track_id}", length, rating, plays),
+        )
+        db.conn.execute("INSERT INTO Track_Artists (track_id, artist_id) VALUES (?, 1)", (track_id,))
+    db.conn.execute("INSERT INTO Track_Artists (track_id, artist_id) VALUES (4, 2)")
+    db.conn.commit()
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_snapshot_queries(db, use_numpy):
+    _small_library(db)
+    snapshot = LibrarySnapshot.from_db(db, use_numpy=use_numpy)
+    assert snapshot.size == 4
+
+    assert snapshot.track_ids(snapshot.where(year=1995)) == [1, 2]
+    assert snapshot.track_ids(snapshot.where(rating=(4, None), length=(None, 300))) == [1, 2]
+    assert snapshot.track_ids(snapshot.where(artist_id=2)) == [4]
+    assert snapshot.track_ids(snapshot.where(rows=snapshot.where(year=2005), rating=5)) == [4]
+
+    assert snapshot.track_ids(snapshot.order_by("length")) == [3, 1, 2, 4]
+    # Ties keep track id order
+    assert snapshot.track_ids(snapshot.order_by("rating", descending=True)) == [1, 4, 2, 3]
+    assert snapshot.track_ids(snapshot.top("plays", 2)) == [3, 1]
+    assert snapshot.track_ids(snapshot.top("rating", 1)) == [1]
+
+    # play_time is length * plays; artist 2 is credited on track 4 only
+    assert snapshot.sum_by("artist_id", "play_time") == {1: 2000 + 3000 + 800, 2: 800}
+    assert snapshot.sum_by("album_id") == {10: 500, 20: 500}
+    assert snapshot.sum_by("artist_id", "length", rows=snapshot.where(year=2005)) == {1: 500, 2: 400}
+    assert snapshot.count_by("year") == {1995: 2, 2005: 2}
+
+    assert snapshot.albums_where(rating=(4, None)) == [10]
+    assert snapshot.albums_where(year=(2000, None)) == [20]
+
+
+@pytest.mark.skipif(not HAS_NUMPY, reason="numpy not installed")
+def test_snapshot_backends_agree(db):
+    db.sync_library(process_library(generate_library(500, seed=7)))
+    plain = LibrarySnapshot.from_db(db, use_numpy=False)
+    vectorized = LibrarySnapshot.from_db(db, use_numpy=True)
+
+    for snapshot in (plain, vectorized):
+        assert snapshot.size == db.conn.execute("SELECT COUNT(*) FROM Tracks").fetchone()[0]
+    query = lambda s: s.track_ids(s.order_by("plays", s.where(rating=(3, None)), descending=True))
+    assert query(plain) == query(vectorized)
+    assert plain.track_ids(plain.top("plays", 25)) == vectorized.track_ids(vectorized.top("plays", 25))
+    assert plain.sum_by("artist_id", "play_time") == vectorized.sum_by("artist_id", "play_time")
+    assert plain.count_by("album_id") == vectorized.count_by("album_id")
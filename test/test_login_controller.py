@@ -0,0 +1,119 @@
+import threading
+import time
+import requests
+from PyQt6.QtCore import QCoreApplication
+from src.api.ibroadcast.oauth_callback_server import OAuthCallbackServer
+from src.core.login_controller import LoginController
+
+
+class FakeAPI:
+    def __init__(self, access_token=None, cached_token_works=False):
+        self.access_token = access_token
+        self.cached_token_works = cached_token_works
+        self.callback_server = None
+        self.oauth_state = "expected-state"
+        self.loaded_on = []
+
+    def start_oauth_flow(self, on_callback):
+        self.callback_server = OAuthCallbackServer(on_callback, port=0)
+        self.callback_server.start()
+        port = self.callback_server.server_address[1]
+        return {"success": True, "auth_url": f"http://localhost:{port}/callback"}
+
+    def stop_callback_server(self):
+        if self.callback_server is not None:
+            self.callback_server.stop()
+            self.callback_server = None
+
+    def complete_oauth(self, code, state):
+        if state != self.oauth_state:
+            return {"success": False, "message": "State mismatch"}
+        self.access_token = code
+        return {"success": True}
+
+    def load_library(self):
+        self.loaded_on.append(threading.current_thread())
+        ok = self.access_token is not None and (self.cached_token_works or self.access_token == "good-code")
+        return {"success": ok}
+
+
+def browser(query):
+    """Stand-in for the browser following the redirect"""
+    def open_url(url):
+        threading.Thread(target=lambda: requests.get(f"{url}?{query}", timeout=5), daemon=True).start()
+    return open_url
+
+
+def run_login(api, open_url):
+    controller = LoginController(api, open_url=open_url)
+    results = []
+    controller.loginSucceeded.connect(lambda: results.append(("ok", "")))
+    controller.loginFailed.connect(lambda message: results.append(("failed", message)))
+    controller.login()
+    deadline = time.time() + 5
+    while not results and time.time() < deadline:
+        QCoreApplication.processEvents()
+        time.sleep(0.01)
+    return controller, results
+
+
+def test_cached_token_loads_off_ui_thread(qapp):
+    api = FakeAPI(access_token="cached", cached_token_works=True)
+    opened = []
+    controller, results = run_login(api, opened.append)
+    assert results == [("ok", "")]
+    assert opened == []
+    assert api.loaded_on[0] is not threading.main_thread()
+
+
+def test_oauth_callback_completes_login(qapp):
+    api = FakeAPI()
+    controller, results = run_login(api, browser("code=good-code&state=expected-state"))
+    assert results == [("ok", "")]
+    assert api.callback_server is None  # Stopped as soon as the callback arrived
+    assert api.loaded_on[0] is not threading.main_thread()
+
+
+def test_expired_cached_token_falls_back_to_oauth(qapp):
+    api = FakeAPI(access_token="expired")
+    controller, results = run_login(api, browser("code=good-code&state=expected-state"))
+    assert results == [("ok", "")]
+    assert len(api.loaded_on) == 2
+
+
+def test_state_mismatch_fails(qapp):
+    api = FakeAPI()
+    controller, results = run_login(api, browser("code=good-code&state=forged"))
+    assert results == [("failed", "Login failed: State mismatch")]
+
+
+def test_error_callback_fails(qapp):
+    api = FakeAPI()
+    controller, results = run_login(api, browser("error=access_denied"))
+    assert results == [("failed", "Login failed: access_denied")]
+    assert api.callback_server is None
+
+
+def test_cancel_stops_callback_server(qapp):
+    api = FakeAPI()
+    controller = LoginController(api, open_url=lambda url: None)
+    controller.login()
+    server = api.callback_server
+    assert server is not None
+    controller.cancel()
+    assert api.callback_server is None
+    assert server.thread is None
+
+
+def test_callback_server_reports_first_callback_only():
+    calls = []
+    server = OAuthCallbackServer(lambda *args: calls.append(args), port=0)
+    server.start()
+    try:
+        port = server.server_address[1]
+        assert requests.get(f"http://localhost:{port}/callback?code=abc&state=s1", timeout=5).status_code == 200
+        requests.get(f"http://localhost:{port}/callback?code=def&state=s2", timeout=5)
+        assert requests.get(f"http://localhost:{port}/favicon.ico", timeout=5).status_code == 404
+    finally:
+        server.stop()
+    assert calls == [("abc", "s1", None)]
@@ -0,0 +1,68 @@
+import pytest
+import requests
+from unittest.mock import patch
+from benchmarks.mock_server import MockIBroadcastServer
+from src.api.artwork_cache import ArtworkCache
+from src.api.audio_cache import AudioCache
+from src.api.ibroadcast.ibroadcast_api import iBroadcastAPI
+
+@pytest.fixture
+def server():
+    server = MockIBroadcastServer(tracks=200)
+    server.start()
+    yield server
+    server.stop()
+
+@pytest.fixture
+def api(db, server, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with patch('src.api.ibroadcast.ibroadcast_api.DatabaseManager', return_value=db):
+        client = iBroadcastAPI(server_url=server.url)
+    client.artwork_cache = ArtworkCache(tmp_path / "artworks")
+    client.audio_cache = AudioCache(tmp_path / "audio")
+    client.tokens.set_tokens("access", "refresh", expires_in=3600)
+    return client
+
+def test_server_url_override(server, db, monkeypatch):
+    monkeypatch.setenv("PYBROADCAST_SERVER_URL", server.url + "/")
+    with patch('src.api.ibroadcast.ibroadcast_api.DatabaseManager', return_value=db):
+        client = iBroadcastAPI()
+    assert client.base_url == server.url
+    assert client.library_url == server.url
+    assert client.queue_url == "ws://" + server.url.split("://")[1]
+    assert client.get_artwork_url(7, use_cache=False) == f"{server.url}/artwork/7"
+    assert client.oauth_config()["token_url"] == f"{server.url}/token"
+
+def test_load_library_from_mock_server(api, server, db):
+    assert api.load_library()["success"]
+    assert db.conn.execute("SELECT COUNT(*) FROM Tracks").fetchone()[0] == 200
+    assert api.streaming_server == server.url
+    assert server.stats["library"] == 1
+
+def test_status_and_playlist_endpoints(api, server):
+    token = api.get_play_queue_token()
+    assert token["session_uuid"] == server.session_uuid
+
+    assert api.report_history(1, "2026-01-01 10:00:00")
+    assert server.history[0]["plays"] == {"1": 1}
+
+    api.create_playlist("Mix")
+    assert api.playlist_sync.wait_idle(5)
+    assert api.playlist_ids[-1] == server.next_playlist_id
+
+    assert api.refresh_access_token()
+    assert api.access_token.startswith("local-access-")
+
+def test_stream_range_request(api, server, db):
+    api.load_library()
+    track = db.get_track_by_id(1)
+    response = requests.get(api.get_stream_url(1), headers={"Range": "bytes=10-19"}, timeout=5)
+    assert response.status_code == 206
+    assert response.content == server.audio_bytes(10, 10)
+    assert response.headers["Content-Range"].endswith(f"/{server.files[track.file]}")
+
+def test_latency_injection(server):
+    server.latency = 0.2
+    response = requests.post(f"{server.url}/s/JSON/status", json={"mode": "status"}, timeout=5)
+    assert response.json() == {"result": True}
+    assert response.elapsed.total_seconds() >= 0.2
@@ -1,4 +1,5 @@
 import pytest
+import sys
 from src.api.ibroadcast.models import Artist, Album, Track, Playlist
 
 def test_artist_creation():
@@ -28,3 +29,10 @@ def test_playlist_creation():
     assert playlist.id == 1
     assert playlist.name == "Test Playlist"
     assert playlist.description == "Description"
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason="dataclass slots need Python 3.10")
+def test_models_have_no_instance_dict():
+    track = Track(1, "Test Track")
+    assert not hasattr(track, "__dict__")
+    with pytest.raises(AttributeError):
+        track.not_a_field = 1
@@ -0,0 +1,85 @@
+import pytest
+from src.api.ibroadcast.library_generator import generate_library
+from src.api.ibroadcast.database import TRACK_COLUMNS
+from src.api.ibroadcast.ibroadcast_api import process_library
+from src.core.query_tracer import PROGRESS_OPS, QueryTracer, TracedConnection, normalize
+
+@pytest.fixture
+def library_db(db):
+    db.sync_library(process_library(generate_library(300, seed=2)))
+    return db
+
+def test_normalize_folds_in_lists():
+    assert normalize("SELECT *\n  FROM t WHERE id IN (?, ?,?)") == "SELECT * FROM t WHERE id IN (?...)"
+
+def test_records_statements_per_call_site(library_db):
+    tracer = QueryTracer(log_path=None)
+    tracer.install(library_db)
+    assert isinstance(library_db.conn, TracedConnection)
+    for track_id in (1, 2):
+        library_db.get_track_by_id(track_id)
+    assert len(library_db.get_all_tracks()) == 300
+    tracer.uninstall(library_db)
+    library_db.get_track_by_id(3)
+
+    report = tracer.report()
+    assert report["queries"] == 3
+    by_sql = {s["sql"]: s for s in report["top"]}
+    lookup = by_sql[f"SELECT {TRACK_COLUMNS} FROM Tracks WHERE track_id = ?"]
+    assert lookup["count"] == 2 and lookup["last_params"] == "(2,)"
+    assert lookup["site"].startswith("test_query_tracer.py:") and lookup["site"].endswith("-> db.get_track_by_id")
+    # Steps are sampled every PROGRESS_OPS instructions: the full scan of 300
+    # tracks crosses that many times, while a primary key lookup may not once
+    scan = by_sql[f"SELECT {TRACK_COLUMNS} FROM Tracks"]
+    assert scan["steps"] >= 300 > lookup["steps"]
+    assert scan["steps"] % PROGRESS_OPS == 0
+
+def test_flags_n_plus_one_within_an_action(library_db):
+    tracer = QueryTracer(n_plus_one=10, log_path=None)
+    tracer.install(library_db)
+    track_ids = list(range(1, 51))
+    with tracer.action("per-track lookups"):
+        for track_id in track_ids:
+            library_db.get_artists_by_track(track_id)
+    with tracer.action("batched lookup"):
+        library_db.get_artist_names_by_tracks(track_ids)
+
+    patterns = tracer.report()["n_plus_one"]
+    assert [p["action"] for p in patterns] == ["per-track lookups"]
+    assert patterns[0]["count"] == 50
+    assert patterns[0]["sites"][0].endswith("-> db.get_artists_by_track")
+
+def test_main_thread_queries_group_until_deferred_callback(library_db):
+    tracer = QueryTracer(n_plus_one=5, log_path=None)
+    pending = []
+    tracer.defer = pending.append
+    tracer.install(library_db)
+    for track_id in range(1, 5):
+        library_db.get_track_by_id(track_id)
+    assert len(pending) == 1
+    pending.pop()()
+    for track_id in range(1, 5):
+        library_db.get_track_by_id(track_id)
+    assert tracer.report()["n_plus_one"] == []
+
+def test_slow_query_log(library_db, tmp_path):
+    log = tmp_path / "slow.log"
+    tracer = QueryTracer(slow_ms=0.0, log_path=str(log))
+    tracer.install(library_db)
+    library_db.get_track_by_id(7)
+    with library_db.conn:
+        library_db.conn.execute("UPDATE Tracks SET plays = plays + 1 WHERE track_id = ?", (7,))
+
+    slow = tracer.report()["slow"]
+    # The trace callback supplies the statement with its parameters bound
+    assert slow[0]["sql"] == f"SELECT {TRACK_COLUMNS} FROM Tracks WHERE track_id = 7"
+    assert "UPDATE Tracks SET plays = plays + 1 WHERE track_id = 7" in log.read_text()
+
+def test_unwritable_slow_log_is_reported_once(library_db, tmp_path, capsys):
+    tracer = QueryTracer(slow_ms=0.0, log_path=str(tmp_path))  # A directory
+    tracer.install(library_db)
+    for track_id in (1, 2, 3):
+        library_db.get_track_by_id(track_id)
+    tracer.uninstall(library_db)
+    assert len(tracer.report()["slow"]) == 3
+    assert capsys.readouterr().out.count("Failed to write query log") == 1
@@ -0,0 +1,92 @@
+import time
+import pytest
+from src.api.ibroadcast.models import Artist, Album, Track
+from src.core.search_controller import SearchController
+
+
+class FakeAPI:
+    def __init__(self):
+        self.searches = []
+        self.version = 0
+        self.items = [
+            Artist(1, "The Beatles", 0, 11),
+            Album(2, "Beatles For Sale", 0, 1, 1964),
+            Track(3, "Beat It", 1, 1982, 200, 33),
+        ]
+
+    def search(self, text):
+        self.searches.append(text)
+        return [i for i in self.items if text.lower() in i.name.lower()]
+
+    def library_version(self):
+        return self.version
+
+    def get_album_artwork_ids(self, album_ids):
+        return {album_id: 22 for album_id in album_ids}
+
+    def get_artwork_url(self, artwork_id):
+        return f"art/{artwork_id}" if artwork_id else ""
+
+
+def wait_for(qapp, condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        qapp.processEvents()
+        time.sleep(0.005)
+    return condition()
+
+
+@pytest.fixture
+def controller(qapp):
+    ctrl = SearchController(FakeAPI(), debounce_ms=20)
+    ctrl.received = []
+    ctrl.resultsReady.connect(lambda q, r: ctrl.received.append((q, r)))
+    return ctrl
+
+
+def test_debounce_runs_one_search(qapp, controller):
+    for text in ["bea", "beat", "beatl"]:
+        controller.set_query(text)
+    assert wait_for(qapp, lambda: controller.received)
+    assert controller.api.searches == ["beatl"]
+    query, results = controller.received[-1]
+    assert query == "beatl"
+    assert [m.id for m, _ in results] == [1, 2]
+    assert results[1][1] == "art/22"
+
+
+def test_extended_query_reuses_previous_results(qapp, controller):
+    controller.search_now("beat")
+    assert wait_for(qapp, lambda: len(controller.received) == 1)
+    controller.search_now("beatles")
+    assert wait_for(qapp, lambda: len(controller.received) == 2)
+    assert controller.api.searches == ["beat"]
+    assert [m.id for m, _ in controller.received[-1][1]] == [1, 2]
+
+
+def test_stale_generation_is_dropped(qapp, controller):
+    controller._on_worker_finished(controller.generation - 1, "old", [], 0)
+    controller.search_now("beat")
+    controller.cancel()
+    wait_for(qapp, lambda: controller.received, timeout=0.2)
+    assert controller.received == []
+
+
+def test_cached_results_are_not_refined_when_stale(qapp, controller):
+    def search(text):
+        controller.search_now(text)
+        count = len(controller.received)
+        assert wait_for(qapp, lambda: len(controller.received) > count)
+
+    search("beat")
+    # Clearing the box forgets the old result set
+    controller.cancel()
+    search("beatl")
+    # So does a local change to the library
+    controller.api.version += 1
+    search("beatles")
+    # LIKE wildcards are left to the database
+    search("beatles_")
+    assert controller.api.searches == ["beat", "beatl", "beatles", "beatles_"]
+    search("beatles_x")
+    assert controller.api.searches[-1] == "beatles_x"
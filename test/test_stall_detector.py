@@ -0,0 +1,39 @@
+import time
+from PyQt6.QtCore import QEventLoop
+from src.core.stall_detector import StallDetector
+
+def _pump(app, ms):
+    deadline = time.monotonic() + ms / 1000
+    while time.monotonic() < deadline:
+        app.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 5)
+
+def _block_ui():
+    time.sleep(0.25)
+
+def test_stall_is_captured_with_main_thread_stack(qapp):
+    detector = StallDetector(threshold_ms=80, heartbeat_ms=10)
+    detector.start()
+    try:
+        _pump(qapp, 100)
+        for _ in range(2):
+            _block_ui()
+            _pump(qapp, 100)
+    finally:
+        detector.stop()
+
+    report = detector.report()
+    assert report["stalls"] == 2
+    [entry] = report["signatures"]
+    assert entry["count"] == 2
+    # Innermost Python frame is where the main thread was blocked
+    assert entry["stack"][-1].endswith("in _block_ui")
+    assert 150 <= entry["max_ms"] < 1000
+
+def test_responsive_loop_reports_nothing(qapp):
+    detector = StallDetector(threshold_ms=150, heartbeat_ms=10)
+    detector.start()
+    try:
+        _pump(qapp, 300)
+    finally:
+        detector.stop()
+    assert detector.report()["stalls"] == 0
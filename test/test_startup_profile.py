@@ -0,0 +1,30 @@
+import pytest
+from src.core.startup_profile import StartupProfile
+from src.ui.utils.lazy_view import is_built, lazy_view
+
+def test_marks_attribute_time_to_stages():
+    profile = StartupProfile()
+    profile.mark("imports")
+    profile.finish("ready")
+    profile.mark("after finish")
+
+    stages = profile.stages()
+    assert [name for name, _, _ in stages] == ["imports", "ready"]
+    assert stages[-1][2] == pytest.approx(sum(ms for _, ms, _ in stages))
+    assert profile.report().splitlines()[1].startswith("imports")
+
+def test_lazy_view_builds_once_on_first_access():
+    built = []
+
+    class Window:
+        @lazy_view
+        def albums_view(self):
+            built.append(self)
+            return object()
+
+    window = Window()
+    assert not is_built(window, "albums_view")
+    view = window.albums_view
+    assert window.albums_view is view
+    assert is_built(window, "albums_view")
+    assert built == [window]
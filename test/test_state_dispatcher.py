@@ -0,0 +1,105 @@
+import os
+import pytest
+from src.api.ibroadcast.play_queue_socket import PlayQueueSocket
+from src.core.state_dispatcher import StateDispatcher, changed_fields, merge_state
+
+TRAFFIC = os.path.join(os.path.dirname(__file__), "data", "play_queue_traffic.jsonl")
+
+
+def replay(socket):
+    """Feed captured raw messages through the socket's message handler"""
+    with open(TRAFFIC) as f:
+        for line in f:
+            socket._on_text_message(line)
+
+
+@pytest.fixture
+def recorded(qapp):
+    dispatcher = StateDispatcher()
+    calls = []
+
+    def recorder(name):
+        return lambda state, changed: calls[-1].append(name)
+
+    dispatcher.register(["tracks", "play_next", "data.play_from", "data.play_index"], recorder("queue"))
+    dispatcher.register(["shuffle", "data.repeat_mode"], recorder("mode"))
+    dispatcher.register(["role", "current_song", "pause"], recorder("playback"))
+    dispatcher.register(["start_position", "start_time"], recorder("position"))
+    dispatcher.register(["volume"], recorder("volume"))
+
+    def on_state(state):
+        calls.append([])
+        dispatcher.dispatch(state)
+
+    socket = PlayQueueSocket()
+    socket.stateUpdated.connect(on_state)
+    replay(socket)
+    return dispatcher, calls
+
+
+def test_replay_dispatches_only_changed_handlers(recorded):
+    dispatcher, calls = recorded
+    assert calls == [
+        ["queue", "mode", "playback", "position", "volume"],  # initial state
+        ["position"],
+        ["position"],
+        ["position"],
+        ["position"],  # partial heartbeat without track lists
+        ["position", "volume"],
+        ["queue", "playback", "position"],  # next track
+        ["playback", "position"],  # paused
+        ["queue"],  # play next added
+        ["mode"],  # repeat toggled
+        [],  # duplicate message
+    ]
+
+
+def test_partial_state_keeps_previous_lists(recorded):
+    dispatcher, calls = recorded
+    state = dispatcher.last_state
+    assert state["tracks"] == [1001, 1002, 1003, 1004]
+    assert state["play_next"] == [2001]
+    assert state["data"]["play_index"] == 1
+    assert state["data"]["repeat_mode"] == "queue"
+    assert state["volume"] == 0.5
+
+
+def test_reset_triggers_every_handler_again(recorded):
+    dispatcher, calls = recorded
+    state = dict(dispatcher.last_state)
+    dispatcher.reset()
+    calls.append([])
+    dispatcher.dispatch(state)
+    assert calls[-1] == ["queue", "mode", "playback", "position", "volume"]
+
+
+def test_changed_fields_and_merge():
+    old = {"data": {"play_index": 1, "play_from": "tracks"}, "pause": False}
+    new = {"data": {"play_index": 2}, "pause": False}
+    assert changed_fields(old, new) == {"data.play_index"}
+    merged = merge_state(old, new)
+    assert merged["data"] == {"play_index": 2, "play_from": "tracks"}
+
+
+def test_local_change_between_inbound_states(recorded):
+    from src.core.state_publisher import StatePublisher
+
+    class FakeSocket:
+        is_connected = True
+
+        def send_set_state(self, state):
+            pass
+
+    dispatcher, calls = recorded
+    inbound = dict(dispatcher.last_state)
+    local = merge_state(inbound, {"pause": not inbound["pause"], "volume": 0.9})
+    publisher = StatePublisher(FakeSocket(), lambda: local)
+    publisher.sent.connect(dispatcher.record_sent)
+    publisher.mark_dirty()
+    publisher.flush()
+    assert dispatcher.last_state["pause"] == local["pause"]
+
+    # A remote client restores the earlier pause state and volume
+    calls.append([])
+    dispatcher.dispatch(inbound)
+    assert calls[-1] == ["playback", "volume"]
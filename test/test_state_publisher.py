@@ -0,0 +1,152 @@
+import time
+import pytest
+from PyQt6.QtCore import QCoreApplication
+from src.core.state_publisher import StatePublisher
+
+
+class FakeSocket:
+    def __init__(self):
+        self.is_connected = True
+        self.sent = []
+
+    def send_set_state(self, state):
+        self.sent.append(state)
+
+
+class Player:
+    def __init__(self):
+        self.tracks = [1, 2, 3]
+        self.play_next = []
+        self.pause = False
+        self.volume = 0.5
+        self.position = 10.0
+        self.now = 1000.0
+
+    def build_state(self):
+        return {
+            "current_song": 1,
+            "pause": self.pause,
+            "tracks": self.tracks,
+            "play_next": self.play_next,
+            "volume": self.volume,
+            "start_position": self.position,
+            "start_time": self.now,
+        }
+
+
+@pytest.fixture
+def publisher(qapp):
+    socket = FakeSocket()
+    player = Player()
+    pub = StatePublisher(socket, player.build_state, coalesce_ms=10, min_interval_ms=0)
+    return pub, socket, player
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        QCoreApplication.processEvents()
+        if condition():
+            return True
+        time.sleep(0.005)
+    return condition()
+
+
+def test_changes_are_coalesced(publisher):
+    pub, socket, player = publisher
+    for volume in (0.1, 0.2, 0.3):
+        player.volume = volume
+        pub.mark_dirty()
+    assert wait_for(lambda: socket.sent)
+    wait_for(lambda: False, timeout=0.1)
+    assert len(socket.sent) == 1
+    assert socket.sent[0]["volume"] == 0.3
+    assert socket.sent[0]["tracks"] == [1, 2, 3]
+
+
+def test_identical_payload_is_suppressed(publisher):
+    pub, socket, player = publisher
+    pub.mark_dirty()
+    pub.flush()
+    player.now += 1.0
+    player.position += 1.0  # Playing on, not a seek
+    pub.mark_dirty()
+    pub.flush()
+    assert len(socket.sent) == 1
+    assert pub.suppressed_count == 1
+
+
+def test_heartbeat_omits_unchanged_lists(publisher):
+    pub, socket, player = publisher
+    pub.mark_dirty()
+    pub.flush()
+    player.now += 2.0
+    player.position += 2.0
+    pub.mark_position()
+    pub.flush()
+    assert len(socket.sent) == 2
+    heartbeat = socket.sent[1]
+    assert "tracks" not in heartbeat and "play_next" not in heartbeat
+    assert heartbeat["start_position"] == 12.0
+
+
+def test_list_mutation_and_seek_are_sent(publisher):
+    pub, socket, player = publisher
+    pub.mark_dirty()
+    pub.flush()
+    player.tracks.append(4)  # Mutated in place
+    pub.mark_dirty()
+    pub.flush()
+    assert socket.sent[-1]["tracks"] == [1, 2, 3, 4]
+
+    player.position = 90.0
+    pub.mark_dirty()
+    pub.flush()
+    assert len(socket.sent) == 3
+    assert "tracks" not in socket.sent[-1]
+
+
+def test_min_interval_limits_rate(qapp):
+    socket = FakeSocket()
+    player = Player()
+    pub = StatePublisher(socket, player.build_state, coalesce_ms=0, min_interval_ms=300)
+    pub.mark_dirty()
+    pub.flush()
+    player.pause = True
+    pub.mark_dirty()
+    wait_for(lambda: False, timeout=0.1)
+    assert len(socket.sent) == 1
+    assert wait_for(lambda: len(socket.sent) == 2)
+    assert socket.sent[1]["pause"] is True
+
+
+def test_reset_resends_full_state(publisher):
+    pub, socket, player = publisher
+    pub.mark_dirty()
+    pub.flush()
+    pub.reset()
+    pub.mark_position()
+    pub.flush()
+    assert socket.sent[-1]["tracks"] == [1, 2, 3]
+
+
+def test_track_queue_lists_are_serialized_and_diffed(qapp):
+    from src.core.track_queue import TrackQueue
+    socket = FakeSocket()
+    player = Player()
+    player.tracks = TrackQueue([1, 2, 3])
+    pub = StatePublisher(socket, player.build_state, min_interval_ms=0)
+    pub.mark_dirty()
+    pub.flush()
+    assert socket.sent[0]["tracks"] == [1, 2, 3]
+
+    player.tracks.assign([1, 2, 3])
+    player.volume = 0.9
+    pub.mark_dirty()
+    pub.flush()
+    assert "tracks" not in socket.sent[1]
+
+    player.tracks.append(4)
+    pub.mark_dirty()
+    pub.flush()
+    assert socket.sent[2]["tracks"] == [1, 2, 3, 4]
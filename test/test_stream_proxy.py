@@ -0,0 +1,166 @@
+import re
+import threading
+import time
+import pytest
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.api.stream_proxy import StreamProxy
+
+PAYLOAD = bytes(range(256)) * 1024  # 256 KiB
+
+
+class StandInStreamingHandler(BaseHTTPRequestHandler):
+    """Minimal range-capable stand-in for the streaming server"""
+    requests_seen = []
+
+    def do_GET(self):
+        StandInStreamingHandler.requests_seen.append(self.headers.get("Range"))
+        start, end = 0, len(PAYLOAD) - 1
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match:
+            start = int(match.group(1))
+            if match.group(2):
+                end = min(end, int(match.group(2)))
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(PAYLOAD)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", "audio/mpeg")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        self.wfile.write(PAYLOAD[start:end + 1])
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def upstream():
+    StandInStreamingHandler.requests_seen = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInStreamingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/track.mp3"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def proxy(tmp_path):
+    p = StreamProxy(cache_dir=tmp_path / "ranges")
+    p.start()
+    yield p
+    p.stop()
+
+
+def test_full_download_through_proxy(proxy, upstream):
+    local_url = proxy.register(upstream, "/track.mp3")
+    response = requests.get(local_url)
+    assert response.status_code == 200
+    assert response.content == PAYLOAD
+    assert response.headers["Content-Type"] == "audio/mpeg"
+
+
+def test_seek_back_is_served_from_cache(proxy, upstream):
+    local_url = proxy.register(upstream, "/track.mp3")
+    first = requests.get(local_url, headers={"Range": "bytes=0-65535"})
+    assert first.status_code == 206
+    assert first.headers["Content-Range"] == f"bytes 0-65535/{len(PAYLOAD)}"
+    assert first.content == PAYLOAD[:65536]
+    upstream_requests = proxy.get_stats()["upstream_requests"]
+
+    again = requests.get(local_url, headers={"Range": "bytes=1000-2000"})
+    assert again.content == PAYLOAD[1000:2001]
+    assert proxy.get_stats()["upstream_requests"] == upstream_requests
+    assert proxy.get_stats()["bytes_from_cache"] == 1001
+
+
+def test_partial_overlap_only_fetches_gap(proxy, upstream):
+    local_url = proxy.register(upstream, "/track.mp3")
+    requests.get(local_url, headers={"Range": "bytes=0-99"})
+    StandInStreamingHandler.requests_seen = []
+
+    response = requests.get(local_url, headers={"Range": "bytes=50-199"})
+    assert response.content == PAYLOAD[50:200]
+    assert StandInStreamingHandler.requests_seen == ["bytes=100-199"]
+
+
+def test_cache_survives_new_proxy(tmp_path, upstream):
+    first = StreamProxy(cache_dir=tmp_path / "ranges")
+    first.start()
+    requests.get(first.register(upstream, "/track.mp3"), headers={"Range": "bytes=0-9"})
+    first.stop()
+
+    second = StreamProxy(cache_dir=tmp_path / "ranges")
+    second.start()
+    try:
+        response = requests.get(second.register(upstream, "/track.mp3"), headers={"Range": "bytes=0-9"})
+        assert response.content == PAYLOAD[:10]
+        assert second.get_stats()["upstream_requests"] == 0
+    finally:
+        second.stop()
+
+
+def test_unknown_token_is_404(proxy):
+    response = requests.get(f"http://127.0.0.1:{proxy.port}/stream/nope")
+    assert response.status_code == 404
+
+
+def test_range_cache_evicts_least_recently_used(tmp_path, upstream):
+    p = StreamProxy(cache_dir=tmp_path / "ranges", max_bytes=150 * 1024)
+    p.start()
+    try:
+        first = p.register(upstream, "/first.mp3")
+        requests.get(first, headers={"Range": "bytes=0-102399"})
+        assert p.get_stats()["size"] == 100 * 1024
+        requests.get(p.register(upstream + "?2", "/second.mp3"), headers={"Range": "bytes=0-102399"})
+        assert p.get_stats()["size"] == 100 * 1024 and p.get_stats()["count"] == 1
+        assert len(list((tmp_path / "ranges").glob("*.bin"))) == 1
+
+        # The evicted track is fetched again
+        upstream_requests = p.get_stats()["upstream_requests"]
+        assert requests.get(first, headers={"Range": "bytes=0-9"}).content == PAYLOAD[:10]
+        assert p.get_stats()["upstream_requests"] > upstream_requests
+    finally:
+        p.stop()
+
+    # Sizes carry over to a new proxy, and a smaller budget evicts on startup
+    again = StreamProxy(cache_dir=tmp_path / "ranges", max_bytes=150 * 1024)
+    assert again.get_stats()["size"] == 100 * 1024 + 10
+    again.server.server_close()
+    again = StreamProxy(cache_dir=tmp_path / "ranges", max_bytes=1024)
+    assert again.get_stats()["size"] == 10
+    again.server.server_close()
+
+
+def test_routes_and_open_stores_are_bounded(tmp_path, upstream):
+    p = StreamProxy(cache_dir=tmp_path / "ranges", max_routes=2, max_open_stores=2)
+    p.start()
+    try:
+        urls = [p.register(upstream, f"/{i}.mp3") for i in range(3)]
+        assert requests.get(urls[0]).status_code == 404
+        for url in urls[1:]:
+            requests.get(url, headers={"Range": "bytes=0-9"})
+        requests.get(p.register(upstream, "/3.mp3"), headers={"Range": "bytes=0-9"})
+        assert len(p.routes) == 2
+        # Stores are released by the server thread once the response is written
+        deadline = time.time() + 2
+        while len(p.stores) > 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert list(p.stores) == ["/2.mp3", "/3.mp3"]
+    finally:
+        p.stop()
+
+
+def test_unsatisfiable_range_closes_upstream(proxy, upstream):
+    opened = []
+    open_upstream = proxy.open_upstream
+
+    def tracking(*args, **kwargs):
+        response = open_upstream(*args, **kwargs)
+        opened.append(response)
+        return response
+
+    proxy.open_upstream = tracking
+    response = requests.get(proxy.register(upstream, "/track.mp3"), headers={"Range": "bytes=500-100"})
+    assert response.status_code == 416
+    assert opened and all(r.raw.closed for r in opened)
@@ -0,0 +1,110 @@
+import threading
+import time
+from src.api.ibroadcast.token_manager import RefreshRejected, TokenManager
+
+
+def wait_for(condition, timeout=3.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+class SlowTokenServer:
+    def __init__(self, delay=0.2, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    def __call__(self, refresh_token):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            return None
+        return {"access_token": f"access-{self.calls}", "refresh_token": f"refresh-{self.calls}", "expires_in": 3600}
+
+
+def test_concurrent_callers_share_one_refresh():
+    server = SlowTokenServer()
+    tokens = TokenManager(server)
+    tokens.set_tokens("old", "refresh-0")
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(tokens.refresh())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert server.calls == 1
+    assert results == [True] * 8
+    assert tokens.access_token == "access-1"
+    assert tokens.refresh_token == "refresh-1"
+
+
+def test_expiry_is_tracked_from_response():
+    tokens = TokenManager(SlowTokenServer(delay=0))
+    tokens.set_tokens("old", "refresh-0")
+    assert tokens.expires_at is None
+    tokens.refresh()
+    assert 3500 < tokens.expires_at - time.time() <= 3600
+    tokens.clear()
+
+
+def test_ensure_fresh_only_refreshes_near_expiry():
+    server = SlowTokenServer(delay=0)
+    tokens = TokenManager(server, refresh_margin=60)
+    tokens.set_tokens("valid", "refresh-0", expires_in=3600)
+    assert tokens.ensure_fresh() == "valid"
+    assert server.calls == 0
+    tokens.expires_at = time.time() + 30  # Inside the margin
+    assert tokens.ensure_fresh() == "access-1"
+    assert server.calls == 1
+    tokens.clear()
+
+
+def test_background_refresh_before_expiry():
+    server = SlowTokenServer(delay=0)
+    refreshed = []
+    tokens = TokenManager(server, on_refreshed=lambda: refreshed.append(tokens.access_token), refresh_margin=60)
+    tokens.set_tokens("old", "refresh-0", expires_in=60.1)
+    assert wait_for(lambda: refreshed == ["access-1"])
+    tokens.clear()
+
+
+def test_failed_background_refresh_is_retried():
+    server = SlowTokenServer(delay=0, fail=True)
+    tokens = TokenManager(server, refresh_margin=60, retry_delay=0.05)
+    tokens.set_tokens("old", "refresh-0", expires_in=60)
+    assert wait_for(lambda: server.calls >= 2)
+    server.fail = False
+    assert wait_for(lambda: tokens.access_token.startswith("access-"))
+    tokens.clear()
+
+
+def test_failed_refreshes_back_off():
+    server = SlowTokenServer(delay=0, fail=True)
+    tokens = TokenManager(server, refresh_margin=60, retry_delay=10, max_retry_delay=25)
+    tokens.set_tokens("old", "refresh-0", expires_in=3600)
+    delays = []
+    for _ in range(4):
+        tokens.refresh()
+        delays.append(round(tokens.retry_at - time.time()))
+    assert delays == [10, 20, 25, 25]
+    # Until the retry is due, callers get the current token without another request
+    tokens.expires_at = time.time()
+    assert tokens.ensure_fresh() == "old"
+    assert server.calls == 4
+    tokens.clear()
+
+
+def test_rejected_refresh_token_asks_for_login():
+    def reject(refresh_token):
+        raise RefreshRejected("HTTP 400")
+
+    rejected = []
+    tokens = TokenManager(reject, refresh_margin=60, retry_delay=0.05, on_rejected=lambda: rejected.append(True))
+    tokens.set_tokens("old", "revoked", expires_in=60)
+    assert wait_for(lambda: rejected == [True])
+    assert tokens.access_token is None and tokens.refresh_token is None
+    assert tokens.timer is None
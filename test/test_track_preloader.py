@@ -0,0 +1,104 @@
+import enum
+import pytest
+from PyQt6.QtCore import QObject, pyqtSignal
+from src.api.ibroadcast.models import Album, Artist, Track
+from src.core.track_preloader import TrackPreloader, swap_players
+
+
+class FakePlayer(QObject):
+    mediaStatusChanged = pyqtSignal(object)
+    playbackStateChanged = pyqtSignal(object)
+    errorOccurred = pyqtSignal(object)
+
+    class MediaStatus(enum.Enum):
+        LoadingMedia = 1
+        BufferedMedia = 2
+        InvalidMedia = 3
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.source = None
+        self.status = self.MediaStatus.LoadingMedia
+        self.audio_output = None
+        self.stopped = False
+
+    def setSource(self, url):
+        self.source = url.toString()
+
+    def mediaStatus(self):
+        return self.status
+
+    def setAudioOutput(self, output):
+        self.audio_output = output
+
+    def stop(self):
+        self.stopped = True
+
+
+class FakeApi:
+    def get_track_by_id(self, track_id):
+        return Track(track_id, f"Track {track_id}", 1, 2020, 180, 7)
+
+    def get_stream_url(self, track_id):
+        return f"http://stream/{track_id}"
+
+    def get_artists_by_track(self, track_id):
+        return [Artist(1, "Artist")]
+
+    def get_album_by_track(self, track_id):
+        return Album(1, "Album")
+
+    def get_artists_with_albums(self):
+        return []
+
+    def get_artwork_url(self, artwork_id):
+        return f"http://art/{artwork_id}"
+
+
+@pytest.fixture
+def preloader(qapp):
+    players = []
+
+    def factory(parent):
+        players.append(FakePlayer(parent))
+        return players[-1]
+
+    return TrackPreloader(FakeApi(), player_factory=factory), players
+
+
+def test_preload_then_promote_on_track_change(preloader):
+    preloader, players = preloader
+    preloader.prepare(2)
+    preloader.prepare(2)
+    assert len(players) == 1 and players[0].source == "http://stream/2"
+    assert preloader.is_prepared(2)
+
+    preloaded = preloader.take(2)
+    assert preloaded.player is players[0] and preloaded.player.parent() is None
+    assert preloaded.track.name == "Track 2" and preloaded.artwork_url == "http://art/7"
+    assert not preloader.is_prepared(2)
+
+    # The promoted player takes over the audio output and the handlers
+    current, output, seen = FakePlayer(), object(), []
+    slots = {"mediaStatusChanged": seen.append, "playbackStateChanged": seen.append, "errorOccurred": seen.append}
+    for name, slot in slots.items():
+        getattr(current, name).connect(slot)
+    active = swap_players(current, preloaded.player, output, slots)
+    assert active is preloaded.player and active.audio_output is output
+    assert current.stopped and current.audio_output is None
+    current.mediaStatusChanged.emit("old")
+    active.mediaStatusChanged.emit("new")
+    assert seen == ["new"]
+
+
+def test_skip_discards_preload(preloader):
+    preloader, players = preloader
+    preloader.prepare(2)
+    # The user skipped somewhere else: the standby player is stopped and dropped
+    assert preloader.take(3) is None
+    assert players[0].stopped
+    assert not preloader.is_prepared(2)
+
+    preloader.prepare(4)
+    players[-1].status = FakePlayer.MediaStatus.InvalidMedia
+    assert preloader.take(4) is None
@@ -0,0 +1,68 @@
+import json
+from src.api.ibroadcast.play_queue_socket import PlayQueueSocket
+from src.core.state_dispatcher import StateDispatcher
+from src.core.track_queue import TrackQueue, track_ids
+
+
+def test_list_operations():
+    queue = TrackQueue([10, 20, 30])
+    queue.append(40)
+    queue.insert(0, 5)
+    assert queue.pop(1) == 10
+    assert queue.to_list() == [5, 20, 30, 40]
+    assert queue[1:3] == [20, 30]
+    assert queue[-1] == 40
+    assert 30 in queue and 10 not in queue
+    assert queue.index(30) == 2
+    assert len(queue) == 4 and queue
+    queue.clear()
+    assert not queue
+
+
+def test_content_hash_tracks_mutations():
+    queue = TrackQueue([1, 2, 3])
+    initial = queue.content_hash
+    assert TrackQueue([1, 2, 3]).content_hash == initial
+    queue.append(4)
+    assert queue.content_hash != initial
+    queue.pop()
+    assert queue.content_hash == initial
+
+
+def test_assign_reports_changes():
+    queue = TrackQueue([1, 2, 3])
+    assert not queue.assign([1, 2, 3])
+    assert queue.assign([3, 2, 1])
+    assert queue == [3, 2, 1]
+    source = TrackQueue([7])
+    assert queue.assign(source)
+    source.append(8)
+    assert queue == [7]  # assign copies
+
+
+def test_serializes_as_plain_list():
+    queue = TrackQueue(range(5))
+    assert json.loads(json.dumps(queue.to_list())) == [0, 1, 2, 3, 4]
+
+
+def test_malformed_queue_state_keeps_valid_ids(qapp):
+    queue, play_next = TrackQueue([1, 2]), TrackQueue()
+    dispatcher = StateDispatcher()
+
+    def apply_queue(state, changed):
+        # What the player's queue handler does with an inbound set_state
+        if "tracks" in state:
+            queue.assign(track_ids(state["tracks"]))
+        if "play_next" in state:
+            play_next.assign(track_ids(state["play_next"]))
+
+    dispatcher.register(["tracks", "play_next"], apply_queue)
+    socket = PlayQueueSocket()
+    socket.stateUpdated.connect(dispatcher.dispatch)
+    socket._on_text_message(json.dumps({
+        "command": "set_state",
+        "tracks": [3, None, "4", -1, 2 ** 64, "x", 2 ** 32],
+        "play_next": None,
+    }))
+    assert queue == [3, 4, 2 ** 32]
+    assert play_next == []
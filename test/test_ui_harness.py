@@ -0,0 +1,24 @@
+from benchmarks.ui_harness import UIHarness, check_regressions
+
+def test_harness_measures_every_view(qapp):
+    harness = UIHarness(tracks=150, max_rows=20)
+    try:
+        results = harness.run()
+    finally:
+        harness.close()
+
+    assert set(results) == {"library_grid", "album_track_list", "queue_sidebar", "artist_discography"}
+    for metrics in results.values():
+        assert metrics["populate_ms"] > 0
+        assert metrics["peak_widgets"] > 0
+        assert "scroll_lag_max_ms" in metrics
+    assert "relayout_ms" in results["library_grid"]
+
+def test_check_regressions():
+    baseline = {"library_grid": {"populate_ms": 100.0, "rss_kb": 10000.0}}
+
+    assert check_regressions({"library_grid": {"populate_ms": 120.0, "rss_kb": 10000.0}}, baseline) == []
+    failures = check_regressions({"library_grid": {"populate_ms": 200.0, "rss_kb": 10000.0}}, baseline)
+    assert failures == ["library_grid.populate_ms: 200.0 (baseline 100.0)"]
+    # Below the minimum delta for the unit, so noise rather than a regression
+    assert check_regressions({"library_grid": {"populate_ms": 6.0}}, {"library_grid": {"populate_ms": 2.0}}) == []